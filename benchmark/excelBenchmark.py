@@ -0,0 +1,200 @@
+# File: excelBenchmark
+# Description: Compares the time and the peak memory of writing the laser
+# profile cell by cell into an in-memory workbook, as it used to be, against
+# streaming it through a write-only workbook, and reports them as JSON
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import datetime
+import tempfile
+import tracemalloc
+from pathlib import Path
+sys.path.append(str(
+    Path(
+        Path(__file__).parent.parent,
+        "ottoLaserCutting"
+        )
+    )
+)
+
+import parseBenchmark
+import style
+import loopStats
+import excelWriter
+from openpyxl import Workbook
+from openpyxl.styles import Protection
+from openpyxl.worksheet.worksheet import Worksheet
+
+MB = 1024 * 1024
+COLUMN_WIDTHS = {
+    "A": 35, "B": 12, "C": 12, "D": 22, "E": 14, "F": 17, "G": 17,
+    "H": 17, "I": 22, "J": 12, "K": 17, "L": 22, "M": 17,
+}
+HEADERS = [
+    "排样文件", "循环耗时", "循环统计", "最后统计日期", "工件目标数", "工件已加工数", "预计消耗长料",
+    "预计消耗时长", "预计完成时间", "P90耗时", "P90消耗时长", "P90完成时间", "截尾平均耗时",
+]
+
+
+def createParsedResult(laserFileCount: int, loopCount: int, seed: int = 0) -> dict:
+    """
+    Creates the parsed result of as many laser files as asked, each one looped
+    loopCount times around a random cycle time.
+    """
+    rng = random.Random(seed)
+    loopTime = datetime.datetime.now()
+    parsedResult = {}
+    for laserFileIdx in range(laserFileCount):
+        cycleTime = rng.uniform(20, 120)
+        loop = loopStats.LoopSketch()
+        for _ in range(loopCount):
+            loop.append(loopTime, rng.gauss(cycleTime, cycleTime / 10))
+        parsedResult[f"{laserFileIdx + 101:06d} 主体管 SUS ∅25_T1.2_L{rng.randrange(200, 3000, 10)}.zx"] = {
+            "loop":           loop,
+            "workpieceCount": rng.randint(1, 6),
+        }
+    return parsedResult
+
+
+def fillWorkbookInMemory(ws: Worksheet, parsedResult: dict) -> None:
+    """
+    Former `rtfParse.fillWorkbook`, kept as the reference: every cell is looked
+    up in the worksheet and styled on its own.
+    """
+    for colIdx, header in enumerate(HEADERS, 1):
+        ws.cell(row=1, column=colIdx).value = header
+    for columnLetter, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[columnLetter].width = width
+    for colIdx in range(1, 14):
+        ws.cell(row=1, column=colIdx).style     = "Headline 1"
+        ws.cell(row=1, column=colIdx).alignment = style.alCenter
+
+    for laserFileName, laserFileInfo in sorted(parsedResult.items()):
+        laserFileStats = laserFileInfo["loop"].stats()
+        if not laserFileStats:
+            continue
+
+        currentRow = ws.max_row + 1
+        workpieceCount = laserFileInfo["workpieceCount"]
+        ws.cell(row=currentRow, column=1).value = laserFileName
+        ws.cell(row=currentRow, column=1).alignment = style.alCenterWrap
+        ws.cell(row=currentRow, column=2).value = round(laserFileStats.median)
+        ws.cell(row=currentRow, column=2).number_format = '0"秒"'
+        ws.cell(row=currentRow, column=3).value = laserFileStats.count
+        ws.cell(row=currentRow, column=3).number_format = '0"次"'
+        ws.cell(row=currentRow, column=4).value = laserFileStats.lastUpdated
+        ws.cell(row=currentRow, column=5).value = 100
+        ws.cell(row=currentRow, column=5).font = style.font["orangeBold"]
+        ws.cell(row=currentRow, column=5).number_format = '0"支"'
+        ws.cell(row=currentRow, column=5).protection = Protection(locked=False)
+        ws.cell(row=currentRow, column=6).value = 0
+        ws.cell(row=currentRow, column=6).font = style.font["greenBold"]
+        ws.cell(row=currentRow, column=6).number_format = '0"支"'
+        ws.cell(row=currentRow, column=6).protection = Protection(locked=False)
+        ws.cell(row=currentRow, column=7).value = f'=(E{currentRow}-F{currentRow})/{workpieceCount}'
+        ws.cell(row=currentRow, column=7).number_format = '0"支"'
+        ws.cell(row=currentRow, column=8).value = f'=(B{currentRow}+1)/{workpieceCount}*(E{currentRow}-F{currentRow})/86400'
+        ws.cell(row=currentRow, column=8).number_format = "[h]时mm分ss秒"
+        ws.cell(row=currentRow, column=9).value = f'=NOW() + H{currentRow}'
+        ws.cell(row=currentRow, column=9).number_format = "yyyy-m-d h:mm:ss"
+        ws.cell(row=currentRow, column=10).value = round(laserFileStats.p90)
+        ws.cell(row=currentRow, column=10).number_format = '0"秒"'
+        ws.cell(row=currentRow, column=11).value = f'=(J{currentRow}+1)/{workpieceCount}*(E{currentRow}-F{currentRow})/86400'
+        ws.cell(row=currentRow, column=11).number_format = "[h]时mm分ss秒"
+        ws.cell(row=currentRow, column=12).value = f'=NOW() + K{currentRow}'
+        ws.cell(row=currentRow, column=12).number_format = "yyyy-m-d h:mm:ss"
+        ws.cell(row=currentRow, column=13).value = laserFileStats.trimmedMean
+        ws.cell(row=currentRow, column=13).number_format = '0"秒"'
+        for col in range(1, 14):
+            ws.cell(row=currentRow, column=col).border = style.borderMedium
+
+    ws.protection.sheet = True
+    ws.protection.password = '456'
+    ws.protection.enable()
+
+
+def writeInMemory(parsedResult: dict, dstPath: Path) -> None:
+    wb = Workbook()
+    fillWorkbookInMemory(wb.active, parsedResult)
+    wb.save(str(dstPath))
+
+
+def writeStreaming(parsedResult: dict, dstPath: Path) -> None:
+    import rtfParse
+
+    wb = excelWriter.newWorkbook()
+    rtfParse.fillWorkbook(wb.create_sheet(), parsedResult, True)
+    wb.save(str(dstPath))
+
+
+def measure(writer, parsedResult: dict, dstPath: Path) -> dict:
+    """
+    Times a writer and traces the peak of the memory it allocates, in two
+    separate runs since tracing slows the allocations down.
+    """
+    startTime = time.perf_counter()
+    writer(parsedResult, dstPath)
+    seconds = time.perf_counter() - startTime
+
+    tracemalloc.start()
+    writer(parsedResult, dstPath)
+    _, peakSize = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds":       round(seconds, 4),
+        "rowsPerSecond": round(len(parsedResult) / max(seconds, 1e-9)),
+        "peakMemoryMb":  round(peakSize / MB, 2),
+        "fileSizeMb":    round(dstPath.stat().st_size / MB, 2),
+    }
+
+
+def run(args: argparse.Namespace, workDir: Path) -> dict:
+    """
+    Benchmarks both writers on every row count asked.
+
+    Returns:
+        dict: The report.
+    """
+    # rtfParse checks the paths of the configuration when imported
+    os.environ["OTTO_LASER_CUTTING_CONFIG"] = str(parseBenchmark.writeConfiguration(workDir))
+
+    results = []
+    for rowCount in args.rows:
+        parsedResult = createParsedResult(rowCount, args.loops, args.seed)
+        result = {"rowCount": rowCount}
+        for name, writer in (("inMemory", writeInMemory), ("streaming", writeStreaming)):
+            result[name] = measure(writer, parsedResult, Path(workDir, f"{name}.xlsx"))
+        result["speedup"] = round(result["inMemory"]["seconds"] / max(result["streaming"]["seconds"], 1e-9), 2)
+        result["memoryRatio"] = round(
+            result["inMemory"]["peakMemoryMb"] / max(result["streaming"]["peakMemoryMb"], 1e-9), 2
+        )
+        results.append(result)
+    return {
+        "timeStamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python":    platform.python_version(),
+        "platform":  platform.platform(),
+        "loopCount": args.loops,
+        "results":   results,
+    }
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(
+        description="Benchmarks writing the laser profile in memory against streaming it, and writes the results as JSON."
+    )
+    argParser.add_argument("-o", "--out", type=Path, default=Path("excelBenchmark.json"), help="path to the JSON report")
+    argParser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 10000], help="numbers of laser files written")
+    argParser.add_argument("--loops", type=int, default=20, help="number of loops per laser file")
+    argParser.add_argument("--seed", type=int, default=0)
+    args = argParser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ottoLaserCuttingExcelBenchmark") as workDir:
+        report = run(args, Path(workDir))
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(json.dumps(report, ensure_ascii=False, indent=4))
@@ -0,0 +1,199 @@
+# File: exportBenchmark
+# Description: Exports the analyses of synthetic TubePro logs into every table
+# format, checks that each one reads back to the rows written, and compares
+# their size, write and load times against xlsx as JSON
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import platform
+import argparse
+import datetime
+from pathlib import Path
+sys.path.append(str(
+    Path(
+        Path(__file__).parent.parent,
+        "ottoLaserCutting"
+        )
+    )
+)
+
+import parseBenchmark
+import tubeProLogSynth
+from openpyxl import Workbook, load_workbook
+
+MB = 1024 * 1024
+
+
+def writeCutRecords(dstPath: Path, count: int, laserFilePaths: list, rng: random.Random) -> None:
+    """
+    Writes a cut record workbook laid out like `cutRecord` does, one worksheet
+    per month.
+    """
+    wb = Workbook()
+    wb.remove(wb.active)
+    timeObj = datetime.datetime.now() - datetime.timedelta(days=365)
+    for _ in range(count):
+        timeObj += datetime.timedelta(minutes=rng.uniform(10, 120))
+        sheetName = f"{timeObj:%Y-%m}"
+        if sheetName not in wb.sheetnames:
+            ws = wb.create_sheet(sheetName, 0)
+            ws.append(["排样文件", "完成时间", "单号", "型号(数量)", "已切量/需求量", "截图文件"])
+        ws = wb[sheetName]
+        requiredCount = rng.randint(10, 500)
+        ws.append([
+            Path(rng.choice(laserFilePaths)).stem,
+            f"{timeObj:%Y/%m/%d %H:%M:%S}",
+            f"OT{rng.randint(10000, 99999)}" if rng.random() < 0.5 else None,
+            None,
+            f"{rng.randint(0, requiredCount)}/{requiredCount}",
+            None,
+        ])
+        ws.cell(ws.max_row, 6).hyperlink = f"D:\\截图\\屏幕截图 {timeObj:%Y-%m-%d %H%M%S}.png"
+    wb.save(str(dstPath))
+
+
+def writeXlsx(rows, columns: list, dstPath: Path) -> int:
+    """
+    Streams rows into a workbook the way the Excel reports get written, as the
+    baseline of the table formats.
+    """
+    import excelWriter
+
+    wb = excelWriter.newWorkbook()
+    writer = excelWriter.SheetWriter(wb.create_sheet(), {})
+    writer.append([column.name for column in columns])
+    for row in rows:
+        writer.append([row[column.name] for column in columns])
+    wb.save(str(dstPath))
+    return writer.rowCount - 1
+
+
+def readXlsx(srcPath: Path) -> int:
+    wb = load_workbook(str(srcPath), read_only=True)
+    rowCount = sum(1 for _ in wb.active.iter_rows(min_row=2, values_only=True))
+    wb.close()
+    return rowCount
+
+
+def measureTable(tableName: str, rows: list, columns: list, formats: list, workDir: Path) -> dict:
+    """
+    Writes and loads rows back in every format, checking that the table
+    formats read back to the very rows written.
+
+    Returns:
+        dict: Row count and the results of every format.
+    """
+    import tableExport
+
+    result = {"rowCount": len(rows)}
+    for fmt in ["xlsx", *formats]:
+        dstPath = Path(workDir, f"{tableName}.{fmt}")
+        startTime = time.perf_counter()
+        if fmt == "xlsx":
+            writeXlsx(rows, columns, dstPath)
+        else:
+            tableExport.writeTable(rows, columns, dstPath)
+        writeSeconds = time.perf_counter() - startTime
+
+        startTime = time.perf_counter()
+        if fmt == "xlsx":
+            readXlsx(dstPath)
+            roundTripChk = None
+        else:
+            roundTripChk = tableExport.readTable(dstPath, columns) == rows
+        loadSeconds = time.perf_counter() - startTime
+
+        result[fmt] = {
+            "sizeMb":       round(dstPath.stat().st_size / MB, 3),
+            "writeSeconds": round(writeSeconds, 4),
+            "loadSeconds":  round(loadSeconds, 4),
+            "roundTripChk": roundTripChk,
+        }
+    return result
+
+
+def run(args: argparse.Namespace, workDir: Path) -> dict:
+    """
+    Prepares the logs and the cut records in the work directory and benchmarks
+    the export of every table.
+
+    Returns:
+        dict: The report.
+    """
+    os.environ["OTTO_LASER_CUTTING_CONFIG"] = str(parseBenchmark.writeConfiguration(workDir))
+    import config
+    import rtfParse
+    import tableExport
+
+    parseBenchmark.silenceApp(workDir)
+    tableExport.pr = lambda *args, gui=True: None
+    logDir = rtfParse.TUBEPRO_LOG_PATH
+    os.makedirs(logDir, exist_ok=True)
+    summaries = tubeProLogSynth.generateFromArguments(logDir, args)
+    laserFilePaths = tubeProLogSynth.createLaserFiles(args.laser_files, random.Random(args.seed))
+    writeCutRecords(
+        config.CUT_RECORD_PATH,
+        args.cut_records,
+        [laserFile.path.replace("\\", "/") for laserFile in laserFilePaths],
+        random.Random(args.seed)
+    )
+
+    formats = [fmt for fmt in tableExport.FORMATS if fmt != "parquet" or tableExport.pyarrow]
+    # Logs get synced into the event store by the first export
+    startTime = time.perf_counter()
+    exportPaths = tableExport.exportPeriod(args.days + 1, Path(workDir, "export"), formats)
+    exportSeconds = time.perf_counter() - startTime
+
+    tables = {}
+    for tableName, (getRows, columns) in tableExport.getTables(args.days + 1).items():
+        tables[tableName] = measureTable(tableName, list(getRows()), columns, formats, workDir)
+
+    return {
+        "timeStamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python":    platform.python_version(),
+        "platform":  platform.platform(),
+        "pyarrow":   tableExport.pyarrow.__version__ if tableExport.pyarrow else None,
+        "dataset":   {
+            "logCount":       len(summaries),
+            "sizeMb":         round(sum(summary.size for summary in summaries) / MB, 2),
+            "lineCount":      sum(summary.lineCount for summary in summaries),
+            "cutRecordCount": args.cut_records,
+        },
+        "exportPeriod": {
+            "seconds":   round(exportSeconds, 4),
+            "fileCount": len(exportPaths),
+        },
+        "tables": tables,
+        "roundTripChk": all(
+            tableResult[fmt]["roundTripChk"]
+            for tableResult in tables.values()
+            for fmt in formats
+        ),
+    }
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(
+        description="Benchmarks the table export against xlsx and writes the results as JSON."
+    )
+    argParser.add_argument("-o", "--out", type=Path, default=Path("exportBenchmark.json"), help="path to the JSON report")
+    argParser.add_argument("--cut-records", type=int, default=5000, help="number of cut records")
+    argParser.add_argument("--keep", action="store_true", help="keep the work directory")
+    tubeProLogSynth.addArguments(argParser)
+    args = argParser.parse_args()
+
+    workDir = Path(tempfile.mkdtemp(prefix="ottoLaserCuttingExportBenchmark"))
+    try:
+        report = run(args, workDir)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workDir, ignore_errors=True)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(json.dumps(report, ensure_ascii=False, indent=4))
+    sys.exit(0 if report["roundTripChk"] else 1)
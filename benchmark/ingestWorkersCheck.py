@@ -0,0 +1,142 @@
+# File: ingestWorkersCheck
+# Description: Checks that ingesting TubePro logs in worker processes gives
+# what ingesting them one after the other does, down to the laser profiles
+# written from them, and reports the result as JSON
+import os
+import sys
+import json
+import platform
+import argparse
+import datetime
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+sys.path.append(str(
+    Path(
+        Path(__file__).parent.parent,
+        "ottoLaserCutting"
+        )
+    )
+)
+
+import parseBenchmark
+import tubeProLogSynth
+
+
+def readWorkbook(workbookPath: Path) -> dict:
+    """
+    Reads the values of every worksheet of a workbook.
+
+    Returns:
+        dict: `{sheetTitle: rows}` with the rows as lists of values.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(workbookPath, read_only=True)
+    try:
+        return {
+            ws.title: [
+                [str(value) if value is not None else None for value in row]
+                for row in ws.iter_rows(values_only=True)
+            ]
+            for ws in wb.worksheets
+        }
+    finally:
+        wb.close()
+
+
+def ingestWith(rtfFiles: list, workers: int, workDir: Path) -> dict:
+    """
+    Ingests the logs from a cold cache with a number of workers, then writes
+    the laser profiles of `parsePeriod` and `parseAccu` from them.
+
+    Returns:
+        dict: The ingestions and the values of both laser profiles.
+    """
+    import logIngest
+    import rtfParse
+
+    parseBenchmark.resetCaches()
+    ingestions = [
+        {"checkpoint": asdict(checkpoint), "lines": lines, "resetChk": resetChk}
+        for checkpoint, lines, resetChk in logIngest.ingestAll(rtfFiles, workers=workers)
+    ]
+
+    # The event store syncs through ingestAll as well
+    parseBenchmark.resetCaches()
+    logIngest.workerCount = workers
+    periodPath = rtfParse.parsePeriod(365, Path(workDir, f"period{workers}.xlsx"))
+    accuPath = rtfParse.parseAccu(365, Path(workDir, f"accu{workers}.xlsx"))
+    return {
+        "ingestions": ingestions,
+        "period":     readWorkbook(periodPath) if periodPath else None,
+        "accu":       readWorkbook(accuPath) if accuPath else None,
+    }
+
+
+def compare(rtfFiles: list, serial: dict, parallel: dict) -> dict:
+    mismatches = [
+        {"log": rtfFile.name, "key": key}
+        for rtfFile, serialIngestion, parallelIngestion in zip(rtfFiles, serial["ingestions"], parallel["ingestions"])
+        for key in serialIngestion
+        if serialIngestion[key] != parallelIngestion[key]
+    ]
+    if len(serial["ingestions"]) != len(parallel["ingestions"]):
+        mismatches.append({"key": "ingestionCount"})
+    for workbook in ("period", "accu"):
+        if serial[workbook] is None or serial[workbook] != parallel[workbook]:
+            mismatches.append({"key": workbook})
+    return {
+        "mismatches":   mismatches[:10],
+        "identicalChk": not mismatches,
+    }
+
+
+def run(args: argparse.Namespace, workDir: Path) -> dict:
+    """
+    Ingests synthetic logs with a single worker and with several of them.
+
+    Returns:
+        dict: The report.
+    """
+    # Worker processes inherit the configuration through the environment
+    os.environ["OTTO_LASER_CUTTING_CONFIG"] = str(parseBenchmark.writeConfiguration(workDir))
+    import rtfParse
+
+    parseBenchmark.silenceApp(workDir)
+    logDir = rtfParse.TUBEPRO_LOG_PATH
+    os.makedirs(logDir, exist_ok=True)
+    tubeProLogSynth.generate(logDir, days=args.days, jobCount=args.jobs, loopCount=args.loops, seed=args.seed)
+    rtfFiles = sorted(logDir.glob("*.rtf"))
+
+    serial = ingestWith(rtfFiles, 1, workDir)
+    parallel = ingestWith(rtfFiles, args.workers, workDir)
+    return {
+        "timeStamp":       datetime.datetime.now().isoformat(timespec="seconds"),
+        "python":          platform.python_version(),
+        "platform":        platform.platform(),
+        "workers":         args.workers,
+        "logCount":        len(rtfFiles),
+        "recordLineCount": sum(len(ingestion["lines"]) for ingestion in serial["ingestions"]),
+        "check":           compare(rtfFiles, serial, parallel),
+    }
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(
+        description="Checks ingesting TubePro logs in worker processes against a single worker and writes the results as JSON."
+    )
+    argParser.add_argument("-o", "--out", type=Path, default=Path("ingestWorkersCheck.json"), help="path to the JSON report")
+    argParser.add_argument("-w", "--workers", type=int, default=4, help="number of worker processes compared to a single one")
+    argParser.add_argument("--days", type=int, default=12, help="number of synthetic logs")
+    argParser.add_argument("--jobs", type=int, default=8, help="number of jobs per log")
+    argParser.add_argument("--loops", type=int, default=40, help="number of loops per job")
+    argParser.add_argument("--seed", type=int, default=0, help="seed of the synthetic logs")
+    args = argParser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ottoLaserCuttingIngestWorkersCheck") as workDir:
+        report = run(args, Path(workDir))
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(json.dumps(report, ensure_ascii=False, indent=4))
+    sys.exit(0 if report["check"]["identicalChk"] else 1)
@@ -0,0 +1,115 @@
+# File: logEventBenchmark
+# Description: Times the TubePro log line classifier against the regex family it
+# replaced on synthetic lines, checks both find the same records, and reports
+# the throughputs as JSON
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import datetime
+from pathlib import Path
+sys.path.append(str(
+    Path(
+        Path(__file__).parent.parent,
+        "ottoLaserCutting"
+        )
+    )
+)
+
+
+def generateLines(lineCount: int, seed: int) -> list:
+    """
+    Generates log lines, mostly loop starts with a mix of the records the
+    classifier looks for.
+    """
+    rand = random.Random(seed)
+    lines = []
+    for i in range(lineCount):
+        timeStamp = f"({rand.randint(1, 12):02d}/{rand.randint(1, 28):02d} 08:{i // 60 % 60:02d}:{i % 60:02d})"
+        roll = rand.random()
+        if roll < 0.02:
+            lines.append(timeStamp + r"打开文件：D:\欧拓图纸\切割文件\101 主体管 SUS ∅25_T1.0_L500.zzx")
+        elif roll < 0.12:
+            lines.append(timeStamp + f"总零件数:4, 当前零件序号:{rand.randint(1, 4)}")
+        elif roll < 0.14:
+            lines.append(timeStamp + f"任务开始，零件切割计划数目{rand.randint(1, 200)}")
+        elif roll < 0.16:
+            lines.append(timeStamp + f"加工结束，已切割零件数目{rand.randint(1, 200)}")
+        else:
+            lines.append(timeStamp + f"开始加工，循环计数：{i}，X轴坐标 {rand.random() * 1000:.3f}")
+    return lines
+
+
+def countRegexMatches(lines: list) -> int:
+    import logEvent
+
+    pats = (
+        logEvent.fileOpenPat,
+        logEvent.segmentFirstPat,
+        logEvent.segmentPat,
+        logEvent.scheduelTotalPat,
+        logEvent.loopEndPat,
+    )
+    return sum(1 for line in lines for pat in pats if pat.match(line))
+
+
+def countClassifierMatches(lines: list) -> int:
+    import logEvent
+
+    # A first segment matches both segment patterns of the regex family
+    return sum(
+        1 + logEvent.segmentFirstChk(event)
+        for line in lines
+        for event in logEvent.classifyLine(line)
+    )
+
+
+def timeMatches(countFunc, lines: list) -> dict:
+    startTime = time.perf_counter()
+    matchCount = countFunc(lines)
+    elapsed = time.perf_counter() - startTime
+    return {
+        "matchCount":  matchCount,
+        "seconds":     round(elapsed, 3),
+        "linesPerSec": round(len(lines) / elapsed) if elapsed else None,
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    """
+    Times the regex family and the classifier on the same synthetic lines.
+
+    Returns:
+        dict: The report.
+    """
+    lines = generateLines(args.lines, args.seed)
+    regex = timeMatches(countRegexMatches, lines)
+    classifier = timeMatches(countClassifierMatches, lines)
+    return {
+        "timeStamp":    datetime.datetime.now().isoformat(timespec="seconds"),
+        "python":       platform.python_version(),
+        "platform":     platform.platform(),
+        "seed":         args.seed,
+        "lineCount":    len(lines),
+        "regexFamily":  regex,
+        "classifier":   classifier,
+        "identicalChk": regex["matchCount"] == classifier["matchCount"],
+    }
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(
+        description="Times the TubePro log line classifier against the regex family and writes the results as JSON."
+    )
+    argParser.add_argument("-o", "--out", type=Path, default=Path("logEventBenchmark.json"), help="path to the JSON report")
+    argParser.add_argument("--lines", type=int, default=200000, help="number of synthetic log lines")
+    argParser.add_argument("--seed", type=int, default=0, help="seed of the synthetic log lines")
+    args = argParser.parse_args()
+
+    report = run(args)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(json.dumps(report, ensure_ascii=False, indent=4))
+    sys.exit(0 if report["identicalChk"] else 1)
@@ -0,0 +1,182 @@
+# File: ocrBenchmark
+# Description: Compares the latency of the OCR of cut records when an easyocr
+# Reader is built on every call, as it used to be, against the shared engines of
+# the registry, cold and warm, and reports them as JSON
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import datetime
+import statistics
+import tempfile
+import threading
+from pathlib import Path
+sys.path.append(str(
+    Path(
+        Path(__file__).parent.parent,
+        "ottoLaserCutting"
+        )
+    )
+)
+
+import numpy
+from PIL import Image, ImageDraw
+
+import parseBenchmark
+
+
+def createImages(imagePath: Path = None) -> dict:
+    """
+    Crops the title and the process count off a TubePro screenshot the way
+    `cutRecord.getImgInfo` does, or draws lookalikes when none is given.
+
+    Returns:
+        dict: `{languages: image}` as BGR arrays.
+    """
+    import ocrEngine
+
+    if imagePath:
+        with Image.open(imagePath) as img:
+            imgTitle        = img.convert("RGB").crop((91, 0, 900, 25))
+            imgProcessCount = img.convert("RGB").crop((550, 1665, 765, 1685))
+    else:
+        imgTitle = Image.new("RGB", (809, 25), "white")
+        ImageDraw.Draw(imgTitle).text((4, 6), "TubePro 101 Main Tube Q235 50_T1.5_L2350.zzx", fill="black")
+        imgProcessCount = Image.new("RGB", (215, 20), "white")
+        ImageDraw.Draw(imgProcessCount).text((4, 4), "Processed  125/300", fill="black")
+    return {
+        ocrEngine.TITLE_LANGUAGES:  numpy.array(imgTitle)[:, :, ::-1].copy(),
+        ocrEngine.NUMBER_LANGUAGES: numpy.array(imgProcessCount)[:, :, ::-1].copy(),
+    }
+
+
+def summarize(latencies: list) -> dict:
+    return {
+        "calls":         len(latencies),
+        "medianSeconds": round(statistics.median(latencies), 4),
+        "maxSeconds":    round(max(latencies), 4),
+    }
+
+
+def measurePerCall(images: dict, calls: int) -> dict:
+    """
+    Former behaviour: a Reader built for every recognition.
+    """
+    import easyocr
+
+    result = {}
+    for languages, image in images.items():
+        latencies = []
+        for _ in range(calls):
+            startTime = time.perf_counter()
+            easyocr.Reader(list(languages)).readtext(image)
+            latencies.append(time.perf_counter() - startTime)
+        result[",".join(languages)] = summarize(latencies)
+    return result
+
+
+def measureRegistry(images: dict, calls: int) -> dict:
+    """
+    First call building the engine, then the steady state of the registry.
+    """
+    import ocrEngine
+
+    result = {}
+    for languages, image in images.items():
+        startTime = time.perf_counter()
+        ocrEngine.getEngine(languages).readtext(image)
+        firstCallSeconds = time.perf_counter() - startTime
+
+        latencies = []
+        for _ in range(calls):
+            startTime = time.perf_counter()
+            ocrEngine.getEngine(languages).readtext(image)
+            latencies.append(time.perf_counter() - startTime)
+        result[",".join(languages)] = {
+            "firstCallSeconds": round(firstCallSeconds, 4),
+            "steadyState":      summarize(latencies),
+        }
+    return result
+
+
+def measureConcurrent(images: dict, threadCount: int, calls: int) -> dict:
+    """
+    Recognizes from several threads at once, as the monitor thread and the
+    hotkey listener do, checking that every thread reads the same text.
+    """
+    import ocrEngine
+
+    languages, image = next(iter(images.items()))
+    expected = [text for _, text, _ in ocrEngine.getEngine(languages).readtext(image)]
+    mismatches = []
+
+    def recognize():
+        for _ in range(calls):
+            texts = [text for _, text, _ in ocrEngine.getEngine(languages).readtext(image)]
+            if texts != expected:
+                mismatches.append(texts)
+
+    threads = [threading.Thread(target=recognize) for _ in range(threadCount)]
+    startTime = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        "threadCount":  threadCount,
+        "calls":        threadCount * calls,
+        "seconds":      round(time.perf_counter() - startTime, 4),
+        "engineCount":  len(ocrEngine.engines),
+        "consistentChk": not mismatches,
+    }
+
+
+def run(args: argparse.Namespace, workDir: Path) -> dict:
+    """
+    Benchmarks building a Reader per call against the registry.
+
+    Returns:
+        dict: The report.
+    """
+    # ocrEngine reads the configuration when imported, the machine's one may be missing
+    os.environ["OTTO_LASER_CUTTING_CONFIG"] = str(parseBenchmark.writeConfiguration(workDir))
+    images = createImages(args.image)
+    report = {
+        "timeStamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python":    platform.python_version(),
+        "platform":  platform.platform(),
+        "image":     str(args.image) if args.image else None,
+    }
+    # Cold first, the registry is still empty
+    report["registry"]   = measureRegistry(images, args.calls)
+    report["perCall"]    = measurePerCall(images, args.per_call_calls)
+    report["concurrent"] = measureConcurrent(images, args.threads, args.calls)
+    report["speedup"] = {
+        languages: round(
+            report["perCall"][languages]["medianSeconds"]
+            / max(report["registry"][languages]["steadyState"]["medianSeconds"], 1e-9),
+            2
+        )
+        for languages in report["perCall"]
+    }
+    return report
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(
+        description="Benchmarks the OCR engines of the cut records and writes the results as JSON."
+    )
+    argParser.add_argument("-o", "--out", type=Path, default=Path("ocrBenchmark.json"), help="path to the JSON report")
+    argParser.add_argument("--image", type=Path, help="TubePro screenshot to read, lookalike crops are drawn otherwise")
+    argParser.add_argument("--calls", type=int, default=20, help="number of recognitions per engine")
+    argParser.add_argument("--per-call-calls", type=int, default=3, help="number of recognitions building a Reader each")
+    argParser.add_argument("--threads", type=int, default=4, help="number of threads recognizing concurrently")
+    args = argParser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ottoLaserCuttingOcrBenchmark") as workDir:
+        report = run(args, Path(workDir))
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(json.dumps(report, ensure_ascii=False, indent=4))
@@ -0,0 +1,228 @@
+# File: ocrFixBenchmark
+# Description: Compares fixing the laser file names read by OCR the way it used
+# to be done, loading and compiling the rules again for every text, against the
+# compiled rules of ocrFixRules, checks that both give the same names, and
+# reports them as JSON
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import datetime
+import tempfile
+from pathlib import Path
+sys.path.append(str(
+    Path(
+        Path(__file__).parent.parent,
+        "ottoLaserCutting"
+        )
+    )
+)
+
+import parseBenchmark
+
+# Misreadings of the laser file names, as fixed on the machine
+SAMPLE_RULES = {
+    "主休管":     "主体管",
+    "主体菅":     "主体管",
+    "王体管":     "主体管",
+    "副管 ":      "副管",
+    "加强杠":     "加强杆",
+    "连接杄":     "连接杆",
+    "横樑":       "横梁",
+    "立柱 ":      "立柱",
+    "Q23S":       "Q235",
+    "O235":       "Q235",
+    "_T1,5":      "_T1.5",
+    "_T2,0":      "_T2.0",
+    ".zzz":       ".zzx",
+    ".Zzx":       ".zzx",
+    "ø":          "Φ",
+    r"\s{2,}":    " ",
+    r"^[\.\-_]+": "",
+    r"(\d)O":     r"\g<1>0",
+    r"L(\d+)l":   r"L\g<1>1",
+    "_L ":        "_L",
+    " .zzx":      ".zzx",
+}
+PART_NAMES = ["主体管", "副管", "加强杆", "连接杆", "横梁", "立柱", "底座管", "扶手管"]
+MISREADINGS = {
+    "主体管": ["主休管", "主体菅", "王体管"],
+    "加强杆": ["加强杠"],
+    "连接杆": ["连接杄"],
+    "横梁":   ["横樑"],
+    "Q235":   ["Q23S", "O235"],
+    ".zzx":   [".zzz", ".Zzx", " .zzx"],
+}
+
+
+def createCorpus(count: int, seed: int) -> list:
+    """
+    Draws laser file names as they come out of the OCR of TubePro titles,
+    misread now and then.
+    """
+    rand = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        name = (
+            f"{rand.randint(100, 999)} {rand.choice(PART_NAMES)} Q235 "
+            f"{rand.choice(['ø', 'Φ'])}{rand.choice([25, 32, 38, 50])}_T{rand.choice(['1.5', '2.0'])}"
+            f"_L{rand.randint(300, 6000)}.zzx"
+        )
+        for text, misreadings in MISREADINGS.items():
+            if text in name and rand.random() < 0.3:
+                name = name.replace(text, rand.choice(misreadings))
+        if rand.random() < 0.2:
+            name = name.replace(" ", "  ", 1)
+        corpus.append(name)
+    return corpus
+
+
+def loadCorpus(corpusPath: Path) -> list:
+    """
+    Loads recorded OCR texts, one per line.
+    """
+    with open(corpusPath, "r", encoding="utf-8") as f:
+        return [line.rstrip("\r\n") for line in f if line.strip()]
+
+
+def fixReloadingRules(rulesPath: Path, text: str) -> str:
+    """
+    Former behaviour: the rules loaded and compiled for every text.
+    """
+    import ocrFixRules
+
+    with open(rulesPath, "r", encoding="utf-8") as pat:
+        ruleData = json.load(pat)
+    return ocrFixRules.applySequentially(ruleData, text)
+
+
+def measure(fix, corpus: list, repeat: int) -> tuple:
+    fixedTexts = []
+    startTime = time.perf_counter()
+    for _ in range(repeat):
+        fixedTexts = [fix(text) for text in corpus]
+    seconds = time.perf_counter() - startTime
+    return fixedTexts, {
+        "seconds":        round(seconds, 4),
+        "textsPerSecond": round(len(corpus) * repeat / max(seconds, 1e-9)),
+    }
+
+
+def fuzz(caseCount: int, seed: int) -> dict:
+    """
+    Checks the compiled rules against substituting them one after the other
+    on random literal rules over a tiny alphabet, where overlapping patterns
+    and replacements forming other patterns are the rule rather than the
+    exception.
+    """
+    import ocrFixRules
+
+    rand = random.Random(seed)
+    alphabet = "abAB.1 "
+
+    def draw(minLength: int, maxLength: int) -> str:
+        return "".join(rand.choice(alphabet) for _ in range(rand.randint(minLength, maxLength)))
+
+    mismatches = []
+    mergedPassCount = 0
+    for _ in range(caseCount):
+        ruleData = {draw(1, 3).replace(".", ""): draw(0, 3).replace(".", "") for _ in range(rand.randint(1, 6))}
+        ruleData.pop("", None)
+        compiled = ocrFixRules.CompiledOcrFixRules(ruleData)
+        mergedPassCount += sum(isinstance(rulePass, ocrFixRules.LiteralPass) for rulePass in compiled.passes)
+        for _ in range(20):
+            text = draw(0, 12)
+            expected = ocrFixRules.applySequentially(ruleData, text)
+            if compiled.apply(text) != expected:
+                mismatches.append({"rules": ruleData, "text": text, "expected": expected})
+    return {
+        "cases":           caseCount,
+        "mergedPassCount": mergedPassCount,
+        "mismatches":      mismatches[:10],
+        "identicalChk":    not mismatches,
+    }
+
+
+def run(args: argparse.Namespace, workDir: Path) -> dict:
+    """
+    Benchmarks reloading the rules for every text against the compiled rules.
+
+    Returns:
+        dict: The report.
+    """
+    # ocrFixRules reads the configuration when imported, the machine's one may be missing
+    os.environ["OTTO_LASER_CUTTING_CONFIG"] = str(parseBenchmark.writeConfiguration(workDir))
+    import ocrFixRules
+
+    if args.rules:
+        rulesPath = args.rules
+    else:
+        rulesPath = Path(workDir, "rules.json")
+        with open(rulesPath, "w", encoding="utf-8") as f:
+            json.dump(SAMPLE_RULES, f, ensure_ascii=False)
+    with open(rulesPath, "r", encoding="utf-8") as f:
+        ruleData = json.load(f)
+    corpus = loadCorpus(args.corpus) if args.corpus else createCorpus(args.count, args.seed)
+
+    startTime = time.perf_counter()
+    compiled = ocrFixRules.getOcrFixRules(rulesPath)
+    compileSeconds = time.perf_counter() - startTime
+    reloadedTexts, reloading = measure(lambda text: fixReloadingRules(rulesPath, text), corpus, 1)
+    sequentialTexts, sequential = measure(lambda text: ocrFixRules.applySequentially(ruleData, text), corpus, args.repeat)
+    compiledTexts, compiledResult = measure(compiled.apply, corpus, args.repeat)
+    # Once per screenshot, the file being checked for changes
+    watchedTexts, watched = measure(lambda text: ocrFixRules.getOcrFixRules(rulesPath).apply(text), corpus, args.repeat)
+    mismatches = [
+        {"text": text, "expected": expected, "fixed": fixed}
+        for text, expected, fixed in zip(corpus, reloadedTexts, compiledTexts)
+        if fixed != expected
+    ]
+    return {
+        "timeStamp":  datetime.datetime.now().isoformat(timespec="seconds"),
+        "python":     platform.python_version(),
+        "platform":   platform.platform(),
+        "corpus":     str(args.corpus) if args.corpus else f"synthetic, seed {args.seed}",
+        "texts":      len(corpus),
+        "rules": {
+            "path":          str(args.rules) if args.rules else "sample",
+            "count":         len(compiled.rules),
+            "literalCount":  sum(rule.literalChk for rule in compiled.rules),
+            "passCount":     len(compiled.passes),
+            "compileSeconds": round(compileSeconds, 4),
+        },
+        "reloading":  reloading,
+        "sequential": sequential,
+        "compiled":   compiledResult,
+        "watched":    watched,
+        "speedup": round(
+            reloading["seconds"] / max(compiledResult["seconds"] / args.repeat, 1e-9), 1
+        ),
+        "corpusCheck": {
+            "mismatches":   mismatches[:10],
+            "identicalChk": not mismatches and reloadedTexts == sequentialTexts == watchedTexts,
+        },
+        "fuzzCheck": fuzz(args.fuzz, args.seed),
+    }
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(
+        description="Benchmarks the OCR fix rules of the cut records and writes the results as JSON."
+    )
+    argParser.add_argument("-o", "--out", type=Path, default=Path("ocrFixBenchmark.json"), help="path to the JSON report")
+    argParser.add_argument("--rules", type=Path, help="JSON rules to apply, sample rules are used otherwise")
+    argParser.add_argument("--corpus", type=Path, help="recorded OCR texts, one per line, synthetic ones are drawn otherwise")
+    argParser.add_argument("--count", type=int, default=5000, help="number of synthetic texts")
+    argParser.add_argument("--repeat", type=int, default=20, help="number of passes over the corpus with compiled rules")
+    argParser.add_argument("--fuzz", type=int, default=2000, help="number of random rule sets checked")
+    argParser.add_argument("--seed", type=int, default=0, help="seed of the synthetic texts and random rule sets")
+    args = argParser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ottoLaserCuttingOcrFixBenchmark") as workDir:
+        report = run(args, Path(workDir))
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(json.dumps(report, ensure_ascii=False, indent=4))
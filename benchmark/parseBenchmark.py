@@ -0,0 +1,324 @@
+# File: parseBenchmark
+# Description: Times the TubePro log parsing on synthetic or copied logs and
+# reports throughput and peak memory as JSON, to be diffed between releases
+import os
+import sys
+import json
+import time
+import codecs
+import shutil
+import tempfile
+import platform
+import argparse
+import datetime
+from pathlib import Path
+sys.path.append(str(
+    Path(
+        Path(__file__).parent.parent,
+        "ottoLaserCutting"
+        )
+    )
+)
+
+import tubeProLogSynth
+
+REPO_CONFIG = Path(Path(__file__).parent.parent, "configuration.json")
+MB = 1024 * 1024
+
+
+def getPeakRss() -> int:
+    """
+    Gets the peak resident set size of the benchmark process in bytes, over its
+    whole lifetime, so it's reported once for the run rather than per stage.
+    Worker processes ingesting logs in parallel aren't accounted for.
+    """
+    if os.name == "nt":
+        import psutil
+        return psutil.Process().memory_info().peak_wset
+    else:
+        import resource
+        peakRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peakRss if sys.platform == "darwin" else peakRss * 1024
+
+
+def getThroughput(seconds: float, byteCount: int, lineCount: int) -> dict:
+    seconds = max(seconds, 1e-9)
+    return {
+        "seconds":        round(seconds, 4),
+        "mbPerSecond":    round(byteCount / MB / seconds, 2),
+        "linesPerSecond": round(lineCount / seconds),
+    }
+
+
+def writeConfiguration(workDir: Path) -> Path:
+    """
+    Writes a configuration pointing the otto directory into the work directory
+    so that neither the logs nor the cache of the machine get touched.
+    """
+    with open(REPO_CONFIG, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["paths"]["otto"]        = str(Path(workDir, "otto"))
+    data["paths"]["warehousing"] = str(Path(workDir, "warehousing"))
+    for key in ("otto", "warehousing"):
+        os.makedirs(data["paths"][key], exist_ok=True)
+
+    configPath = Path(workDir, "configuration.json")
+    with open(configPath, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    return configPath
+
+
+def silenceApp(workDir: Path) -> None:
+    """
+    Keeps the parsing away from the GUI: messages are dropped and workbooks are
+    saved into the work directory without being opened.
+    """
+    import util
+    import rtfParse
+
+    def pr(*args, gui: bool = True):
+        pass
+
+    def saveWorkbook(wb, dstPath=None, openAfterSaveChk=False, backgroundChk=False, backupChk=None) -> Path:
+        dstPath = dstPath or Path(workDir, "export.xlsx")
+        wb.save(str(dstPath))
+        return dstPath
+
+    util.pr = pr
+    rtfParse.pr = pr
+    util.saveWorkbook = saveWorkbook
+
+
+def resetCaches() -> None:
+    """
+    Drops everything cached on disk and in memory so the next run starts cold.
+    """
+    import config
+    import logIngest
+    import logIndex
+    import rtfParse
+
+    shutil.rmtree(config.CACHE_DIR_PATH, ignore_errors=True)
+    shutil.rmtree(Path(rtfParse.TUBEPRO_LOG_PATH, "精简"), ignore_errors=True)
+    logIngest.encodingCache.clear()
+    logIndex.logIndexes.clear()
+
+
+def measureStages(rtfFiles: list, byteCount: int, workDir: Path) -> tuple:
+    """
+    Times every stage of the parsing on its own over all logs, from a cold cache.
+
+    Stages:
+        - read: Reading the raw bytes
+        - decode: Decoding the raw bytes in the detected encoding
+        - rtfStrip: Tokenizing the rtf into text lines, decoding included
+        - classify: Classifying the text lines into events
+        - ingest: Syncing the event store, i.e. all of the above plus storing
+        - aggregate: Folding the stored events into loop intervals
+        - excelWrite: Filling and saving the laser profile workbook
+
+    Returns:
+        tuple: Stage results and the number of text lines of the logs.
+    """
+    import rtfReader
+    import logIngest
+    import logEvent
+    import eventStore
+    import rtfParse
+    import excelWriter
+
+    resetCaches()
+    stages = {}
+
+    startTime = time.perf_counter()
+    for rtfFile in rtfFiles:
+        with open(rtfFile, "rb") as f:
+            while f.read(rtfReader.CHUNK_SIZE):
+                pass
+    readElapsed = time.perf_counter() - startTime
+
+    encodings = {}
+    codePages = {}
+    startTime = time.perf_counter()
+    for rtfFile in rtfFiles:
+        encodings[rtfFile] = logIngest.getEncoding(str(rtfFile)) or "utf-8"
+        textDecoder = codecs.getincrementaldecoder(encodings[rtfFile])(errors="replace")
+        with open(rtfFile, "rb") as f:
+            while chunk := f.read(rtfReader.CHUNK_SIZE):
+                textDecoder.decode(chunk)
+        textDecoder.decode(b"", final=True)
+    decodeElapsed = time.perf_counter() - startTime
+
+    lineCount = 0
+    startTime = time.perf_counter()
+    for rtfFile in rtfFiles:
+        with open(rtfFile, "rb") as f:
+            codePageMatch = logIngest.codePagePat.search(f.read(logIngest.HEAD_DIGEST_SIZE))
+            codePages[rtfFile] = codePageMatch.group(1).decode() if codePageMatch else ""
+            f.seek(0)
+            reader = rtfReader.RtfLineReader(f, encoding=encodings[rtfFile], codePage=codePages[rtfFile])
+            for _ in reader:
+                lineCount += 1
+    stripElapsed = time.perf_counter() - startTime
+
+    # Lines are read untimed one log at a time to keep the memory bounded
+    classifyElapsed = 0.0
+    for rtfFile in rtfFiles:
+        with open(rtfFile, "rb") as f:
+            lines = list(rtfReader.RtfLineReader(f, encoding=encodings[rtfFile], codePage=codePages[rtfFile]))
+        startTime = time.perf_counter()
+        for line in lines:
+            logEvent.classifyLine(line)
+        classifyElapsed += time.perf_counter() - startTime
+
+    stages["read"]     = getThroughput(readElapsed, byteCount, lineCount)
+    stages["decode"]   = getThroughput(decodeElapsed, byteCount, lineCount)
+    stages["rtfStrip"] = getThroughput(stripElapsed, byteCount, lineCount)
+    stages["classify"] = getThroughput(classifyElapsed, byteCount, lineCount)
+
+    # Encodings detected above would otherwise make the ingestion look faster
+    resetCaches()
+    startTime = time.perf_counter()
+    eventStore.sync(rtfFiles)
+    stages["ingest"] = getThroughput(time.perf_counter() - startTime, byteCount, lineCount)
+
+    parsedResult = None
+    aggregateElapsed = 0.0
+    for logName in eventStore.queryLogs(datetime.datetime.fromtimestamp(0)):
+        events = eventStore.queryEvents(logName)
+        startTime = time.perf_counter()
+        parsedResult = rtfParse.parse(
+            rtfFile=Path(rtfParse.TUBEPRO_LOG_PATH, logName),
+            wb=None,
+            accumulationMode=True,
+            parsedResult=parsedResult,
+            events=events,
+        )["parsedResult"]
+        aggregateElapsed += time.perf_counter() - startTime
+    stages["aggregate"] = getThroughput(aggregateElapsed, byteCount, lineCount)
+
+    startTime = time.perf_counter()
+    wb = excelWriter.newWorkbook()
+    ws = wb.create_sheet()
+    if parsedResult:
+        rtfParse.fillWorkbook(ws, parsedResult, True)
+    wb.save(str(Path(workDir, "stage.xlsx")))
+    stages["excelWrite"] = getThroughput(time.perf_counter() - startTime, byteCount, lineCount)
+
+    return stages, lineCount
+
+
+def measureEndToEnd(rtfFiles: list, byteCount: int, lineCount: int) -> dict:
+    """
+    Times the entry points of the GUI, each one from a cold cache and again
+    with the cache it left behind. The log window is the default one day, which
+    covers all logs since they have all just been created.
+    """
+    import rtfParse
+    from openpyxl import Workbook
+
+    largestFile = max(rtfFiles, key=lambda rtfFile: rtfFile.stat().st_size)
+    largestSize = largestFile.stat().st_size
+    # Lines of the largest log are estimated from its share of the bytes
+    largestLineCount = round(lineCount * largestSize / max(byteCount, 1))
+    entryPoints = {
+        "parse":          (lambda: rtfParse.parse(largestFile, Workbook(), False), largestSize, largestLineCount),
+        "parseAccuLog":   (rtfParse.parseAccuLog, byteCount, lineCount),
+        "parsePeriodLog": (rtfParse.parsePeriodLog, byteCount, lineCount),
+        "rtfSimplify":    (rtfParse.rtfSimplify, byteCount, lineCount),
+    }
+
+    results = {}
+    for name, (entryPoint, entryByteCount, entryLineCount) in entryPoints.items():
+        resetCaches()
+        results[name] = {}
+        for run in ("cold", "warm"):
+            startTime = time.perf_counter()
+            entryPoint()
+            results[name][run] = getThroughput(time.perf_counter() - startTime, entryByteCount, entryLineCount)
+    return results
+
+
+def run(args: argparse.Namespace, workDir: Path) -> dict:
+    """
+    Prepares the logs in the work directory and benchmarks them.
+
+    Returns:
+        dict: The report.
+    """
+    # Worker processes inherit the configuration through the environment
+    os.environ["OTTO_LASER_CUTTING_CONFIG"] = str(writeConfiguration(workDir))
+    import config
+    import logIngest
+    import rtfParse
+
+    silenceApp(workDir)
+    logIngest.workerCount = max(1, args.workers)
+    logDir = rtfParse.TUBEPRO_LOG_PATH
+    os.makedirs(logDir, exist_ok=True)
+
+    startTime = time.perf_counter()
+    if args.logs:
+        dataset = {"source": str(args.logs)}
+        for rtfFile in args.logs.glob("*.rtf"):
+            shutil.copy2(rtfFile, logDir)
+    else:
+        dataset = {
+            "source":         "synthetic",
+            "days":           args.days,
+            "laserFileCount": args.laser_files,
+            "jobCount":       args.jobs,
+            "loopCount":      args.loops,
+            "noiseRatio":     args.noise,
+            "fillerCount":    args.filler,
+            "seed":           args.seed,
+        }
+        tubeProLogSynth.generateFromArguments(logDir, args)
+    rtfFiles = sorted(logDir.glob("*.rtf"))
+    byteCount = sum(rtfFile.stat().st_size for rtfFile in rtfFiles)
+    dataset["preparationSeconds"] = round(time.perf_counter() - startTime, 4)
+
+    stages, lineCount = measureStages(rtfFiles, byteCount, workDir)
+    dataset.update({
+        "logCount":  len(rtfFiles),
+        "sizeMb":    round(byteCount / MB, 2),
+        "lineCount": lineCount,
+    })
+    endToEnd = measureEndToEnd(rtfFiles, byteCount, lineCount)
+    return {
+        "version":   config.VERSION,
+        "timeStamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python":    platform.python_version(),
+        "platform":  platform.platform(),
+        "workers":   logIngest.workerCount,
+        "dataset":   dataset,
+        "stages":    stages,
+        "endToEnd":  endToEnd,
+        "peakRssMb": round(getPeakRss() / MB, 1),
+    }
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(
+        description="Benchmarks the TubePro log parsing and writes the results as JSON."
+    )
+    argParser.add_argument("-o", "--out", type=Path, default=Path("benchmark.json"), help="path to the JSON report")
+    argParser.add_argument("--logs", type=Path, help="benchmark copies of the rtf logs of this directory instead of synthetic ones")
+    argParser.add_argument("--work-dir", type=Path, help="directory holding the logs and the cache, a temporary one by default")
+    argParser.add_argument("--keep", action="store_true", help="keep the work directory")
+    argParser.add_argument("-w", "--workers", type=int, default=1, help="number of processes ingesting logs in parallel")
+    tubeProLogSynth.addArguments(argParser)
+    args = argParser.parse_args()
+
+    workDir = args.work_dir or Path(tempfile.mkdtemp(prefix="ottoLaserCuttingBenchmark"))
+    os.makedirs(workDir, exist_ok=True)
+    try:
+        report = run(args, workDir)
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(workDir, ignore_errors=True)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(json.dumps(report, ensure_ascii=False, indent=4))
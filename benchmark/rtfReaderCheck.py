@@ -0,0 +1,140 @@
+# File: rtfReaderCheck
+# Description: Checks that the rtf reader streaming TubePro logs gives the lines
+# striprtf gives, for any chunk size and when resuming from the offset it reports,
+# and reports the result as JSON
+import os
+import sys
+import json
+import random
+import platform
+import argparse
+import datetime
+import tempfile
+from pathlib import Path
+sys.path.append(str(
+    Path(
+        Path(__file__).parent.parent,
+        "ottoLaserCutting"
+        )
+    )
+)
+
+import parseBenchmark
+import tubeProLogSynth
+
+CHUNK_SIZES = [1, 2, 3, 7, 64, 4096]
+
+
+def readLines(rtfPath: Path, encoding: str, codePage: str, chunkSize: int) -> list:
+    """
+    Reads every line of a log in one go, the remainder included as
+    `iterRtfLines` does.
+    """
+    import rtfReader
+
+    with open(rtfPath, "rb") as f:
+        reader = rtfReader.RtfLineReader(f, encoding=encoding, codePage=codePage, chunkSize=chunkSize)
+        return list(reader) + [reader.remainder]
+
+
+def readResuming(rtfPath: Path, encoding: str, codePage: str, cutOffset: int, chunkSize: int) -> list:
+    """
+    Reads the lines of a log up to cutOffset, then the rest from the offset the
+    reader reported, the way `logIngest.ingest` picks up appended bytes.
+    """
+    import rtfReader
+
+    with open(rtfPath, "rb") as f:
+        reader = rtfReader.RtfLineReader(
+            f, encoding=encoding, codePage=codePage, endOffset=cutOffset, chunkSize=chunkSize
+        )
+        lines = list(reader)
+        f.seek(reader.lineEnd)
+        # Tails come without the rtf header and start inside the document group
+        reader = rtfReader.RtfLineReader(
+            f, encoding=encoding, codePage=codePage, groupDepth=1 if reader.lineEnd else 0, chunkSize=chunkSize
+        )
+        return lines + list(reader) + [reader.remainder]
+
+
+def checkLog(rtfPath: Path, cutCount: int, rand: random.Random) -> dict:
+    import logIngest
+    import rtfReader
+    from striprtf.striprtf import rtf_to_text
+
+    with open(rtfPath, "rb") as f:
+        raw = f.read()
+    encoding = logIngest.getEncoding(str(rtfPath)) or "utf-8"
+    codePageMatch = logIngest.codePagePat.search(raw[:logIngest.HEAD_DIGEST_SIZE])
+    codePage = codePageMatch.group(1).decode() if codePageMatch else ""
+    # What the logs used to be parsed with
+    expected = rtf_to_text(raw.decode(encoding)).split("\n")
+
+    mismatches = []
+    with open(rtfPath, "rb") as f:
+        if list(rtfReader.iterRtfLines(f, encoding, codePage)) != expected:
+            mismatches.append({"chunkSize": rtfReader.CHUNK_SIZE})
+    for chunkSize in CHUNK_SIZES:
+        if readLines(rtfPath, encoding, codePage, chunkSize) != expected:
+            mismatches.append({"chunkSize": chunkSize})
+
+    cutOffsets = sorted(rand.randrange(1, len(raw)) for _ in range(cutCount))
+    for cutOffset in cutOffsets:
+        for chunkSize in (1, 7, rtfReader.CHUNK_SIZE):
+            if readResuming(rtfPath, encoding, codePage, cutOffset, chunkSize) != expected:
+                mismatches.append({"chunkSize": chunkSize, "cutOffset": cutOffset})
+    return {
+        "path":       rtfPath.name,
+        "size":       len(raw),
+        "lineCount":  len(expected),
+        "cutCount":   len(cutOffsets),
+        "mismatches": mismatches[:10],
+    }
+
+
+def run(args: argparse.Namespace, workDir: Path) -> dict:
+    """
+    Checks the rtf reader against striprtf on synthetic logs.
+
+    Returns:
+        dict: The report.
+    """
+    # logIngest reads the configuration when imported, the machine's one may be missing
+    os.environ["OTTO_LASER_CUTTING_CONFIG"] = str(parseBenchmark.writeConfiguration(workDir))
+
+    logDir = Path(workDir, "logs")
+    logDir.mkdir()
+    summaries = tubeProLogSynth.generate(
+        logDir, days=args.days, jobCount=args.jobs, loopCount=args.loops, seed=args.seed
+    )
+    rand = random.Random(args.seed)
+    logs = [checkLog(summary.path, args.cuts, rand) for summary in summaries]
+    return {
+        "timeStamp":    datetime.datetime.now().isoformat(timespec="seconds"),
+        "python":       platform.python_version(),
+        "platform":     platform.platform(),
+        "seed":         args.seed,
+        "chunkSizes":   CHUNK_SIZES,
+        "logs":         logs,
+        "identicalChk": not any(log["mismatches"] for log in logs),
+    }
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(
+        description="Checks the rtf reader against striprtf on synthetic TubePro logs and writes the results as JSON."
+    )
+    argParser.add_argument("-o", "--out", type=Path, default=Path("rtfReaderCheck.json"), help="path to the JSON report")
+    argParser.add_argument("--days", type=int, default=3, help="number of synthetic logs")
+    argParser.add_argument("--jobs", type=int, default=3, help="number of jobs per log")
+    argParser.add_argument("--loops", type=int, default=8, help="number of loops per job")
+    argParser.add_argument("--cuts", type=int, default=20, help="number of offsets per log reading is resumed from")
+    argParser.add_argument("--seed", type=int, default=0, help="seed of the synthetic logs and offsets")
+    args = argParser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ottoLaserCuttingRtfReaderCheck") as workDir:
+        report = run(args, Path(workDir))
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(json.dumps(report, ensure_ascii=False, indent=4))
+    sys.exit(0 if report["identicalChk"] else 1)
@@ -0,0 +1,282 @@
+# File: tubeProLogSynth
+# Description: Writes synthetic TubePro rtf logs for benchmarking the log parsing
+import os
+import random
+import argparse
+import datetime
+from typing import NamedTuple, Optional
+from pathlib import Path
+
+RTF_HEADER = (
+    "{\\rtf1\\ansi\\ansicpg936\\deff0\\nouicompat\\deflang1033\\deflangfe2052"
+    "{\\fonttbl{\\f0\\fnil\\fcharset134 \\'cb\\'ce\\'cc\\'e5;}}\r\n"
+    "{\\colortbl ;\\red0\\green0\\blue0;\\red255\\green0\\blue0;}\r\n"
+    "\\viewkind4\\uc1\\pard\\lang2052\\f0\\fs18 "
+)
+RTF_FOOTER = "}\r\n\x00"
+LASER_FILE_DIR = "D:\\欧拓图纸\\切割文件\\"
+WORKPIECE_NAMES = ["主体管", "横梁", "立柱", "连接管", "支撑管", "扶手管"]
+MATERIALS = ["SUS", "Q235", "AL"]
+PAUSE_MESSAGES = ["暂停加工", "继续加工"]
+ALERT_MESSAGES = ["报警：X轴伺服报警", "报警：切割头碰撞", "报警：气压不足", "警报: 强制回原点"]
+FILLER_MESSAGES = ["寻边完成", "穿孔完成，开始切割", "激光器出光", "卡盘夹紧", "送料完成"]
+WORKDAY_START = datetime.timedelta(hours=7, minutes=30)
+# Number of bytes buffered before they're written out
+FLUSH_SIZE = 1024 * 1024
+
+
+def rtfEscape(text: str, encoding: str = "gbk") -> str:
+    """
+    Escapes text the way TubePro writes it into an rtf log: characters beyond
+    ASCII become `\\'xx` escapes of their bytes in the code page, and
+    characters the code page lacks become `\\uN?` escapes.
+    """
+    escaped = []
+    for char in text:
+        if ord(char) < 128:
+            escaped.append("\\" + char if char in "\\{}" else char)
+            continue
+        try:
+            escaped.append("".join(f"\\'{byte:02x}" for byte in char.encode(encoding)))
+        except UnicodeEncodeError:
+            codePoint = ord(char)
+            # Rtf takes signed 16-bit values
+            escaped.append(f"\\u{codePoint - 65536 if codePoint > 32767 else codePoint}?")
+    return "".join(escaped)
+
+
+class LaserFile(NamedTuple):
+    """
+    A synthetic laser file.
+
+    Attributes:
+        path (str): Path TubePro logs when the file gets opened.
+        workpieceCount (int): Number of workpieces nested in a loop.
+        cycleTime (float): Mean duration of a loop in seconds.
+    """
+    path:           str
+    workpieceCount: int
+    cycleTime:      float
+
+
+class LogSummary(NamedTuple):
+    path:      Path
+    size:      int
+    lineCount: int
+
+
+def createLaserFiles(count: int, rng: random.Random) -> list:
+    laserFiles = []
+    for laserFileIdx in range(count):
+        diameter  = rng.choice([16, 19, 22, 25, 32, 38, 50])
+        thickness = rng.choice([0.8, 1.0, 1.2, 1.5, 2.0])
+        length    = rng.randrange(200, 3000, 10)
+        laserFiles.append(LaserFile(
+            f"{LASER_FILE_DIR}{laserFileIdx + 101:03d} "
+            f"{rng.choice(WORKPIECE_NAMES)} {rng.choice(MATERIALS)} "
+            f"∅{diameter}_T{thickness}_L{length}.zx",
+            rng.randint(1, 6),
+            rng.uniform(20, 120),
+        ))
+    return laserFiles
+
+
+class LogWriter:
+    """
+    Writes the text lines of an rtf log, escaping only the non-ASCII message
+    parts once so that logs of several GB are written quickly.
+    """
+    def __init__(self, rtfFile: Path):
+        self.f = open(rtfFile, "wb")
+        self.buffer = [RTF_HEADER]
+        self.bufferSize = len(RTF_HEADER)
+        self.size = 0
+        self.lineCount = 0
+        self.escapes = {}
+
+    def escape(self, text: str) -> str:
+        if text not in self.escapes:
+            self.escapes[text] = rtfEscape(text)
+        return self.escapes[text]
+
+    def write(self, timeObj: datetime.datetime, *parts, alertChk: bool = False) -> None:
+        """
+        Writes a line made of a timestamp and parts. Strings are escaped, other
+        parts are written as they are.
+        """
+        line = "".join(
+            self.escape(part) if isinstance(part, str) else str(part)
+            for part in parts
+        )
+        line = f"({timeObj:%m/%d %H:%M:%S}){line}\\par\r\n"
+        if alertChk:
+            line = "\\cf2 " + line + "\\cf1 "
+        self.buffer.append(line)
+        self.bufferSize += len(line)
+        self.lineCount += 1
+        if self.bufferSize >= FLUSH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        data = "".join(self.buffer).encode("ascii")
+        self.f.write(data)
+        self.size += len(data)
+        self.buffer = []
+        self.bufferSize = 0
+
+    def close(self) -> None:
+        self.buffer.append(RTF_FOOTER)
+        self.flush()
+        self.f.close()
+
+
+def generateLog(
+    rtfFile: Path,
+    day: datetime.date,
+    laserFiles: list,
+    rng: random.Random,
+    jobCount: int = 8,
+    loopCount: int = 40,
+    noiseRatio: float = 0.02,
+    fillerCount: int = 2,
+    targetSize: int = 0,
+) -> LogSummary:
+    """
+    Writes the log of a working day. A job opens a laser file, announces the
+    scheduled count and cuts it loop after loop, every loop logging a segment
+    line per workpiece followed by the number of workpieces cut so far.
+
+    Args:
+        rtfFile (Path): Path to the log.
+        day (datetime.date): Day the log starts at.
+        laserFiles (list[LaserFile]): Laser files the jobs pick from.
+        rng (random.Random): Random generator.
+        jobCount (int): Number of jobs.
+        loopCount (int): Mean number of loops per job.
+        noiseRatio (float): Probability of a pause or an alert per loop.
+        fillerCount (int): Number of lines without any record per loop.
+        targetSize (int): Size in bytes the log is grown to with more jobs, the
+            log isn't grown when 0. Jobs of a large log go on past midnight.
+
+    Returns:
+        LogSummary: Path, size and number of text lines of the log.
+    """
+    timeObj = datetime.datetime.combine(day, datetime.time()) + WORKDAY_START
+    writer = LogWriter(rtfFile)
+    jobIdx = 0
+    while jobIdx < jobCount or writer.size + writer.bufferSize < targetSize:
+        jobIdx += 1
+        laserFile = rng.choice(laserFiles)
+        timeObj += datetime.timedelta(seconds=rng.uniform(60, 300))
+        # The same laser file is sometimes reopened with the _X1 suffix
+        path = laserFile.path.replace(".zx", "_X1.zx") if rng.random() < 0.1 else laserFile.path
+        writer.write(timeObj, "打开文件：", path)
+        jobLoopCount = max(1, round(rng.gauss(loopCount, loopCount / 4)))
+        writer.write(timeObj, "任务开始，零件切割计划数目", jobLoopCount * laserFile.workpieceCount)
+
+        for loopIdx in range(1, jobLoopCount + 1):
+            writer.write(timeObj, "开始加工，循环计数：", loopIdx, "，X轴坐标 ", round(rng.uniform(0, 1000), 3))
+            segmentInterval = laserFile.cycleTime / laserFile.workpieceCount
+            for segmentIdx in range(1, laserFile.workpieceCount + 1):
+                writer.write(timeObj, "总零件数:", laserFile.workpieceCount, ", 当前零件序号:", segmentIdx)
+                timeObj += datetime.timedelta(seconds=rng.gauss(segmentInterval, segmentInterval / 20))
+            for _ in range(fillerCount):
+                writer.write(timeObj, rng.choice(FILLER_MESSAGES))
+            if rng.random() < noiseRatio:
+                if rng.random() < 0.5:
+                    writer.write(timeObj, PAUSE_MESSAGES[0])
+                    timeObj += datetime.timedelta(seconds=rng.uniform(30, 900))
+                    writer.write(timeObj, PAUSE_MESSAGES[1])
+                else:
+                    writer.write(timeObj, rng.choice(ALERT_MESSAGES), alertChk=True)
+                    timeObj += datetime.timedelta(seconds=rng.uniform(10, 300))
+            writer.write(timeObj, "加工结束，已切割零件数目", loopIdx * laserFile.workpieceCount)
+    writer.close()
+
+    # The log was last written at its last line
+    os.utime(rtfFile, (timeObj.timestamp(), timeObj.timestamp()))
+    return LogSummary(rtfFile, writer.size, writer.lineCount)
+
+
+def generate(
+    dstDir: Path,
+    days: int = 30,
+    laserFileCount: int = 20,
+    jobCount: int = 8,
+    loopCount: int = 40,
+    noiseRatio: float = 0.02,
+    fillerCount: int = 2,
+    size: int = 0,
+    seed: int = 0,
+    lastDay: Optional[datetime.date] = None,
+) -> list:
+    """
+    Writes a log per day for the given number of days up to lastDay. The same
+    seed always produces the same logs.
+
+    Args:
+        dstDir (Path): Directory the logs are written to.
+        size (int): Total size in bytes the logs are grown to, 0 leaves the size
+            to the number of jobs and loops.
+        lastDay (Optional[datetime.date]): Day of the last log, today when omitted.
+        Others: See `generateLog`.
+
+    Returns:
+        list[LogSummary]: Summaries of the logs from the oldest on.
+    """
+    rng = random.Random(seed)
+    lastDay = lastDay or datetime.date.today()
+    laserFiles = createLaserFiles(laserFileCount, rng)
+    os.makedirs(dstDir, exist_ok=True)
+    summaries = []
+    for dayIdx in range(days - 1, -1, -1):
+        day = lastDay - datetime.timedelta(days=dayIdx)
+        summaries.append(generateLog(
+            Path(dstDir, f"{day:%Y%m%d}.rtf"),
+            day,
+            laserFiles,
+            rng,
+            jobCount=jobCount,
+            loopCount=loopCount,
+            noiseRatio=noiseRatio,
+            fillerCount=fillerCount,
+            targetSize=size // days,
+        ))
+    return summaries
+
+
+def addArguments(argParser: argparse.ArgumentParser) -> None:
+    argParser.add_argument("--days", type=int, default=30, help="number of daily logs")
+    argParser.add_argument("--laser-files", type=int, default=20, help="number of distinct laser files")
+    argParser.add_argument("--jobs", type=int, default=8, help="minimum number of jobs per log")
+    argParser.add_argument("--loops", type=int, default=40, help="mean number of loops per job")
+    argParser.add_argument("--noise", type=float, default=0.02, help="probability of a pause or an alert per loop")
+    argParser.add_argument("--filler", type=int, default=2, help="number of lines without records per loop")
+    argParser.add_argument("--size", type=float, default=0, help="total size of the logs in MB, e.g. 1024 for 1 GB")
+    argParser.add_argument("--seed", type=int, default=0)
+
+
+def generateFromArguments(dstDir: Path, args: argparse.Namespace) -> list:
+    return generate(
+        dstDir,
+        days=args.days,
+        laserFileCount=args.laser_files,
+        jobCount=args.jobs,
+        loopCount=args.loops,
+        noiseRatio=args.noise,
+        fillerCount=args.filler,
+        size=int(args.size * 1024 * 1024),
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(description="Writes synthetic TubePro rtf logs.")
+    argParser.add_argument("dstDir", type=Path, help="directory the logs are written to")
+    addArguments(argParser)
+    args = argParser.parse_args()
+
+    summaries = generateFromArguments(args.dstDir, args)
+    totalSize = sum(summary.size for summary in summaries)
+    totalLineCount = sum(summary.lineCount for summary in summaries)
+    print(f"{len(summaries)} logs, {totalSize / 1024 / 1024:.1f} MB, {totalLineCount} lines")
@@ -1,24 +1,58 @@
 import config
-import rtfParse
-import hotkey
-import gui
-import tubeProMonitor
+import logIngest
 
 import os
 import sys
 import argparse
+import multiprocessing
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    # Imported here so that log ingesting worker processes, which import this
+    # module again on Windows, don't bring up another GUI
+    import rtfParse
+    import hotkey
+    import gui
+    import tubeProMonitor
+    import logWatch
+    import ocrEngine
+    import cutRecord
+
     argParser = argparse.ArgumentParser()
     argParser.add_argument("-D", "--dev", action="store_true")
+    argParser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="number of processes ingesting TubePro logs in parallel"
+    )
+    argParser.add_argument(
+        "--no-watch", action="store_true",
+        help="don't regenerate the laser profile in the background as TubePro logs grow"
+    )
+    argParser.add_argument(
+        "--no-ocr-warmup", action="store_true",
+        help="load the OCR models on the first cut record instead of at startup"
+    )
     args = argParser.parse_args()
+    logIngest.workerCount = max(1, args.workers)
     listener = hotkey.keyboard.Listener(
         on_press=hotkey.onPress, on_release=hotkey.onRelease
     )
     listener.start()
     if os.getlogin() != "OT03":
         tubeProMonitor.monitor.toggleMonitoring() # type: ignore
+    if not args.no_watch:
+        logWatch.watcher = logWatch.LogWatcher()
+        logWatch.watcher.start()
+
+    # Cut records are saved and journaled by the record worker, then written
+    # into the workbook in the background
+    cutRecord.materializer = cutRecord.JournalMaterializer()
+    cutRecord.materializer.start()
+    cutRecord.recordWorker = cutRecord.RecordWorker()
+    cutRecord.recordWorker.start()
+    if not args.no_ocr_warmup:
+        ocrEngine.warmUpThread = ocrEngine.warmUp()
 
     gui.dpg.show_viewport()
     gui.dpg.start_dearpygui()
@@ -0,0 +1,134 @@
+# File: analyze
+# Description: Headless command line running the TubePro log analyses, without
+# importing the GUI, win32 or OCR stacks
+#
+# Usage:
+#     python -m ottoLaserCutting.analyze logs --days 35 --out x.xlsx
+#     python -m ottoLaserCutting.analyze logs --mode accumulated
+#     python -m ottoLaserCutting.analyze simplify --days 7 --out sessions.xlsx
+#     python -m ottoLaserCutting.analyze export --days 365 --format parquet --out tables
+#     python -m ottoLaserCutting.analyze watch --out x.xlsx
+#     python -m ottoLaserCutting.analyze eta --laser-file "101 主体管.zzx" --count 125
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from pathlib import Path
+# Modules of the app are imported by their flat names, as when run as a script
+sys.path.append(str(Path(__file__).parent))
+
+
+def main(argv: list = None) -> int:
+    """
+    Runs an analysis from command line arguments.
+
+    Returns:
+        int: Exit code, 1 if there was no log to analyze.
+    """
+    argParser = argparse.ArgumentParser(
+        prog="python -m ottoLaserCutting.analyze",
+        description="Analyzes TubePro logs without the GUI."
+    )
+    argParser.add_argument(
+        "command", choices=["logs", "simplify", "export", "watch", "eta"],
+        help="logs: write the laser profile of cycle times, "
+             "simplify: write the simplified logs and export the cutting sessions, "
+             "export: write the events, cycle time statistics, cutting sessions and cut records as tables, "
+             "watch: keep the accumulated laser profile up to date as the logs grow, until interrupted, "
+             "eta: estimate the time left to cut workpieces of a laser file from the cycle time profile"
+    )
+    argParser.add_argument(
+        "-m", "--mode", choices=["period", "accumulated"], default="period",
+        help="logs only, period: a worksheet per log, accumulated: one worksheet for all logs"
+    )
+    argParser.add_argument(
+        "-d", "--days", type=int,
+        help="time window in days, 60 for accumulated logs and 1 otherwise by default"
+    )
+    argParser.add_argument(
+        "--debounce", type=float, default=30,
+        help="watch only, seconds the logs have to stay quiet before the laser profile is regenerated"
+    )
+    argParser.add_argument("--laser-file", help="eta only, laser file name or path")
+    argParser.add_argument(
+        "--count", type=int, default=100,
+        help="eta only, number of workpieces left to cut"
+    )
+    argParser.add_argument(
+        "-f", "--format", action="append", choices=["csv", "jsonl", "parquet"],
+        help="export only, table format, can be repeated, all of them by default"
+    )
+    argParser.add_argument(
+        "-o", "--out", type=Path,
+        help="path to the Excel file written, or to the directory of the tables exported"
+    )
+    argParser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="number of processes ingesting TubePro logs in parallel"
+    )
+    argParser.add_argument("-c", "--config", type=Path, help="path to the configuration file")
+    args = argParser.parse_args(argv)
+
+    if args.config:
+        os.environ["OTTO_LASER_CUTTING_CONFIG"] = str(args.config.resolve())
+    # Imported once the configuration is known
+    import util
+    import logIngest
+    import rtfParse
+    import tableExport
+    import logWatch
+    import cycleProfile
+
+    util.headlessChk = True
+    logIngest.workerCount = max(1, args.workers)
+    if args.command == "eta":
+        if not args.laser_file:
+            argParser.error("eta needs --laser-file")
+        profile = cycleProfile.getCycleProfile()
+        # Built once from the accumulated logs, then kept up to date by the laser profile
+        if not profile.entries:
+            rtfParse.accumulate(args.days or rtfParse.ACCUMULATION_DAYS)
+        eta = profile.estimate(args.laser_file, args.count)
+        if eta is None:
+            util.pr(f'No cycle time profile for "{args.laser_file}"')
+            return 1
+        util.pr(cycleProfile.describeEta(eta))
+        return 0
+    elif args.command == "watch":
+        watcher = logWatch.LogWatcher(
+            days=args.days or rtfParse.ACCUMULATION_DAYS,
+            dstPath=args.out or rtfParse.ACCUMULATED_PROFILE_PATH,
+            debounceSeconds=args.debounce,
+        )
+        watcher.regenerate()
+        watcher.start()
+        try:
+            # Joined with a timeout so that Ctrl+C gets through on Windows
+            while watcher.thread and watcher.thread.is_alive():
+                watcher.thread.join(1)
+        except KeyboardInterrupt:
+            watcher.stop()
+        return 0
+    elif args.command == "export":
+        savePath = tableExport.exportPeriod(
+            args.days or 1,
+            args.out or tableExport.EXPORT_DIR_PATH,
+            args.format or tableExport.FORMATS
+        )
+    elif args.command == "simplify":
+        savePath = rtfParse.simplifyPeriod(args.days or 1, args.out)
+    elif args.mode == "accumulated":
+        savePath = rtfParse.parseAccu(
+            args.days or rtfParse.ACCUMULATION_DAYS,
+            args.out or rtfParse.ACCUMULATED_PROFILE_PATH
+        )
+    else:
+        savePath = rtfParse.parsePeriod(args.days or 1, args.out or rtfParse.LASER_PROFILE_PATH)
+
+    return 0 if savePath else 1
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
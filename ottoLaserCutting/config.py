@@ -4,6 +4,7 @@
 VERSION     = "0.0.156"
 LASTUPDATED = "2025-06-17"
 
+import os
 import sys
 import locale
 import json
@@ -81,7 +82,11 @@ if getattr(sys, 'frozen', False):
 else:
     BUNDLE_MODE = False
     EXECUTABLE_DIR = Path(__file__).parent.parent
-EXTERNAL_CONFIG = Path(EXECUTABLE_DIR, "configuration.json")
+# The configuration can be pointed elsewhere, e.g. by the benchmark running on synthetic logs
+EXTERNAL_CONFIG = Path(
+    os.environ.get("OTTO_LASER_CUTTING_CONFIG")
+    or Path(EXECUTABLE_DIR, "configuration.json")
+)
 if not EXTERNAL_CONFIG.exists():
     raise FileExistsError(f"Can't find external configuration at: {str(EXTERNAL_CONFIG)}.")
 LAUNCH_TIME = datetime.now()
@@ -105,3 +110,7 @@ with open(EXTERNAL_CONFIG, "r", encoding="utf-8") as f:
     )
 
 LASER_FILE_DIR_PATH  = Path(cfg.paths.otto, r"切割文件")
+CACHE_DIR_PATH       = Path(cfg.paths.otto, r"辅助程序/OttoLaserCutting/cache")
+CUT_RECORD_PATH      = Path(cfg.paths.otto, r"存档/开料记录.xlsx")
+# Cut records not written into the workbook yet only live here, kept out of the cache directory
+CUT_RECORD_JOURNAL_PATH = Path(cfg.paths.otto, r"辅助程序/OttoLaserCutting/开料记录.sqlite3")
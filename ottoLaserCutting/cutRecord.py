@@ -1,29 +1,50 @@
 import util
+import config
 from util import pr
 from config import cfg
 
 import keySet
+import ocrEngine
+import ocrCache
+import ocrFixRules
+import screenshotIndex
+import cutRecordJournal
 
 import shutil
 import datetime
 import time
 import os
+import threading
+import queue
 import re
 import numpy
 import win32api, win32con, win32gui, win32process
 import psutil
-import easyocr
 import json
 from PIL import Image, ImageFilter, ImageGrab
+from contextlib import closing
 from openpyxl import Workbook, load_workbook
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
-from typing import Optional, Tuple
+from typing import Iterator, NamedTuple, Optional, Tuple
 from pathlib import Path
 
 SCREENSHOT_DIR_PATH = Path(cfg.paths.otto, r"存档/截图")
-CUT_RECORD_PATH     = Path(cfg.paths.otto, r"存档/开料记录.xlsx")
+CUT_RECORD_PATH     = config.CUT_RECORD_PATH
 LASER_OCR_FIX_PATH  = Path(cfg.paths.otto, r"辅助程序/激光名称OCR修复规则.json")
+OCR_PROGRESS_PATH   = Path(config.CACHE_DIR_PATH, "截图识别.json")
+# Records read by a batch are saved to the progress file every so many screenshots
+OCR_PROGRESS_SAVE_INTERVAL = 10
+# Texts and records recognized by a batch are written to the OCR cache once so many are pending
+OCR_CACHE_WRITE_INTERVAL = 30
+# Screenshots whose regions are cropped at once by a batch, about 110 KB of regions each
+OCR_CROP_CHUNK_SIZE = 32
+# Cut records journaled within this delay are written into the workbook by the same batch
+MATERIALIZE_DELAY_SECONDS = 2
+# Cut records are written again this often while the workbook is in use
+MATERIALIZE_RETRY_SECONDS = 60
+# Screenshots waiting for the record worker, a few megabytes each
+RECORD_QUEUE_SIZE = 16
 MESSAGEBOX_TITLE = "激光开料"
 pr = util.pr
 
@@ -44,29 +65,70 @@ def getWorkbook(dstPath: Path) -> Tuple[Workbook, Path]:
         finally:
             return wb, dstPath
     else:
-        return Workbook(), dstPat
+        return Workbook(), dstPath
 
 
 screenshotPaths = []
+# Held while the workbook is loaded, modified and saved, so that the materializer
+# and the updates of the GUI don't overwrite each other's records
+workbookLock = threading.RLock()
+# Date the workbook was last backed up by `materializeJournal`
+lastBackupDate = None
 
-def findMessageBoxWindow() -> Optional[int]:
-    print("Finding prompted window")
-    startTime = time.time()
-    timeout = 10  # seconds
-    while time.time() - startTime < timeout:
-        hwnd = win32gui.FindWindow(None, MESSAGEBOX_TITLE)
-        if hwnd != 0:
-            return hwnd
 
-        time.sleep(0.5)  # Poll every 100 milliseconds
+def createRecordSheet(wb: Workbook, sheetName: str) -> Worksheet:
+    """
+    Creates the sheet of a month of cut records, with its headers, as the first sheet.
+    """
+    ws = wb.create_sheet(sheetName, 0)
+    ws["A1"].value = "排样文件"
+    ws["B1"].value = "完成时间"
+    ws["C1"].value = "单号"
+    ws["D1"].value = "型号(数量)"
+    ws["E1"].value = "已切量/需求量"
+    ws["F1"].value = "截图文件"
+    return ws
+
+def findTubeProWindow() -> Optional[Tuple[int, str]]:
+    """
+    Finds the main window of TubePro among the visible windows.
+
+    Returns:
+        Optional[Tuple[int, str]]: Handle and title of the window, None if
+        TubePro isn't running.
+    """
+    hwndTitles = {}
+    def winEnumHandler(hwnd, ctx):
+        if win32gui.IsWindowVisible(hwnd):
+            windowText = win32gui.GetWindowText(hwnd)
+            if windowText:
+                hwndTitles[hwnd] = windowText
+        return True
+
+    win32gui.EnumWindows(winEnumHandler, None)
+
+    for hwnd, title in hwndTitles.items():
+        if title.startswith("TubePro"):
+            _, pId = win32process.GetWindowThreadProcessId(hwnd)
+            pName = psutil.Process(pId).name()
+            if pName == "TubePro.exe":
+                return hwnd, title
     return None
 
 
+def getPartFileName(tubeProTitle: str) -> str:
+    """
+    Extracts the name of the laser file open in TubePro from its title.
+    """
+    return re.sub(r"^TubePro(\(.+?\))? (.+\.zzx).*?$", r"\2", tubeProTitle, re.IGNORECASE)
+
+
 def initSheetFromScreenshots(wb: Workbook) -> None:  # {{{
     """
     Initializes workbook sheets from screenshot files.
 
-    Scans the screenshot directory for PNG files with specific dimensions (1080x1920).
+    Lists the screenshots of the screenshot directory, PNG files with specific
+    dimensions (1080x1920), from the screenshot index without opening any of them.
     For each unique year-month prefix found in screenshot filenames, creates a new sheet
     in the workbook with standard headers if it doesn't already exist.
 
@@ -81,83 +143,52 @@ def initSheetFromScreenshots(wb: Workbook) -> None:  # {{{
     - Cut/required quantity
     - Screenshot file
     """
-    yearMonthPrefix = []
     sheetNames = wb.sheetnames
-    for p in SCREENSHOT_DIR_PATH.iterdir():
-        if p.suffix == ".png":
-            with Image.open(p) as img:
-                width, height = img.size
-                if width != 1080 or height != 1920:
-                    continue
-
-            screenshotPaths.append(p)
-            dateStamp = p.stem[5:12]
-            if dateStamp not in yearMonthPrefix:
-                yearMonthPrefix.append(dateStamp)
+    index = screenshotIndex.getScreenshotIndex(SCREENSHOT_DIR_PATH)
+    screenshotPaths[:] = index.query()
+    yearMonthPrefix = index.getMonths()
 
     for n in yearMonthPrefix:
         if n not in sheetNames:
-            ws = wb.create_sheet(n, 0)
-            ws["A1"].value = "排样文件"
-            ws["B1"].value = "完成时间"
-            ws["C1"].value = "单号"
-            ws["D1"].value = "型号(数量)"
-            ws["E1"].value = "已切量/需求量"
-            ws["F1"].value = "截图文件" # }}}
+            createRecordSheet(wb, n) # }}}
 
 
 def takeScreenshot(screenshot: Optional[Image.Image] = None) -> None:  # {{{
     """
     Takes a screenshot and records cutting information in an Excel file.
 
-    This function handles screenshot capture and logging of laser cutting operations:
+    Only the capture happens on the calling thread, the keyboard hook or the
+    monitor, everything else being queued for the record worker:
     1. Checks for modifier keys (Ctrl/Shift) to trigger alternative actions
     2. Identifies the active TubePro window to get part filename
     3. Captures screen if no image is provided
-    4. Saves screenshot and records metadata (timestamp, filename) in Excel
-    5. Shows success notification
+    4. Queues the screenshot, see `recordScreenshot`
 
     Args:
         screenshot: Optional pre-captured image to use instead of grabbing new screenshot
 
     Returns:
         None: Opens the record file or performs relinking based on key modifiers,
-              otherwise shows success message
+              otherwise the record is taken by the record worker
 
     Note:
         - Requires TubePro.exe to be running for normal operation
-        - Maintains Excel records with specific columns (A1-F1 headers)
-        - Copies records to shared location when not running on OT03 machine
     """
     if "ctrl" in keySet.keys:
-        return os.startfile(CUT_RECORD_PATH)
+        return submit(openCutRecords)
     elif "shfit" in keySet.keys:
-        return relinkScreenshots()
-    cutRecordPath = CUT_RECORD_PATH
+        return submit(relinkScreenshots)
 
     # Get laser file info
-    hwndTitles = {}
-    def winEnumHandler(hwnd, ctx):
-        if win32gui.IsWindowVisible(hwnd):
-            windowText = win32gui.GetWindowText(hwnd)
-            if windowText:
-                hwndTitles[hwnd] = windowText
-        return True
-
-    win32gui.EnumWindows(winEnumHandler, None)
-
     partFileName = ""
-    for hwnd, title in hwndTitles.items():
-        if title.startswith("TubePro"):
-            _, pId = win32process.GetWindowThreadProcessId(hwnd)
-            pName = psutil.Process(pId).name()
-            if pName == "TubePro.exe":
-                partFileName = re.sub(r"^TubePro(\(.+?\))? (.+\.zzx).*?$", r"\2", title, re.IGNORECASE)
+    tubeProWindow = findTubeProWindow()
+    if tubeProWindow:
+        hwnd, title = tubeProWindow
+        partFileName = getPartFileName(title)
 
-                if win32gui.IsIconic(hwnd):
-                    win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-                win32gui.SetForegroundWindow(hwnd)
-                break
+        if win32gui.IsIconic(hwnd):
+            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+        win32gui.SetForegroundWindow(hwnd)
 
     if not partFileName:
         return pr("Screenshot taking is abort due to TubePro is not running.")
@@ -165,68 +196,155 @@ def takeScreenshot(screenshot: Optional[Image.Image] = None) -> None:  # {{{
     if not screenshot:
         screenshot = ImageGrab.grab()
 
-    # Check current foreground program
-    datetimeNow = datetime.datetime.now()
+    submit(recordScreenshot, screenshot, partFileName, datetime.datetime.now()) # }}}
+
+
+def recordScreenshot(screenshot: Image.Image, partFileName: str, datetimeNow: datetime.datetime) -> None:
+    """
+    Saves a screenshot taken by `takeScreenshot` and journals its metadata
+    (timestamp, filename), the journal being written into Excel in the
+    background, see `materializeJournal`. Then shows success notification.
+    """
     excelTimeStamp = datetimeNow.strftime("%Y/%m/%d %H:%M:%S")
-    screenshotPath = util.screenshotSave(screenshot, "屏幕截图", SCREENSHOT_DIR_PATH)
+    screenshotPath = util.screenshotSave(screenshot, "屏幕截图", SCREENSHOT_DIR_PATH, datetimeNow)
+
+    # The process count is read off the screenshot once written into the workbook
+    cutRecordJournal.append(cutRecordJournal.CutRecordEntry(
+        sheetName        = screenshotPath.stem[5:12],
+        partFileName     = partFileName,
+        timeStamp        = excelTimeStamp,
+        partProcessCount = None,
+        screenshotPath   = screenshotPath,
+    ))
+    if materializer and materializer.isRunning:
+        materializer.wake()
+    else:
+        materializeJournal()
 
-    wb, cutRecordPath = getWorkbook(cutRecordPath)
-    sheetName = screenshotPath.stem[5:12]
-    try:
-        ws = wb[sheetName]
-    except Exception:
-        ws = wb.create_sheet(sheetName, 0)
-        ws["A1"].value = "排样文件"
-        ws["B1"].value = "完成时间"
-        ws["C1"].value = "单号"
-        ws["D1"].value = "型号(数量)"
-        ws["E1"].value = "已切量/需求量"
-        ws["F1"].value = "截图文件"
-
-    # Using OCR to get process count
-    newRecord(ws, screenshotPath, partFileName, excelTimeStamp)
-    savePath = util.saveWorkbook(wb, cutRecordPath)
-
-    if os.getlogin() != "OT03":
-        shutil.copy2(savePath, Path(SCREENSHOT_DIR_PATH, "开料记录.xlsx"))
-
-    win32api.MessageBox(
-                None,
-                f"记录成功",
-                MESSAGEBOX_TITLE,
-                4096 + 64 + 0
-            )
+    notify("记录成功")
+
+
+def openCutRecords() -> None:
+    materializeJournal()
+    os.startfile(CUT_RECORD_PATH)
+
+
+def notify(message: str) -> None:
+    """
+    Shows a message box from a thread of its own, so that nothing waits for
+    it to be closed.
+    """
+    threading.Thread(
+        target=win32api.MessageBox,
+        args=(None, message, MESSAGEBOX_TITLE, 4096 + 64 + 0),
+        daemon=True
+    ).start()
     #   MB_SYSTEMMODAL==4096
     ##  Button Styles:
     ### 0:OK  --  1:OK|Cancel -- 2:Abort|Retry|Ignore -- 3:Yes|No|Cancel -- 4:Yes|No -- 5:Retry|No -- 6:Cancel|Try Again|Continue
     ##  To also change icon, add these values to previous number
     ### 16 Stop-sign  ### 32 Question-mark  ### 48 Exclamation-point  ### 64 Information-sign ('i' in a circle)
-# }}}
 
 
-def getImgInfo(p: Path) -> Tuple[str, str, str]:  # {{{
+class RecordWorker:
     """
-    Extracts and processes text information from an image file using OCR.
+    Runs the jobs of the cut records, saving screenshots, journaling and
+    opening or relinking the workbook, one after the other in a daemon
+    thread, so that the keyboard hook and the monitor return as soon as the
+    screenshot is captured. The queue is bounded by `queueSize`, a full queue
+    running the job on the submitting thread instead of dropping it.
 
     Args:
-        p (Path): Path to the image file to process.
+        queueSize (int): See `RECORD_QUEUE_SIZE`.
+    """
+    def __init__(self, queueSize: int = RECORD_QUEUE_SIZE):
+        self.jobs = queue.Queue(maxsize=queueSize)
+        self.isRunning = False
+        self.thread: Optional[threading.Thread] = None
+        self.jobCount = 0
+
+    def start(self) -> None:
+        if self.isRunning:
+            return
+        self.isRunning = True
+        self.thread = threading.Thread(target=self._workLoop, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops once the jobs queued so far are done.
+        """
+        self.isRunning = False
+        self.jobs.put(None)
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def submit(self, job, *args) -> bool:
+        """
+        Queues a job.
+
+        Returns:
+            bool: Whether the job got queued, False if it ran on the calling
+            thread since the queue is full.
+        """
+        try:
+            self.jobs.put_nowait((job, args))
+            return True
+        except queue.Full:
+            pr("Cut records are falling behind, taking this one right away.")
+            runJob(job, *args)
+            return False
+
+    def _workLoop(self) -> None:
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                break
+            job, args = item
+            runJob(job, *args)
+            self.jobCount += 1
 
-    Returns:
-        tuple: A 3-tuple containing:
-            - partFileName (str): Extracted and cleaned filename from image title
-            - partProcessCount (str): Extracted process count from image
-            - timeStamp (str): Extracted and formatted timestamp from image
 
-    The function performs the following operations:
-    1. Crops specific regions of interest from the image (title, process count, timestamp)
-    2. Checks for completion status via pixel color detection
-    3. Uses EasyOCR to extract text from image regions
-    4. Applies text cleaning and pattern substitutions
-    5. Handles different timestamp formats based on completion status
-    6. Removes illegal characters from all extracted text fields
+def runJob(job, *args) -> None:
+    try:
+        job(*args)
+    except Exception as e:
+        pr(f"Failed to take the cut record: {e}")
+
+
+def submit(job, *args) -> None:
     """
-    reader = easyocr.Reader(["ch_sim", "en"])
+    Queues a job for the record worker, or runs it right away when the worker
+    isn't running.
+    """
+    if recordWorker and recordWorker.isRunning:
+        recordWorker.submit(job, *args)
+    else:
+        runJob(job, *args)
+
+
+class ImgRegions(NamedTuple):
+    """
+    Regions of a TubePro screenshot the cut record is read from, as BGR arrays.
 
+    Attributes:
+        title: Title of TubePro, holding the laser file name.
+        processCount: Counter of the workpieces cut.
+        timeStamp: Time of the completion message, or of the last log lines.
+        targetCompletedChk (bool): Whether the screenshot shows a completion message.
+    """
+    title:              numpy.ndarray
+    processCount:       numpy.ndarray
+    timeStamp:          numpy.ndarray
+    targetCompletedChk: bool
+
+
+def cropImgRegions(p: Path) -> ImgRegions:
+    """
+    Crops the regions of interest off a screenshot and checks for completion
+    status via pixel color detection.
+    """
     with Image.open(p) as img:
         imgTitle        = img.crop((91, 0, 900, 25))
         imgProcessCount = img.crop((550, 1665, 765, 1685))
@@ -248,32 +366,42 @@ def getImgInfo(p: Path) -> Tuple[str, str, str]:  # {{{
             imgTimeStamp = img.crop((91, 1755, 185, 1864)).filter(ImageFilter.EDGE_ENHANCE)
             cvTimeStamp  = numpy.array(imgTimeStamp)[:, :, ::-1].copy()
 
-    titleRead = reader.readtext(cvTitle)
-    processCountRead = reader.readtext(cvProcessCount)
-    timeStampRead = reader.readtext(cvTimeStamp)
+    return ImgRegions(cvTitle, cvProcessCount, cvTimeStamp, targetCompletedChk)
+
+
+def interpretImgTexts(
+    p: Path,
+    targetCompletedChk: bool,
+    titleTexts: list,
+    processCountTexts: list,
+    timeStampTexts: list,
+    fixRules: Optional[ocrFixRules.CompiledOcrFixRules] = None
+) -> Tuple[str, str, str]:
+    """
+    Turns the texts read off the regions of a screenshot into a cut record,
+    see `getImgInfo`. The laser file name is fixed by fixRules, the current
+    rules of `LASER_OCR_FIX_PATH` when omitted.
+    """
+    if fixRules is None:
+        fixRules = ocrFixRules.getOcrFixRules(LASER_OCR_FIX_PATH)
     partFileName = ""
     partProcessCount = ""
     timeStamp = p.stem[5:] # Default timestamp
-    if titleRead:
-        for text in titleRead:
-            partFileName = partFileName + " " + text[1]
+    if titleTexts:
+        for text in titleTexts:
+            partFileName = partFileName + " " + text
             suffixMatch = re.search(r"\.zzx", partFileName, flags=re.IGNORECASE)
             if suffixMatch:
                 partFileName = partFileName[:suffixMatch.span()[1]]
-            partFileName = partFileName.strip()
-            with open(LASER_OCR_FIX_PATH, "r", encoding="utf-8") as pat:
-                commonFix = json.load(pat)
-            for key, val in commonFix.items():
-                pattern = re.compile(key, re.IGNORECASE)
-                partFileName = pattern.sub(val, partFileName)
-
-    if processCountRead:
-        if len(processCountRead) == 2:
+            partFileName = fixRules.apply(partFileName.strip())
+
+    if processCountTexts:
+        if len(processCountTexts) == 2:
             # In case recognition result is 2
-            partProcessCount = processCountRead[1][1]
+            partProcessCount = processCountTexts[1]
 
-    if timeStampRead:
-        timeStamp = timeStampRead[len(timeStampRead) - 1][1]
+    if timeStampTexts:
+        timeStamp = timeStampTexts[len(timeStampTexts) - 1]
         if not targetCompletedChk:
             timeStamp = p.stem[5:9] + "/" + timeStamp # Add year prefix
 
@@ -291,7 +419,182 @@ def getImgInfo(p: Path) -> Tuple[str, str, str]:  # {{{
     partFileName     = ILLEGAL_CHARACTERS_RE.sub("", partFileName)
     timeStamp        = ILLEGAL_CHARACTERS_RE.sub("", timeStamp)
     partProcessCount = ILLEGAL_CHARACTERS_RE.sub("", partProcessCount)
-    return partFileName, partProcessCount, timeStamp # }}}
+    return partFileName, partProcessCount, timeStamp
+
+
+def getImgInfo(p: Path) -> Tuple[str, str, str]:  # {{{
+    """
+    Extracts and processes text information from an image file using OCR.
+
+    Args:
+        p (Path): Path to the image file to process.
+
+    Returns:
+        tuple: A 3-tuple containing:
+            - partFileName (str): Extracted and cleaned filename from image title
+            - partProcessCount (str): Extracted process count from image
+            - timeStamp (str): Extracted and formatted timestamp from image
+
+    The function performs the following operations:
+    1. Crops specific regions of interest from the image (title, process count, timestamp)
+    2. Checks for completion status via pixel color detection
+    3. Uses EasyOCR to extract text from image regions
+    4. Applies text cleaning and pattern substitutions
+    5. Handles different timestamp formats based on completion status
+    6. Removes illegal characters from all extracted text fields
+    """
+    # Closed right away so that the OCR cache is written before returning
+    with closing(readImgInfos([p], workers=1)) as imgInfos:
+        return next(imgInfos)[1] # }}}
+
+
+def readImgInfos(screenshotPaths: list, workers: int = 0) -> Iterator[tuple]:
+    """
+    Reads cut records off screenshots through the OCR cache. The regions of
+    the screenshots are cropped `OCR_CROP_CHUNK_SIZE` screenshots at a time
+    and looked up by their pixels: only the regions never recognized before go
+    through the pool of OCR worker processes, and records whose texts and fix
+    rules are unchanged aren't even fixed again. A backfill over screenshots
+    read before thus only costs cropping and hashing, and new fix rules only
+    cost fixing. Only a chunk of regions and the jobs in flight are held at
+    once, however many screenshots there are.
+
+    Args:
+        screenshotPaths (list[Path]): Screenshots to read.
+        workers (int): Number of OCR worker processes, see `ocrEngine.readBatch`.
+
+    Yields:
+        tuple: `(screenshotIdx, (partFileName, partProcessCount, timeStamp))`
+        in the order the screenshots get read.
+    """
+    languages = ocrEngine.TITLE_LANGUAGES
+    # Kept for the whole batch so that every record matches the version it is cached by
+    fixRules = ocrFixRules.getOcrFixRules(LASER_OCR_FIX_PATH)
+    cachedTexts = {}
+    newEntries = {}
+    # Records found while cropping, yielded before the next recognized one
+    readRecords = []
+    # `(screenshotIdx, textsKeys, recordKey, missingKeys, targetCompletedChk)` of every job
+    jobInfos = []
+
+    def interpret(screenshotIdx: int, textsKeys: list, recordKey: str, targetCompletedChk: bool) -> tuple:
+        record = interpretImgTexts(
+            screenshotPaths[screenshotIdx],
+            targetCompletedChk,
+            *[cachedTexts[key] for key in textsKeys],
+            fixRules
+        )
+        newEntries[recordKey] = record
+        return record
+
+    def iterJobs() -> Iterator[list]:
+        for chunkStart in range(0, len(screenshotPaths), OCR_CROP_CHUNK_SIZE):
+            chunkPaths = screenshotPaths[chunkStart:chunkStart + OCR_CROP_CHUNK_SIZE]
+            imgRegions = [cropImgRegions(p) for p in chunkPaths]
+            textsKeys = [
+                [ocrCache.getTextsKey(region, languages) for region in regions[:3]]
+                for regions in imgRegions
+            ]
+            recordKeys = [
+                ocrCache.getRecordKey(keys, regions.targetCompletedChk, p.stem, fixRules.version)
+                for p, regions, keys in zip(chunkPaths, imgRegions, textsKeys)
+            ]
+            cachedRecords = ocrCache.getMany(recordKeys)
+            cachedTexts.update(ocrCache.getMany(
+                key
+                for keys, recordKey in zip(textsKeys, recordKeys) if recordKey not in cachedRecords
+                for key in keys if key not in cachedTexts
+            ))
+            for screenshotIdx, regions, keys, recordKey in zip(
+                range(chunkStart, chunkStart + len(chunkPaths)), imgRegions, textsKeys, recordKeys
+            ):
+                if recordKey in cachedRecords:
+                    readRecords.append((screenshotIdx, tuple(cachedRecords[recordKey])))
+                elif all(key in cachedTexts for key in keys):
+                    # Recognized before, the fix rules have changed since
+                    record = interpret(screenshotIdx, keys, recordKey, regions.targetCompletedChk)
+                    readRecords.append((screenshotIdx, record))
+                else:
+                    missingKeys = [key for key in keys if key not in cachedTexts]
+                    jobInfos.append((screenshotIdx, keys, recordKey, missingKeys, regions.targetCompletedChk))
+                    yield [region for region, key in zip(regions[:3], keys) if key in missingKeys]
+
+    try:
+        # Closed along with this generator, cancelling the jobs not started yet
+        with closing(ocrEngine.readBatch(iterJobs(), languages, workers)) as results:
+            for jobIdx, texts in results:
+                yield from readRecords
+                readRecords.clear()
+                screenshotIdx, keys, recordKey, missingKeys, targetCompletedChk = jobInfos[jobIdx]
+                for key, keyTexts in zip(missingKeys, texts):
+                    cachedTexts[key] = newEntries[key] = keyTexts
+                yield screenshotIdx, interpret(screenshotIdx, keys, recordKey, targetCompletedChk)
+                if len(newEntries) >= OCR_CACHE_WRITE_INTERVAL:
+                    ocrCache.putMany(newEntries)
+                    newEntries.clear()
+        yield from readRecords
+    finally:
+        ocrCache.putMany(newEntries)
+
+
+def loadOcrProgress() -> dict:
+    """
+    Loads the cut records read off screenshots by a batch not saved yet.
+
+    Returns:
+        dict: `{screenshotPath: [partFileName, partProcessCount, timeStamp]}`.
+    """
+    try:
+        with open(OCR_PROGRESS_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def saveOcrProgress(progress: dict) -> None:
+    os.makedirs(OCR_PROGRESS_PATH.parent, exist_ok=True)
+    tempPath = Path(OCR_PROGRESS_PATH.parent, OCR_PROGRESS_PATH.name + ".tmp")
+    with open(tempPath, "w", encoding="utf-8") as f:
+        json.dump(progress, f, ensure_ascii=False)
+    os.replace(tempPath, OCR_PROGRESS_PATH)
+
+
+def recognizeScreenshots(screenshotPaths: list, workers: int = 0) -> dict:
+    """
+    Reads the cut records off many screenshots at once, see `readImgInfos`.
+    Records are saved to a progress file as they come, so that an interrupted
+    batch resumes where it stopped.
+
+    Args:
+        screenshotPaths (list[Path]): Screenshots to read.
+        workers (int): Number of OCR worker processes, see `ocrEngine.readBatch`.
+
+    Returns:
+        dict: `{screenshotPath: (partFileName, partProcessCount, timeStamp)}`.
+    """
+    progress = loadOcrProgress()
+    pendingPaths = [p for p in screenshotPaths if str(p) not in progress]
+    if pendingPaths:
+        pr(f"Reading {len(pendingPaths)} screenshots, {len(screenshotPaths) - len(pendingPaths)} already read")
+    startTime = time.perf_counter()
+    unsavedCount = 0
+    with closing(readImgInfos(pendingPaths, workers)) as imgInfos:
+        for screenshotIdx, imgInfo in imgInfos:
+            progress[str(pendingPaths[screenshotIdx])] = imgInfo
+            unsavedCount += 1
+            if unsavedCount >= OCR_PROGRESS_SAVE_INTERVAL:
+                saveOcrProgress(progress)
+                unsavedCount = 0
+    if unsavedCount:
+        saveOcrProgress(progress)
+
+    if pendingPaths:
+        seconds = time.perf_counter() - startTime
+        pr(
+            f"Read {len(pendingPaths)} screenshots in {seconds:.1f}s, "
+            f"{len(pendingPaths) / max(seconds, 1e-9) * 60:.1f} images/minute"
+        )
+    return {p: tuple(progress[str(p)]) for p in screenshotPaths}
 
 
 def validScreenshotPath(cell):  # {{{
@@ -314,7 +617,13 @@ def validScreenshotPath(cell):  # {{{
         return True # }}}
 
 
-def newRecord(ws: Worksheet, p: Path, partFileName: Optional[str]=None, timeStamp: Optional[str]=None):
+def newRecord(
+    ws: Worksheet,
+    p: Path,
+    partFileName: Optional[str]=None,
+    timeStamp: Optional[str]=None,
+    partProcessCount: Optional[str]=None
+):
     """
     Creates a new record in the worksheet with part processing information.
 
@@ -323,6 +632,7 @@ def newRecord(ws: Worksheet, p: Path, partFileName: Optional[str]=None, timeStam
         p (str): Path to the image file containing processing data
         partFileName (str, optional): Name of the part file. If not provided, extracted from image.
         timeStamp (str, optional): Timestamp of processing. If not provided, extracted from image.
+        partProcessCount (str, optional): Process count already read off the image.
 
     The function either uses provided partFileName/timeStamp or extracts them from the image.
     Extracts process count from image using OCR when needed. Adds a new row with:
@@ -333,17 +643,16 @@ def newRecord(ws: Worksheet, p: Path, partFileName: Optional[str]=None, timeStam
     """
     if not partFileName or not timeStamp:
         partFileName, partProcessCount, timeStamp = getImgInfo(p)
-    else:
-        reader = easyocr.Reader(["en"])
+    elif partProcessCount is None:
         partProcessCount = ""
         with Image.open(str(p)) as img:
             imgProcessCount = img.crop((550, 1665, 765, 1685))
             cvProcessCount = numpy.array(imgProcessCount)[:, :, ::-1].copy()
-            processCountRead = reader.readtext(cvProcessCount)
+            processCountRead = ocrCache.readImages(ocrEngine.NUMBER_LANGUAGES, [cvProcessCount])[0]
             if processCountRead:
                 if len(processCountRead) == 2:
                     # In case recognition result is 2
-                    partProcessCount = processCountRead[1][1]
+                    partProcessCount = processCountRead[1]
                     partProcessCount = ILLEGAL_CHARACTERS_RE.sub("", partProcessCount)
 
     rowNew = ws.max_row + 1
@@ -355,61 +664,193 @@ def newRecord(ws: Worksheet, p: Path, partFileName: Optional[str]=None, timeStam
     ws[f"F{rowNew}"].hyperlink = str(p)
 
 
-def updateScreenshotRecords():  # {{{
+def getLastScreenshotDatetime(ws: Worksheet) -> Optional[datetime.datetime]:
+    """
+    Gets the time of the last screenshot linked by a worksheet of the cut
+    records, skipping the rows without a valid screenshot path.
+    """
+    rowMax = ws.max_row
+    while rowMax > 1:
+        lastScreenshotCell = ws[f"F{rowMax}"]
+        if not validScreenshotPath(lastScreenshotCell):
+            rowMax = rowMax - 1
+            continue
+        if "\n" in str(lastScreenshotCell.value).strip():
+            paths = str(lastScreenshotCell.value).strip().split("\n")
+            lastPath = Path(paths[len(paths) - 1])
+        else:
+            lastPath = Path(lastScreenshotCell.value)
+
+        try:
+            return datetime.datetime.strptime(str(lastPath.stem)[5:], "%Y-%m-%d %H%M%S")
+        except ValueError:
+            rowMax = rowMax - 1
+            continue
+    return None
+
+
+def updateScreenshotRecords(workers: int = 0) -> Path:  # {{{
     """
     Updates the screenshot records in the workbook by comparing timestamps.
     For each screenshot path, checks if it's newer than the last recorded screenshot
     in the corresponding worksheet. If newer or if worksheet is empty, adds a new record.
-    Saves the updated workbook to CUT_RECORD_PATH.
+    The new screenshots are read as one batch, see `recognizeScreenshots`, and the
+    workbook is saved once to CUT_RECORD_PATH.
 
     Args:
-        None (uses module-level variables: screenshotPaths, CUT_RECORD_PATH)
+        workers (int): Number of OCR worker processes, see `ocrEngine.readBatch`.
 
-    Effects:
-        Modifies the workbook by adding new records when appropriate
-        Saves the workbook to CUT_RECORD_PATH
+    Returns:
+        Path: Path the workbook was saved at.
     """
-    cutRecordPath = CUT_RECORD_PATH
-    wb, cutRecordPath = getWorkbook(cutRecordPath)
-    initSheetFromScreenshots(wb)
-    for p in screenshotPaths:
-        sheetName = p.stem[5:12]
-        ws = wb[sheetName]
-        rowMax = ws.max_row
-        # fix rowMax to row that contain valid screenshot path
-        lastDatetime = None
-        if rowMax != 1:
-            # Get the valid last datetime
-            while rowMax > 1:
-                lastScreenshotCell = ws[f"F{rowMax}"]
-                if not validScreenshotPath(lastScreenshotCell):
-                    rowMax = rowMax - 1
-                    continue
-                if "\n" in str(lastScreenshotCell.value).strip():
-                    paths = str(lastScreenshotCell.value).strip().split("\n")
-                    lastPath = Path(paths[len(paths) - 1])
-                else:
-                    lastPath = Path(lastScreenshotCell.value)
-
-                try:
-                    lastDatetime = datetime.datetime.strptime(str(lastPath.stem)[5:], "%Y-%m-%d %H%M%S")
-                    break
-                except ValueError:
-                    rowMax = rowMax - 1
-                    continue
+    with workbookLock:
+        # Journaled records know their laser file from the title of TubePro,
+        # they are written before their screenshots could be read as new
+        materializeJournal()
+        cutRecordPath = CUT_RECORD_PATH
+        wb, cutRecordPath = getWorkbook(cutRecordPath)
+        initSheetFromScreenshots(wb)
+        index = screenshotIndex.getScreenshotIndex(SCREENSHOT_DIR_PATH)
+        newPaths = []
+        for sheetName in index.getMonths():
+            # Only save screenshots that are newer than the last one
+            newPaths.extend(index.query(getLastScreenshotDatetime(wb[sheetName]), sheetName))
+
+        imgInfos = recognizeScreenshots(newPaths, workers)
+        for p in newPaths:
+            partFileName, partProcessCount, timeStamp = imgInfos[p]
+            newRecord(wb[p.stem[5:12]], p, partFileName, timeStamp, partProcessCount)
+
+        savePath = util.saveWorkbook(wb, CUT_RECORD_PATH)
+    # The records read are in the workbook now
+    OCR_PROGRESS_PATH.unlink(missing_ok=True)
+    return savePath # }}}
+
+
+def getLinkedScreenshotPaths(ws: Worksheet) -> set:
+    return {
+        str(cell.value) for (cell, ) in ws.iter_rows(min_row=2, min_col=6, max_col=6)
+        if cell.value
+    }
+
+
+def materializeJournal() -> Optional[Path]:
+    """
+    Writes the cut records journaled since the last materialization into the
+    workbook, loading and saving it once for all of them. Records whose
+    screenshot is already linked by their sheet, e.g. written by a batch
+    interrupted before the journal got marked, are skipped. Nothing is
+    marked when the workbook is in use, the next materialization writes
+    the records again.
 
-            if not lastDatetime:
-                newRecord(ws, p)
+    Returns:
+        Optional[Path]: Path the workbook was saved at, None if no record was
+        pending or if the workbook is in use.
+    """
+    global lastBackupDate
+    with workbookLock:
+        pending = cutRecordJournal.getPending()
+        if not pending:
+            return None
+
+        wb, cutRecordPath = getWorkbook(CUT_RECORD_PATH)
+        linkedPaths = {}
+        for _, entry in pending:
+            if entry.sheetName in wb.sheetnames:
+                ws = wb[entry.sheetName]
             else:
-                currentDatetime = datetime.datetime.strptime(str(p.stem)[5:], "%Y-%m-%d %H%M%S")
-                # Only save screenshots that are newer than the last one
-                if lastDatetime < currentDatetime:
-                    newRecord(ws, p)
-        else:
-            # Start in a new worksheet
-            newRecord(ws, p)
+                ws = createRecordSheet(wb, entry.sheetName)
+            if entry.sheetName not in linkedPaths:
+                linkedPaths[entry.sheetName] = getLinkedScreenshotPaths(ws)
+            if str(entry.screenshotPath) in linkedPaths[entry.sheetName]:
+                continue
+
+            partProcessCount = entry.partProcessCount
+            if partProcessCount is None and not entry.screenshotPath.exists():
+                partProcessCount = ""
+            newRecord(ws, entry.screenshotPath, entry.partFileName, entry.timeStamp, partProcessCount)
+            linkedPaths[entry.sheetName].add(str(entry.screenshotPath))
+
+        # Batches are saved far more often than records used to be, the
+        # workbook is only backed up before the first save of the day
+        today = datetime.date.today()
+        savePath = util.saveWorkbook(wb, cutRecordPath, backgroundChk=True, backupChk=lastBackupDate != today)
+        lastBackupDate = today
+        if savePath is None:
+            return None
+        if os.getlogin() != "OT03":
+            shutil.copy2(savePath, Path(SCREENSHOT_DIR_PATH, "开料记录.xlsx"))
+        cutRecordJournal.setMaterialized(pending[-1][0])
+        return savePath
+
+
+class JournalMaterializer:
+    """
+    Writes journaled cut records into the workbook in a daemon thread, so that
+    taking a cut record only costs appending it to the journal however large
+    the workbook has grown. Records journaled within `delaySeconds` of each
+    other are written by the same batch, and records left pending while the
+    workbook is in use are written again every `retrySeconds`.
+
+    Args:
+        delaySeconds (float): See `MATERIALIZE_DELAY_SECONDS`.
+        retrySeconds (float): See `MATERIALIZE_RETRY_SECONDS`.
+    """
+    def __init__(
+        self,
+        delaySeconds: float = MATERIALIZE_DELAY_SECONDS,
+        retrySeconds: float = MATERIALIZE_RETRY_SECONDS,
+    ):
+        self.delaySeconds = delaySeconds
+        self.retrySeconds = retrySeconds
+        self.isRunning = False
+        self.stopEvent = threading.Event()
+        self.wakeEvent = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.batchCount = 0
+
+    def start(self) -> None:
+        if self.isRunning:
+            return
+        self.isRunning = True
+        self.stopEvent.clear()
+        self.thread = threading.Thread(target=self._materializeLoop, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.isRunning = False
+        self.stopEvent.set()
+        self.wakeEvent.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def wake(self) -> None:
+        self.wakeEvent.set()
+
+    def _materializeLoop(self) -> None:
+        # Records journaled before the last exit are written right away
+        timeout = 0
+        while self.isRunning:
+            self.wakeEvent.wait(timeout)
+            if self.wakeEvent.is_set():
+                self.wakeEvent.clear()
+                self.stopEvent.wait(self.delaySeconds)
+            if not self.isRunning:
+                break
+
+            try:
+                materializeJournal()
+                self.batchCount += 1
+                pendingChk = bool(cutRecordJournal.getPending())
+            except Exception as e:
+                pr(f"Failed to write the cut records into the workbook: {e}")
+                pendingChk = True
+            timeout = self.retrySeconds if pendingChk else None
 
-    util.saveWorkbook(wb, CUT_RECORD_PATH) # }}}
+
+materializer: Optional[JournalMaterializer] = None
+recordWorker: Optional[RecordWorker] = None
 
 
 def relinkScreenshots():
@@ -427,22 +868,24 @@ def relinkScreenshots():
     if "ctrl" in keySet.keys:
         return os.startfile(cutRecordPath)
     # TODO: highlight invalid ones
-    wb, cutRecordPath = getWorkbook(cutRecordPath)
-    for ws in wb.worksheets:
-        if ws.max_row < 2:
-            continue
-        for row in ws.iter_rows(min_row=2, max_col=6, max_row=ws.max_row):
-            for cell in row:
-                if not validScreenshotPath(cell):
-                    continue
-
-                if "\n" in str(cell.value).strip():
-                    screenshotPaths = str(cell.value).strip().split("\n")
-                    screenshotPath = Path(screenshotPaths[len(screenshotPaths) - 1])
-                else:
-                    screenshotPath = Path(str(cell.value))
-
-                if screenshotPath.exists() and screenshotPath.suffix == ".png":
-                    ws[f"F{cell.row}"].hyperlink = cell.value
-
-    util.saveWorkbook(wb, CUT_RECORD_PATH)
+    with workbookLock:
+        materializeJournal()
+        wb, cutRecordPath = getWorkbook(cutRecordPath)
+        for ws in wb.worksheets:
+            if ws.max_row < 2:
+                continue
+            for row in ws.iter_rows(min_row=2, max_col=6, max_row=ws.max_row):
+                for cell in row:
+                    if not validScreenshotPath(cell):
+                        continue
+
+                    if "\n" in str(cell.value).strip():
+                        screenshotPaths = str(cell.value).strip().split("\n")
+                        screenshotPath = Path(screenshotPaths[len(screenshotPaths) - 1])
+                    else:
+                        screenshotPath = Path(str(cell.value))
+
+                    if screenshotPath.exists() and screenshotPath.suffix == ".png":
+                        ws[f"F{cell.row}"].hyperlink = cell.value
+
+        util.saveWorkbook(wb, CUT_RECORD_PATH)
@@ -0,0 +1,113 @@
+import config
+
+import sqlite3
+import datetime
+from contextlib import closing
+from typing import NamedTuple, Optional
+from pathlib import Path
+
+CUT_RECORD_JOURNAL_PATH = config.CUT_RECORD_JOURNAL_PATH
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id               INTEGER PRIMARY KEY AUTOINCREMENT,
+    recordedAt       TEXT,
+    sheetName        TEXT,
+    partFileName     TEXT,
+    timeStamp        TEXT,
+    partProcessCount TEXT,
+    screenshotPath   TEXT
+);
+CREATE TABLE IF NOT EXISTS state (
+    key   TEXT PRIMARY KEY,
+    value INTEGER
+);
+"""
+
+
+class CutRecordEntry(NamedTuple):
+    """
+    Cut record as journaled, before being written into the workbook.
+
+    Attributes:
+        sheetName (str): Month sheet of the record, e.g. "2025-06".
+        partFileName (str): Laser file cut.
+        timeStamp (str): Completion time, as written into the workbook.
+        partProcessCount (Optional[str]): Process count, read off the
+            screenshot when written into the workbook if None.
+        screenshotPath (Path): Screenshot of the record.
+    """
+    sheetName:        str
+    partFileName:     str
+    timeStamp:        str
+    partProcessCount: Optional[str]
+    screenshotPath:   Path
+
+
+def connect(journalPath: Path = CUT_RECORD_JOURNAL_PATH) -> sqlite3.Connection:
+    """
+    Opens the journal, creating its tables on first use. Commits are synced to
+    the disk before returning, a record being acknowledged once journaled.
+    """
+    journalPath.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(journalPath)
+    conn.execute("PRAGMA synchronous = FULL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def append(entry: CutRecordEntry, journalPath: Path = CUT_RECORD_JOURNAL_PATH) -> int:
+    """
+    Appends a cut record to the journal.
+
+    Returns:
+        int: Id of the record, increasing with every record.
+    """
+    with closing(connect(journalPath)) as conn, conn:
+        cursor = conn.execute(
+            "INSERT INTO records (recordedAt, sheetName, partFileName, timeStamp, partProcessCount, screenshotPath) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                datetime.datetime.now().isoformat(timespec="seconds"),
+                entry.sheetName,
+                entry.partFileName,
+                entry.timeStamp,
+                entry.partProcessCount,
+                str(entry.screenshotPath),
+            )
+        )
+        return cursor.lastrowid
+
+
+def getMaterializedId(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT value FROM state WHERE key = 'materializedId'").fetchone()
+    return row[0] if row else 0
+
+
+def getPending(journalPath: Path = CUT_RECORD_JOURNAL_PATH) -> list:
+    """
+    Lists the cut records not written into the workbook yet.
+
+    Returns:
+        list[tuple]: `(recordId, CutRecordEntry)` in the order they were journaled.
+    """
+    with closing(connect(journalPath)) as conn:
+        return [
+            (recordId, CutRecordEntry(sheetName, partFileName, timeStamp, partProcessCount, Path(screenshotPath)))
+            for recordId, sheetName, partFileName, timeStamp, partProcessCount, screenshotPath in conn.execute(
+                "SELECT id, sheetName, partFileName, timeStamp, partProcessCount, screenshotPath "
+                "FROM records WHERE id > ? ORDER BY id",
+                (getMaterializedId(conn),)
+            )
+        ]
+
+
+def setMaterialized(recordId: int, journalPath: Path = CUT_RECORD_JOURNAL_PATH) -> None:
+    """
+    Marks the cut records up to recordId as written into the workbook. They
+    are kept in the journal, only the mark moves.
+    """
+    with closing(connect(journalPath)) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO state VALUES ('materializedId', ?)",
+            (max(recordId, getMaterializedId(conn)),)
+        )
@@ -0,0 +1,119 @@
+import logEvent
+import eventStore
+
+import heapq
+import sqlite3
+import datetime
+from typing import Iterable, Iterator
+from pathlib import Path
+
+
+def mergeLogEvents(conn: sqlite3.Connection, logNames: list) -> Iterator[eventStore.StoredEvent]:
+    """
+    Merges the stored events of several logs into a single stream ordered by
+    time, reading every log lazily so only one event per log is held at a time.
+    Events of a log keep their log order, and simultaneous events of different
+    logs come in the order of logNames.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the event store.
+        logNames (list[str]): File names of the logs.
+    """
+    return heapq.merge(
+        *(eventStore.iterEvents(conn, logName) for logName in logNames),
+        key=lambda storedEvent: storedEvent.time
+    )
+
+
+def newSession(fileName: str, timeObj: datetime.datetime) -> dict:
+    return {
+        "fileName":       {"value": fileName, "updatedTime": timeObj },
+        "startCount":     {"value": -1, "updatedTime": timeObj },
+        "segmentTotal":   {"value": 0, "updatedTime": None},
+        "segmentCount":   {"value": 0, "updatedTime": None},
+        "scheduleTotal":  {"value": 0, "updatedTime": None},
+        "loopEndCount":   {"value": 0, "updatedTime": None},
+        "totalCount":     {"value": 0, "updatedTime": None},
+    }
+
+
+def updateSession(session: dict, event: logEvent.LogEvent, timeObj: datetime.datetime) -> None:
+    if event.kind == logEvent.SEGMENT:
+        session["segmentTotal"] = {
+            "value": event.numbers[0],
+            "updatedTime": timeObj
+        }
+        session["segmentCount"] = {
+            "value": event.numbers[1],
+            "updatedTime": timeObj
+        }
+    elif event.kind == logEvent.SCHEDULE_TOTAL:
+        session["scheduleTotal"] = {
+            "value": event.numbers[0],
+            "updatedTime": timeObj
+        }
+    elif event.kind == logEvent.LOOP_END:
+        session["loopEndCount"] = {
+            "value": event.numbers[0],
+            "updatedTime": timeObj
+        }
+        # determin whether the cutting session was starting from 0
+        if session["startCount"]["value"] == -1:
+            if session["loopEndCount"]["value"] == session["segmentTotal"]["value"]:
+                session["startCount"]["value"] = 0
+            else:
+                session["startCount"]["value"] = (
+                    session["loopEndCount"]["value"] - session["segmentTotal"]["value"]
+                )
+                if session["startCount"]["value"] < 0:
+                    session["startCount"]["value"] = 0
+
+
+def closeSession(session: dict) -> dict:
+    """
+    Computes the total count of a cutting session once it's over.
+    """
+    if session["loopEndCount"]["updatedTime"] and session["loopEndCount"]["updatedTime"] > session["segmentCount"]["updatedTime"]:
+        session["totalCount"]["value"] = session["loopEndCount"]["value"]
+        session["totalCount"]["updatedTime"] = session["loopEndCount"]["updatedTime"]
+    else:
+        session["totalCount"]["value"] = session["segmentCount"]["value"] + session["loopEndCount"]["value"]
+        session["totalCount"]["updatedTime"] = session["segmentCount"]["updatedTime"]
+
+    # Rectify the start count if the cutting session wasn't starting from 0
+    if session["startCount"]["value"] == -1 and session["loopEndCount"]["value"] == 0:
+        session["startCount"]["value"] = 0
+
+    return session
+
+
+def iterSessions(storedEvents: Iterable) -> Iterator[dict]:
+    """
+    Stitches time ordered events into cutting sessions. A session starts
+    whenever another laser file gets opened, so a session carries on across log
+    boundaries as long as the same laser file is reopened. Sessions are yielded
+    as soon as they are over, only the open session is kept in memory.
+
+    Args:
+        storedEvents (Iterable[eventStore.StoredEvent]): Events ordered by time,
+            e.g. from `mergeLogEvents`.
+
+    Yields:
+        dict: Cutting sessions in chronological order, with the keys fileName,
+        startCount, segmentTotal, segmentCount, scheduleTotal, loopEndCount and
+        totalCount, each one holding a value and its updatedTime.
+    """
+    session = None
+    for _, event, timeObj in storedEvents:
+        if event.kind == logEvent.FILE_OPEN:
+            currentFileOpen = Path(event.text).stem
+            currentFileOpen = currentFileOpen.replace("_X1", "")
+            if not session or session["fileName"]["value"] != currentFileOpen:
+                if session:
+                    yield closeSession(session)
+                session = newSession(currentFileOpen, timeObj)
+        elif session:
+            updateSession(session, event, timeObj)
+
+    if session:
+        yield closeSession(session)
@@ -0,0 +1,324 @@
+import config
+import util
+import loopStats
+
+import os
+import json
+import time
+import datetime
+import functools
+from typing import NamedTuple, Optional
+from pathlib import Path
+
+CYCLE_PROFILE_PATH = Path(config.CACHE_DIR_PATH, "循环耗时.json")
+LASER_FILE_DIR_PREFIX = "D:\\欧拓图纸\\切割文件\\"
+# Number of laser file names whose lookups are kept
+LOOKUP_CACHE_SIZE = 1024
+# The profile file is checked for changes by other processes at most this often
+REFRESH_SECONDS = 5
+# Extra seconds per loop, as in the estimations of the laser profile
+LOOP_MARGIN_SECONDS = 1
+# Laser files not cut for this long are dropped from the profile
+ENTRY_MAX_AGE_DAYS = 730
+
+
+class CycleProfileEntry(NamedTuple):
+    """
+    Cycle time profile of a laser file.
+
+    Attributes:
+        laserFileName (str): Normalized laser file name, see `normalizeLaserFileName`.
+        workpieceCount (int): Workpieces cut per loop.
+        cycleSeconds (float): Median loop interval.
+        p90Seconds (float): 90th percentile loop interval.
+        trimmedMeanSeconds (float): Trimmed mean loop interval.
+        sampleCount (int): Number of loop intervals the times are computed from.
+        lastUpdated (datetime.datetime): Time of the last loop.
+    """
+    laserFileName:      str
+    workpieceCount:     int
+    cycleSeconds:       float
+    p90Seconds:         float
+    trimmedMeanSeconds: float
+    sampleCount:        int
+    lastUpdated:        datetime.datetime
+
+
+class Eta(NamedTuple):
+    """
+    Estimated time left to cut workpieces of a laser file, from the median
+    cycle time and from the 90th percentile one as a pessimistic bound.
+    """
+    entry:               CycleProfileEntry
+    remainingCount:      int
+    remainingSeconds:    float
+    finishTime:          datetime.datetime
+    p90RemainingSeconds: float
+    p90FinishTime:       datetime.datetime
+
+
+def normalizeLaserFileName(laserFilePath: str) -> str:
+    """
+    Normalizes the path of a laser file as logged by TubePro, or its name as
+    shown in the title of TubePro, into the name the profiles are keyed by.
+    """
+    laserFileName = laserFilePath.replace(LASER_FILE_DIR_PREFIX, "")
+    laserFileName = util.diametartSymbolUnify(laserFileName)
+    laserFileName = laserFileName.replace(".zx", ".zzx")
+    laserFileName = laserFileName.replace("  ", " ")
+    return laserFileName.strip()
+
+
+def getBaseName(laserFileName: str) -> str:
+    return laserFileName.replace("/", "\\").rsplit("\\", 1)[-1]
+
+
+def formatDuration(seconds: float) -> str:
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def createEntry(
+    laserFileName: str,
+    workpieceCount: int,
+    loopSketch: loopStats.LoopSketch
+) -> Optional[CycleProfileEntry]:
+    """
+    Computes the profile of a laser file from its loops.
+
+    Returns:
+        Optional[CycleProfileEntry]: The profile, None if there is no interval.
+    """
+    laserFileStats = loopSketch.stats()
+    if not laserFileStats:
+        return None
+    return CycleProfileEntry(
+        laserFileName      = laserFileName,
+        workpieceCount     = workpieceCount,
+        cycleSeconds       = laserFileStats.median,
+        p90Seconds         = laserFileStats.p90,
+        trimmedMeanSeconds = laserFileStats.trimmedMean,
+        sampleCount        = laserFileStats.count,
+        lastUpdated        = laserFileStats.lastUpdated,
+    )
+
+
+class CycleProfile:
+    """
+    Cycle time profile of every laser file, persisted as JSON so that remaining
+    times are looked up without parsing any log. The loop sketch of every laser
+    file is kept in the profile and the loops cut since the last update are
+    merged into it each time the laser profile gets generated, so the history
+    outlives the accumulated logs until `ENTRY_MAX_AGE_DAYS`. The profile is
+    read again once its file changes, e.g. when written by the headless watcher.
+
+    Lookups are kept in an LRU cache, keyed by the generation of the entries so
+    that a profile updated meanwhile is never answered from the cache.
+
+    Args:
+        profilePath (Path): Path to the JSON profile.
+    """
+    def __init__(self, profilePath: Path = CYCLE_PROFILE_PATH):
+        self.profilePath = Path(profilePath)
+        self.entries     = {}
+        self.baseNames   = {}
+        # {laserFileName: (workpieceCount, LoopSketch)}
+        self.loopSketches = {}
+        # Time of the last loop merged, None before the first update
+        self.mergedUntil = None
+        self.generation  = 0
+        self.mtimeNs     = None
+        self.lastRefreshTime = -float("inf")
+        self._lookupCached = functools.lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._lookup)
+
+    def refresh(self, forceChk: bool = False) -> None:
+        """
+        Reads the profile again if its file has changed since last read.
+        """
+        now = time.monotonic()
+        if not forceChk and now - self.lastRefreshTime < REFRESH_SECONDS:
+            return
+        self.lastRefreshTime = now
+        try:
+            mtimeNs = self.profilePath.stat().st_mtime_ns
+        except OSError:
+            return
+        if mtimeNs == self.mtimeNs:
+            return
+
+        try:
+            with open(self.profilePath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            util.pr(f"Failed to read the cycle time profile {self.profilePath}: {e}", gui=False)
+            return
+        self.mtimeNs = mtimeNs
+        try:
+            loopSketches = {
+                laserFileName: (entryData["workpieceCount"], loopStats.LoopSketch.fromDict(entryData["loop"]))
+                for laserFileName, entryData in data["laserFiles"].items()
+            }
+            mergedUntil = data["mergedUntil"] and datetime.datetime.fromisoformat(data["mergedUntil"])
+        except (KeyError, TypeError, ValueError) as e:
+            # Profiles without loop sketches are built again by the next update
+            util.pr(f"Ignored the cycle time profile {self.profilePath}: {e!r}", gui=False)
+            loopSketches, mergedUntil = {}, None
+        self._setLoopSketches(loopSketches, mergedUntil)
+
+    def _setLoopSketches(self, loopSketches: dict, mergedUntil: Optional[datetime.datetime]) -> None:
+        self.loopSketches = loopSketches
+        self.mergedUntil  = mergedUntil
+        self._setEntries([
+            entry
+            for laserFileName, (workpieceCount, loopSketch) in loopSketches.items()
+            if (entry := createEntry(laserFileName, workpieceCount, loopSketch))
+        ])
+
+    def _setEntries(self, entries: list) -> None:
+        baseNames = {}
+        for entry in sorted(entries, key=lambda entry: entry.lastUpdated):
+            # The latest cut laser file wins among those of the same name in different directories
+            baseNames[getBaseName(entry.laserFileName)] = entry
+        # Swapped at once, lookups of other threads see either profile but never a mix
+        self.entries, self.baseNames = {entry.laserFileName: entry for entry in entries}, baseNames
+        self.generation += 1
+
+    def update(self, parsedResult: dict) -> None:
+        """
+        Merges the loops of accumulated logs cut after `mergedUntil` into the
+        profile, drops the laser files not cut for `ENTRY_MAX_AGE_DAYS` and
+        saves it.
+
+        Args:
+            parsedResult (dict): Accumulated result of `rtfParse.parse`, parsed
+                with `newLoopsSince` set to `mergedUntil`.
+        """
+        loopSketches = dict(self.loopSketches)
+        mergedUntil = self.mergedUntil
+        for laserFileName, laserFileInfo in parsedResult.items():
+            newLoopSketch = laserFileInfo["newLoop"]
+            if not newLoopSketch:
+                continue
+            workpieceCount, loopSketch = loopSketches.get(laserFileName, (0, loopStats.LoopSketch()))
+            # Copied so that the entries of other threads never change underneath them
+            loopSketch = loopStats.LoopSketch.fromDict(loopSketch.toDict())
+            loopSketch.merge(newLoopSketch)
+            loopSketches[laserFileName] = (laserFileInfo["workpieceCount"] or workpieceCount, loopSketch)
+            lastLoopTime = datetime.datetime.fromtimestamp(newLoopSketch.lastUpdated)
+            mergedUntil = max(mergedUntil, lastLoopTime) if mergedUntil else lastLoopTime
+
+        oldestTime = (datetime.datetime.now() - datetime.timedelta(days=ENTRY_MAX_AGE_DAYS)).timestamp()
+        loopSketches = {
+            laserFileName: (workpieceCount, loopSketch)
+            for laserFileName, (workpieceCount, loopSketch) in loopSketches.items()
+            if loopSketch.lastUpdated >= oldestTime
+        }
+        self._setLoopSketches(loopSketches, mergedUntil)
+
+        data = {
+            "updated":     datetime.datetime.now().isoformat(timespec="seconds"),
+            "mergedUntil": mergedUntil.isoformat() if mergedUntil else None,
+            "laserFiles":  {
+                laserFileName: {
+                    "workpieceCount": workpieceCount,
+                    "loop":           loopSketch.toDict(),
+                }
+                for laserFileName, (workpieceCount, loopSketch) in sorted(loopSketches.items())
+            },
+        }
+        os.makedirs(self.profilePath.parent, exist_ok=True)
+        tempPath = Path(self.profilePath.parent, self.profilePath.name + ".tmp")
+        with open(tempPath, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tempPath, self.profilePath)
+        # Already up to date with the file just written
+        self.mtimeNs = self.profilePath.stat().st_mtime_ns
+
+    def lookup(self, laserFileName: str) -> Optional[CycleProfileEntry]:
+        """
+        Looks a laser file up by its path as logged by TubePro, by its
+        normalized name or by its name alone.
+
+        Returns:
+            Optional[CycleProfileEntry]: The profile of the laser file, None if
+            it hasn't been cut since the profile is kept.
+        """
+        self.refresh()
+        return self._lookupCached(laserFileName, self.generation)
+
+    def _lookup(self, laserFileName: str, generation: int) -> Optional[CycleProfileEntry]:
+        laserFileName = normalizeLaserFileName(laserFileName)
+        entry = self.entries.get(laserFileName)
+        if entry is None:
+            entry = self.baseNames.get(getBaseName(laserFileName))
+        return entry
+
+    def estimate(
+        self,
+        laserFileName: str,
+        remainingCount: int,
+        now: Optional[datetime.datetime] = None
+    ) -> Optional[Eta]:
+        """
+        Estimates the time left to cut workpieces of a laser file, the same way
+        the laser profile does.
+
+        Args:
+            laserFileName (str): Laser file, see `lookup`.
+            remainingCount (int): Number of workpieces left to cut.
+            now (Optional[datetime.datetime]): Time the finish times are
+                counted from, the current time when omitted.
+
+        Returns:
+            Optional[Eta]: The estimation, None if the laser file has no profile.
+        """
+        entry = self.lookup(laserFileName)
+        if entry is None:
+            return None
+
+        if now is None:
+            now = datetime.datetime.now()
+        loopCount = max(remainingCount, 0) / max(entry.workpieceCount, 1)
+        remainingSeconds    = (entry.cycleSeconds + LOOP_MARGIN_SECONDS) * loopCount
+        p90RemainingSeconds = (entry.p90Seconds + LOOP_MARGIN_SECONDS) * loopCount
+        return Eta(
+            entry               = entry,
+            remainingCount      = remainingCount,
+            remainingSeconds    = remainingSeconds,
+            finishTime          = now + datetime.timedelta(seconds=remainingSeconds),
+            p90RemainingSeconds = p90RemainingSeconds,
+            p90FinishTime       = now + datetime.timedelta(seconds=p90RemainingSeconds),
+        )
+
+
+def describeEta(eta: Eta) -> str:
+    return (
+        f"{eta.entry.laserFileName}: {eta.remainingCount} workpieces left "
+        f"at {eta.entry.cycleSeconds:.0f}s per loop of {eta.entry.workpieceCount}, "
+        f"{formatDuration(eta.remainingSeconds)} until {eta.finishTime:%m-%d %H:%M}, "
+        f"{formatDuration(eta.p90RemainingSeconds)} until {eta.p90FinishTime:%m-%d %H:%M} at P90 "
+        f"({eta.entry.sampleCount} loops, last cut {eta.entry.lastUpdated:%Y-%m-%d})"
+    )
+
+
+cycleProfiles = {}
+
+
+def getCycleProfile(profilePath: Path = CYCLE_PROFILE_PATH) -> CycleProfile:
+    """
+    Gets the cycle time profile at a path, kept for the lifetime of the process.
+    """
+    key = str(profilePath)
+    if key not in cycleProfiles:
+        cycleProfiles[key] = CycleProfile(profilePath)
+        cycleProfiles[key].refresh(forceChk=True)
+    return cycleProfiles[key]
+
+
+def estimate(laserFileName: str, remainingCount: int) -> Optional[Eta]:
+    """
+    Estimates the time left to cut workpieces of a laser file from the cycle
+    time profile, see `CycleProfile.estimate`.
+    """
+    return getCycleProfile().estimate(laserFileName, remainingCount)
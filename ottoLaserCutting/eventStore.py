@@ -0,0 +1,294 @@
+import config
+import logIngest
+import logEvent
+
+import sqlite3
+import datetime
+import threading
+from contextlib import closing
+from typing import Iterator, NamedTuple, Optional
+from pathlib import Path
+
+EVENT_STORE_PATH = Path(config.CACHE_DIR_PATH, "events.sqlite3")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    name        TEXT PRIMARY KEY,
+    ctime       REAL,
+    mtime       REAL,
+    size        INTEGER,
+    recordCount INTEGER,
+    lastLineIdx INTEGER,
+    year        INTEGER,
+    lastMonth   INTEGER,
+    laserFile   TEXT
+);
+CREATE INDEX IF NOT EXISTS logsCtime ON logs(ctime);
+CREATE TABLE IF NOT EXISTS records (
+    log     TEXT,
+    lineIdx INTEGER,
+    line    TEXT,
+    PRIMARY KEY (log, lineIdx)
+);
+CREATE TABLE IF NOT EXISTS events (
+    log       TEXT,
+    lineIdx   INTEGER,
+    kind      TEXT,
+    timeStamp TEXT,
+    time      TEXT,
+    laserFile TEXT,
+    number1   INTEGER,
+    number2   INTEGER,
+    text      TEXT
+);
+CREATE INDEX IF NOT EXISTS eventsLog ON events(log, lineIdx);
+CREATE UNIQUE INDEX IF NOT EXISTS eventsLineKind ON events(log, lineIdx, kind);
+CREATE INDEX IF NOT EXISTS eventsTime ON events(time);
+"""
+# Held while logs are synced and while results are accumulated from the store,
+# so that the log watcher and the GUI never sync the same log at once
+syncLock = threading.RLock()
+# Stores whose tables have been created by this process
+initializedPaths = set()
+
+
+class StoredEvent(NamedTuple):
+    """
+    An event read back from the store.
+
+    Attributes:
+        lineIdx (int): Index of the text line of the log recording the event.
+        event (logEvent.LogEvent): The event itself.
+        time (datetime.datetime): Decoded timestamp of the event.
+    """
+    lineIdx: int
+    event:   logEvent.LogEvent
+    time:    datetime.datetime
+
+
+def connect(storePath: Path = EVENT_STORE_PATH) -> sqlite3.Connection:
+    """
+    Opens the event store, creating its tables on first use by the process.
+    Connections are short lived so that the GUI and the hotkey listener threads
+    never share one.
+    """
+    key = str(storePath)
+    # A store deleted meanwhile, e.g. along with the cache, is created again
+    initializedChk = key in initializedPaths and storePath.exists()
+    storePath.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(storePath)
+    if not initializedChk:
+        conn.executescript(SCHEMA)
+        initializedPaths.add(key)
+    return conn
+
+
+def _resetLog(conn: sqlite3.Connection, name: str) -> None:
+    conn.execute("DELETE FROM records WHERE log = ?", (name,))
+    conn.execute("DELETE FROM events WHERE log = ?", (name,))
+    conn.execute("DELETE FROM logs WHERE name = ?", (name,))
+
+
+def sync(rtfFiles: list, storePath: Path = EVENT_STORE_PATH) -> None:
+    """
+    Appends the events recorded since the last sync of every rtf log to the store.
+
+    Logs whose size and mtime are unchanged are skipped without being opened,
+    the others are ingested, in parallel when `logIngest.workerCount` allows it.
+    Events of logs that got rewritten are replaced. Logs deleted from disk are
+    left untouched so their history stays queryable.
+
+    Args:
+        rtfFiles (list[Path]): Paths to the rtf logs.
+        storePath (Path): Path to the event store.
+    """
+    with syncLock, closing(connect(storePath)) as conn:
+        logRows = {
+            row[0]: row
+            for row in conn.execute(
+                "SELECT name, size, mtime, recordCount, lastLineIdx, year, lastMonth, laserFile FROM logs"
+            )
+        }
+        staleFiles = []
+        ctimes = {}
+        for rtfFile in rtfFiles:
+            stat = rtfFile.stat()
+            logRow = logRows.get(rtfFile.name)
+            if not logRow or logRow[1] != stat.st_size or logRow[2] != stat.st_mtime:
+                staleFiles.append(rtfFile)
+                ctimes[rtfFile.name] = stat.st_ctime
+        if not staleFiles:
+            return
+
+        # Logs missing from the store are read from byte 0, whatever their checkpoint
+        ingestions = logIngest.ingestAll(staleFiles, [rtfFile.name in logRows for rtfFile in staleFiles])
+        for rtfFile, (checkpoint, newLines, resetChk) in zip(staleFiles, ingestions):
+            name = rtfFile.name
+            logRow = logRows.get(name)
+            timeStampDecoder = logEvent.TimeStampDecoder(
+                datetime.datetime.fromtimestamp(checkpoint.mtime)
+            )
+            laserFile = ""
+            recordCount = 0
+            lastLineIdx = -1
+            # The checkpoint starts over when the log has been rewritten
+            if logRow and not resetChk:
+                _, _, _, recordCount, lastLineIdx, year, lastMonth, laserFile = logRow
+                timeStampDecoder.year = year
+                timeStampDecoder.lastMonth = lastMonth
+                # Lines stored right before the checkpoint could be saved are read again
+                newLines = [[lineIdx, line] for lineIdx, line in newLines if lineIdx > lastLineIdx]
+
+            eventRows = []
+            for lineIdx, line in newLines:
+                for event in logEvent.classifyLine(line):
+                    if event.kind == logEvent.FILE_OPEN:
+                        laserFile = event.text
+                    numbers = event.numbers + (None, None)
+                    eventRows.append((
+                        name,
+                        lineIdx,
+                        event.kind,
+                        event.timeStamp,
+                        timeStampDecoder.decode(event.timeStamp).isoformat(" "),
+                        laserFile,
+                        numbers[0],
+                        numbers[1],
+                        event.text,
+                    ))
+
+            with conn:
+                if resetChk:
+                    _resetLog(conn, name)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO records VALUES (?, ?, ?)",
+                    [(name, lineIdx, line) for lineIdx, line in newLines]
+                )
+                conn.executemany("INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", eventRows)
+                conn.execute(
+                    "INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        name,
+                        ctimes[name],
+                        checkpoint.mtime,
+                        checkpoint.size,
+                        recordCount + len(newLines),
+                        newLines[-1][0] if newLines else lastLineIdx,
+                        timeStampDecoder.year,
+                        timeStampDecoder.lastMonth,
+                        laserFile,
+                    )
+                )
+            # Moved on only once its lines are stored, none gets lost in between
+            logIngest.saveCheckpoint(rtfFile, checkpoint)
+
+
+def queryLogs(
+    createdSince: datetime.datetime,
+    createdBefore: Optional[datetime.datetime] = None,
+    storePath: Path = EVENT_STORE_PATH
+) -> list:
+    """
+    Lists the stored logs created within a time window, whether they are still
+    on disk or not.
+
+    Args:
+        createdSince (datetime.datetime): Start of the window, inclusive.
+        createdBefore (Optional[datetime.datetime]): End of the window, exclusive.
+            The window is left open when omitted.
+        storePath (Path): Path to the event store.
+
+    Returns:
+        list[str]: File names of the logs ordered by modification time, then by name.
+    """
+    createdBeforeTime = createdBefore.timestamp() if createdBefore else float("inf")
+    with closing(connect(storePath)) as conn:
+        return [
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM logs WHERE ctime >= ? AND ctime < ? ORDER BY mtime, name",
+                (createdSince.timestamp(), createdBeforeTime)
+            )
+        ]
+
+
+def queryLogState(logName: str, storePath: Path = EVENT_STORE_PATH) -> Optional[tuple]:
+    """
+    Reads the size and mtime a stored log had when it was last synced.
+
+    Returns:
+        Optional[tuple]: `(size, mtime)`, or None if the log isn't stored.
+    """
+    with closing(connect(storePath)) as conn:
+        return conn.execute(
+            "SELECT size, mtime FROM logs WHERE name = ?",
+            (logName,)
+        ).fetchone()
+
+
+def iterEvents(conn: sqlite3.Connection, logName: str, afterLineIdx: int = -1) -> Iterator[StoredEvent]:
+    """
+    Lazily reads the events of a stored log back through an open connection.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the event store.
+        logName (str): File name of the log.
+        afterLineIdx (int): Only the events of the lines after this one are read.
+
+    Yields:
+        StoredEvent: Events in log order.
+    """
+    cursor = conn.execute(
+        "SELECT lineIdx, kind, timeStamp, time, number1, number2, text FROM events "
+        "WHERE log = ? AND lineIdx > ? ORDER BY lineIdx, rowid",
+        (logName, afterLineIdx)
+    )
+    for lineIdx, kind, timeStamp, time, number1, number2, text in cursor:
+        yield StoredEvent(
+            lineIdx,
+            logEvent.LogEvent(
+                kind,
+                timeStamp,
+                tuple(number for number in (number1, number2) if number is not None),
+                text
+            ),
+            datetime.datetime.fromisoformat(time)
+        )
+
+
+def queryEvents(logName: str, afterLineIdx: int = -1, storePath: Path = EVENT_STORE_PATH) -> list:
+    """
+    Reads the events of a stored log back.
+
+    Args:
+        logName (str): File name of the log.
+        afterLineIdx (int): Only the events of the lines after this one are read.
+        storePath (Path): Path to the event store.
+
+    Returns:
+        list[StoredEvent]: Events in log order.
+    """
+    with closing(connect(storePath)) as conn:
+        return list(iterEvents(conn, logName, afterLineIdx))
+
+
+def queryLines(logName: str, afterLineIdx: int = -1, storePath: Path = EVENT_STORE_PATH) -> list:
+    """
+    Reads the record lines of a stored log back.
+
+    Args:
+        logName (str): File name of the log.
+        afterLineIdx (int): Only the lines after this one are read.
+        storePath (Path): Path to the event store.
+
+    Returns:
+        list: `[lineIdx, line]` pairs of the lines recording at least one event,
+        in log order.
+    """
+    with closing(connect(storePath)) as conn:
+        return [
+            list(row)
+            for row in conn.execute(
+                "SELECT lineIdx, line FROM records WHERE log = ? AND lineIdx > ? ORDER BY lineIdx",
+                (logName, afterLineIdx)
+            )
+        ]
@@ -0,0 +1,143 @@
+import style
+
+import warnings
+from typing import Optional
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import Cell
+from openpyxl.styles import NamedStyle
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+from openpyxl.worksheet.worksheet import Worksheet
+
+
+def newWorkbook() -> Workbook:
+    """
+    Creates a write-only workbook, whose rows are streamed to disk as they are
+    appended instead of being held in memory until the workbook is saved.
+    Worksheets are added with `create_sheet` and can only be saved once.
+    """
+    wb = Workbook(write_only=True)
+    registerFormats(wb)
+    return wb
+
+
+def registerFormats(wb: Workbook) -> None:
+    """
+    Registers `style.reportFormat` as named styles of a workbook, once per
+    workbook. Named styles can't be shared between workbooks, they are built
+    afresh for each one.
+    """
+    namedStyles = set(wb.named_styles)
+    for name, attributes in style.reportFormat.items():
+        if name not in namedStyles:
+            wb.add_named_style(NamedStyle(name=name, **attributes))
+
+
+class SheetWriter:
+    """
+    Appends rows of cells sharing the formats of `style.reportFormat` to a
+    worksheet. Rows are counted as they are appended so the worksheet never
+    has to be queried, which is what a write-only worksheet requires; regular
+    worksheets are written the same way.
+
+    Column widths and hidden columns are set right away since a write-only
+    worksheet writes them out before its first row.
+
+    Args:
+        ws (Worksheet): Worksheet to write, empty.
+        columnWidths (dict): `{columnLetter: width}`.
+        hiddenColumns (tuple): Letters of the columns to hide.
+    """
+    def __init__(self, ws: Worksheet, columnWidths: dict, hiddenColumns: tuple = ()):
+        self.ws = ws
+        self.writeOnlyChk = ws.parent.write_only
+        self.rowCount = 0
+        registerFormats(ws.parent)
+        for columnLetter, width in columnWidths.items():
+            ws.column_dimensions[columnLetter].width = width
+        for columnLetter in hiddenColumns:
+            ws.column_dimensions[columnLetter].hidden = True
+
+    def createCell(self, value=None, formatName: Optional[str] = None):
+        """
+        Creates a cell to pass to `append`, e.g. to attach a comment to it.
+        """
+        cell = WriteOnlyCell(self.ws, value)
+        if formatName:
+            cell.style = formatName
+        return cell
+
+    def append(self, values: list, formats: Optional[list] = None) -> int:
+        """
+        Appends a row.
+
+        Args:
+            values (list): Values of the cells from column A on. Cells created
+                with `createCell` are taken as they are.
+            formats (Optional[list]): Name of the format of every cell, None
+                for a cell left unformatted. Values beyond the formats are
+                left unformatted.
+
+        Returns:
+            int: Index of the row appended, starting from 1.
+        """
+        if formats:
+            values = [
+                self.createCell(value, formats[colIdx])
+                if colIdx < len(formats) and formats[colIdx] and not isinstance(value, Cell)
+                else value
+                for colIdx, value in enumerate(values)
+            ]
+        self.ws.append(values)
+        self.rowCount += 1
+        return self.rowCount
+
+    def mergeCells(self, rangeString: str) -> None:
+        if self.writeOnlyChk:
+            self.ws.merged_cells.add(rangeString)
+        else:
+            self.ws.merge_cells(rangeString)
+
+    def addTable(self, displayName: str, headers: list, headerRow: int, styleName: str) -> None:
+        """
+        Turns the rows from headerRow down to the last one appended into a table
+        with striped rows.
+
+        Args:
+            displayName (str): Name of the table.
+            headers (list[str]): Headers of the columns, as written in headerRow.
+            headerRow (int): Index of the row holding the headers.
+            styleName (str): Name of the table style, e.g. "TableStyleMedium24".
+        """
+        tab = Table(
+            displayName=displayName,
+            ref=f"A{headerRow}:{get_column_letter(len(headers))}{self.rowCount}"
+        )
+        # Write-only worksheets can't read the headers back
+        tab.tableColumns = [
+            TableColumn(id=colIdx, name=header)
+            for colIdx, header in enumerate(headers, 1)
+        ]
+        tab.tableStyleInfo = TableStyleInfo(
+            name=styleName,
+            showFirstColumn=False,
+            showLastColumn=False,
+            showRowStripes=True,
+            showColumnStripes=False
+        )
+        with warnings.catch_warnings():
+            # Warns about the table columns of write-only worksheets, set above
+            warnings.simplefilter("ignore", UserWarning)
+            self.ws.add_table(tab)
+
+    def setPrintLayout(self, lastColumn: str, firstRow: int, titleRows: str) -> None:
+        """
+        Prints the rows from firstRow down on A4 portrait pages, with page
+        numbers in the footer and titleRows repeated on every page.
+        """
+        self.ws.HeaderFooter.oddFooter.center.text = "第 &[Page] 页，共 &N 页"
+        self.ws.page_setup.paperSize = Worksheet.PAPERSIZE_A4
+        self.ws.page_setup.orientation = Worksheet.ORIENTATION_PORTRAIT
+        self.ws.print_title_rows = titleRows
+        self.ws.print_area = f"A{firstRow}:{lastColumn}{self.rowCount}"
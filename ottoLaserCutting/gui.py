@@ -5,6 +5,7 @@ from config import cfg
 import cutRecord
 import workpiece
 import rtfParse
+import cycleProfile
 
 import os
 import dearpygui.dearpygui as dpg
@@ -60,6 +61,20 @@ with dpg.window(
         dpg.add_button(label="日志分析", callback=rtfParse.rtfSimplify)
         with dpg.tooltip(dpg.last_item()):
             dpg.add_text("Ctrl-左键: 打开日志目录\nShift-左键: 35天内日志分析\nAlt-左键: 365天内耗时分析")
+    with dpg.group(horizontal=True):
+        remainingCountInput = dpg.add_input_int(label="支", default_value=100, min_value=0, min_clamped=True, width=120)
+        def estimateRemainingTime():
+            tubeProWindow = cutRecord.findTubeProWindow()
+            if not tubeProWindow:
+                return util.pr("TubePro is not running.")
+            laserFileName = cutRecord.getPartFileName(tubeProWindow[1])
+            eta = cycleProfile.estimate(laserFileName, dpg.get_value(remainingCountInput))
+            if eta is None:
+                return util.pr(f'No cycle time profile for "{laserFileName}", run the accumulated analysis first.')
+            util.pr(cycleProfile.describeEta(eta))
+        dpg.add_button(label="剩余耗时", callback=estimateRemainingTime)
+        with dpg.tooltip(dpg.last_item()):
+            dpg.add_text("按历史循环耗时估算当前排样文件剩余支数的加工时长")
     dpg.add_separator(label="排样文件")
     with dpg.group(horizontal=True):
         dpg.add_button(label="命名检查",     callback=workpiece.workpieceNamingVerification)
@@ -0,0 +1,177 @@
+import re
+import datetime
+from typing import NamedTuple
+
+FILE_OPEN      = "fileOpen"
+SEGMENT        = "segment"
+SCHEDULE_TOTAL = "scheduleTotal"
+LOOP_END       = "loopEnd"
+# Record formats of TubePro logs, each `classifyLine` event kind stands for one of them
+fileOpenPat      = re.compile(r"^\(([0-9:\/ ]+?)\)打开文件：(.+)")
+segmentFirstPat  = re.compile(r"^\(([0-9:\/ ]+?)\)总零件数:(\d+), 当前零件序号:1$")
+segmentPat       = re.compile(r"^\(([0-9:\/ ]+?)\)总零件数:(\d+), 当前零件序号:(\d+)")
+scheduelTotalPat = re.compile(r"^\(([0-9:\/ ]+?)\).+零件切割计划数目(\d+)")
+loopEndPat       = re.compile(r"^\(([0-9:\/ ]+?)\).+已切割零件数目(\d+)")
+# loopStartPat     = re.compile(r"^\(([0-9:\/ ]+?)\)开始加工.{1,3}循环计数：(\d+)")
+segmentNumbersPat = re.compile(r"(\d+), 当前零件序号:(\d+)")
+digitsPat         = re.compile(r"\d+")
+TIMESTAMP_CHARS = "0123456789:/ "
+# Tolerated clock skew between log timestamps and the file modification time
+ANCHOR_TOLERANCE = datetime.timedelta(days=1)
+NO_EVENTS = []
+
+
+class LogEvent(NamedTuple):
+    """
+    A record found in a TubePro log line.
+
+    Attributes:
+        kind (str): One of FILE_OPEN, SEGMENT, SCHEDULE_TOTAL and LOOP_END.
+        timeStamp (str): Timestamp of the line in "MM/DD HH:MM:SS" format.
+        numbers (tuple): Integers of the record:
+            - FILE_OPEN: ()
+            - SEGMENT: (segment total, segment index)
+            - SCHEDULE_TOTAL: (schedule total,)
+            - LOOP_END: (loop end count,)
+        text (str): Laser file path for FILE_OPEN, the text trailing the segment
+            index for SEGMENT, empty otherwise.
+    """
+    kind:      str
+    timeStamp: str
+    numbers:   tuple
+    text:      str = ""
+
+
+def segmentFirstChk(event: LogEvent) -> bool:
+    """
+    Checks whether an event is the first segment of a loop, i.e. a line
+    ending with "当前零件序号:1".
+    """
+    return event.kind == SEGMENT and event.numbers[1] == 1 and not event.text
+
+
+def _findTrailingNumber(rest: str, keyword: str) -> int:
+    """
+    Finds the number following the last occurrence of keyword that isn't at the
+    very start of rest, like a greedy `.+keyword(\\d+)` does.
+
+    Returns:
+        int: The number, or -1 if there is none.
+    """
+    idx = rest.rfind(keyword)
+    while idx > 0:
+        digitsMatch = digitsPat.match(rest, idx + len(keyword))
+        if digitsMatch:
+            return int(digitsMatch.group())
+        idx = rest.rfind(keyword, 0, idx)
+    return -1
+
+
+def classifyLine(line: str) -> list:
+    """
+    Classifies a TubePro log line in a single pass.
+
+    Most lines carry none of the records, they are sorted out by a cheap prefix and
+    keyword test before any parsing happens.
+
+    Args:
+        line (str): A text line of the log.
+
+    Returns:
+        list[LogEvent]: Events recorded by the line, in the order FILE_OPEN/SEGMENT,
+        SCHEDULE_TOTAL, LOOP_END. Empty for the vast majority of lines.
+    """
+    if line[:1] != "(":
+        return NO_EVENTS
+    if not (
+        "打开文件：" in line
+        or "总零件数:" in line
+        or "零件切割计划数目" in line
+        or "已切割零件数目" in line
+    ):
+        return NO_EVENTS
+
+    closeIdx = line.find(")")
+    timeStamp = line[1:closeIdx]
+    if closeIdx < 2 or timeStamp.strip(TIMESTAMP_CHARS):
+        return NO_EVENTS
+
+    rest = line[closeIdx + 1:]
+    events = []
+    if rest.startswith("打开文件："):
+        if len(rest) > 5:
+            events.append(LogEvent(FILE_OPEN, timeStamp, (), rest[5:]))
+    elif rest.startswith("总零件数:"):
+        numbersMatch = segmentNumbersPat.match(rest, 5)
+        if numbersMatch:
+            events.append(LogEvent(
+                SEGMENT,
+                timeStamp,
+                (int(numbersMatch.group(1)), int(numbersMatch.group(2))),
+                rest[numbersMatch.end():]
+            ))
+
+    scheduleTotal = _findTrailingNumber(rest, "零件切割计划数目")
+    if scheduleTotal != -1:
+        events.append(LogEvent(SCHEDULE_TOTAL, timeStamp, (scheduleTotal,)))
+    loopEndCount = _findTrailingNumber(rest, "已切割零件数目")
+    if loopEndCount != -1:
+        events.append(LogEvent(LOOP_END, timeStamp, (loopEndCount,)))
+
+    return events
+
+
+class TimeStampDecoder:
+    """
+    Decodes the "MM/DD HH:MM:SS" timestamps of a single log into datetimes.
+
+    Timestamps carry no year, so the year of the first timestamp is the latest
+    one not putting it after the anchor, then it's carried forward through the
+    log and bumped whenever the month wraps around (December to January).
+    Timestamps must therefore be decoded in log order.
+
+    Args:
+        anchor (datetime.datetime): A time no earlier than the first timestamp,
+            e.g. the modification time of the log.
+    """
+    def __init__(self, anchor: datetime.datetime):
+        self.anchor = anchor
+        self.year = 0
+        self.lastMonth = 0
+        self.cache = {}
+
+    def _parse(self, timeStamp: str, year: int) -> datetime.datetime:
+        if len(timeStamp) == 14:
+            return datetime.datetime(
+                year,
+                int(timeStamp[0:2]),
+                int(timeStamp[3:5]),
+                int(timeStamp[6:8]),
+                int(timeStamp[9:11]),
+                int(timeStamp[12:14]),
+            )
+        else:
+            # Not zero padded
+            return datetime.datetime.strptime(f"{year}/{timeStamp}", "%Y/%m/%d %H:%M:%S")
+
+    def decode(self, timeStamp: str) -> datetime.datetime:
+        timeObj = self.cache.get(timeStamp)
+        if timeObj:
+            return timeObj
+
+        if not self.year:
+            self.year = self.anchor.year
+            timeObj = self._parse(timeStamp, self.year)
+            if timeObj > self.anchor + ANCHOR_TOLERANCE:
+                self.year -= 1
+                timeObj = timeObj.replace(year=self.year)
+        else:
+            timeObj = self._parse(timeStamp, self.year)
+            if timeObj.month < self.lastMonth:
+                self.year += 1
+                self.cache.clear()
+                timeObj = timeObj.replace(year=self.year)
+
+        self.lastMonth = timeObj.month
+        self.cache[timeStamp] = timeObj
+        return timeObj
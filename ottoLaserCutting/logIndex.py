@@ -0,0 +1,83 @@
+import os
+import bisect
+import datetime
+from typing import NamedTuple, Optional
+from pathlib import Path
+
+
+class LogEntry(NamedTuple):
+    path:  Path
+    ctime: float
+
+
+class LogIndex:
+    """
+    Index of the logs of a directory sorted by creation time, so that the logs
+    created within a time window are found by bisection instead of a `stat` per
+    file. The directory is only listed again once its modification time changes,
+    i.e. when logs are added, renamed or deleted.
+
+    Args:
+        dirPath (Path): Directory holding the logs.
+        suffix (str): Suffix of the log files.
+    """
+    def __init__(self, dirPath: Path, suffix: str = ".rtf"):
+        self.dirPath  = Path(dirPath)
+        self.suffix   = suffix
+        self.dirMtime = -1
+        self.entries  = []
+        self.ctimes   = []
+
+    def refresh(self) -> None:
+        dirMtime = self.dirPath.stat().st_mtime_ns
+        if dirMtime == self.dirMtime:
+            return
+
+        entries = []
+        with os.scandir(self.dirPath) as dirEntries:
+            for dirEntry in dirEntries:
+                if not dirEntry.name.endswith(self.suffix) or not dirEntry.is_file():
+                    continue
+                # The directory listing already carries the stat data on Windows
+                entries.append(LogEntry(Path(dirEntry.path), dirEntry.stat().st_ctime))
+        entries.sort(key=lambda entry: (entry.ctime, entry.path.name))
+        self.entries  = entries
+        self.ctimes   = [entry.ctime for entry in entries]
+        self.dirMtime = dirMtime
+
+    def query(
+        self,
+        createdSince: datetime.datetime,
+        createdBefore: Optional[datetime.datetime] = None
+    ) -> list:
+        """
+        Lists the logs created within a time window.
+
+        Args:
+            createdSince (datetime.datetime): Start of the window, inclusive.
+            createdBefore (Optional[datetime.datetime]): End of the window,
+                exclusive. The window is left open when omitted.
+
+        Returns:
+            list[Path]: Paths of the logs ordered by creation time.
+        """
+        self.refresh()
+        start = bisect.bisect_left(self.ctimes, createdSince.timestamp())
+        if createdBefore is None:
+            end = len(self.ctimes)
+        else:
+            end = bisect.bisect_left(self.ctimes, createdBefore.timestamp(), start)
+        return [entry.path for entry in self.entries[start:end]]
+
+
+logIndexes = {}
+
+
+def getLogIndex(dirPath: Path) -> LogIndex:
+    """
+    Gets the index of a log directory, kept for the lifetime of the process.
+    """
+    key = str(dirPath)
+    if key not in logIndexes:
+        logIndexes[key] = LogIndex(dirPath)
+    return logIndexes[key]
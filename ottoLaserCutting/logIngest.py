@@ -0,0 +1,296 @@
+import config
+import rtfReader
+import logEvent
+
+import os
+import re
+import json
+import codecs
+import hashlib
+import threading
+import chardet
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import NamedTuple, Optional
+from pathlib import Path
+
+INGEST_CACHE_DIR_PATH = Path(config.CACHE_DIR_PATH, "切割机日志")
+ENCODING_CACHE_PATH   = Path(config.CACHE_DIR_PATH, "encoding.json")
+HEAD_DIGEST_SIZE = 4096
+ENCODING_SAMPLE_SIZE = 64 * 1024
+# Number of worker processes ingesting logs, set by the `--workers` launch option
+workerCount = 1
+codePagePat = re.compile(rb"\\ansicpg(\d+)")
+
+
+@dataclass
+class Checkpoint:
+    """
+    Ingestion state of a single TubePro rtf log.
+
+    Attributes:
+        size (int): File size in bytes when the log was last ingested.
+        mtime (float): File modification time when the log was last ingested.
+        offset (int): Byte offset right after the last complete line consumed.
+        encoding (str): Encoding used to decode the raw bytes.
+        codePage (str): Value of the `\\ansicpg` header, used to decode `\\'xx`
+            escapes of tails that don't carry the rtf header.
+        headDigest (str): sha1 of the first bytes, used to detect a rewritten log.
+        lineCount (int): Number of text lines consumed so far.
+    """
+    size:       int   = 0
+    mtime:      float = 0.0
+    offset:     int   = 0
+    encoding:   str   = ""
+    codePage:   str   = ""
+    headDigest: str   = ""
+    lineCount:  int   = 0
+
+
+class Ingestion(NamedTuple):
+    """
+    Result of ingesting the bytes appended to a rtf log.
+
+    Attributes:
+        checkpoint (Checkpoint): Checkpoint right after the lines read.
+        lines (list): `[lineIdx, line]` pairs of the lines read that match one
+            of the TubePro record patterns, in file order.
+        resetChk (bool): Whether the log was read from byte 0 again, the lines
+            then replacing every line read before.
+    """
+    checkpoint: Checkpoint
+    lines:      list
+    resetChk:   bool
+
+
+encodingCache = {}
+
+
+def loadEncodingCache() -> dict:
+    """
+    Loads the encoding cache from disk once per process.
+
+    Returns:
+        dict: Cache with keys:
+            - files: {filePath: [size, mtime, encoding]}
+            - dirs: {dirPath: encoding of the last file detected in it}
+    """
+    if not encodingCache:
+        encodingCache.update({"files": {}, "dirs": {}})
+        try:
+            with open(ENCODING_CACHE_PATH, "r", encoding="utf-8") as f:
+                encodingCache.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+    return encodingCache
+
+
+def saveEncodingCache() -> None:
+    """
+    Writes the encoding cache to disk. Worker processes write it concurrently,
+    the cache is best effort so losing a race only costs a later re-detection.
+    """
+    os.makedirs(ENCODING_CACHE_PATH.parent, exist_ok=True)
+    tempPath = Path(ENCODING_CACHE_PATH.parent, f"{ENCODING_CACHE_PATH.name}.{os.getpid()}.tmp")
+    try:
+        with open(tempPath, "w", encoding="utf-8") as f:
+            json.dump(encodingCache, f, ensure_ascii=False)
+        os.replace(tempPath, ENCODING_CACHE_PATH)
+    except OSError:
+        pass
+
+
+def detectEncoding(sample: bytes, dirEncoding: str = "") -> str:
+    """
+    Detects the encoding of the leading bytes of a file.
+
+    Args:
+        sample (bytes): Leading bytes of the file.
+        dirEncoding (str): Encoding of other files in the same directory, tried
+            before falling back to chardet.
+
+    Returns:
+        str: Detected encoding, or empty string if detection fails.
+    """
+    # Rtf escapes everything beyond ASCII, decoding it with its own code page
+    # is then both correct and safe for any stray raw byte
+    codePageMatch = codePagePat.search(sample)
+    if codePageMatch and sample.isascii():
+        return rtfReader.lookupCodePage(codePageMatch.group(1).decode())
+
+    if dirEncoding:
+        try:
+            # An incremental decoder tolerates a character cut off by the sample
+            codecs.getincrementaldecoder(dirEncoding)().decode(sample)
+            return dirEncoding
+        except (UnicodeDecodeError, LookupError):
+            pass
+
+    result = chardet.detect(sample)
+    if not result or not result["encoding"]:
+        return ""
+    else:
+        return result["encoding"]
+
+
+def getEncoding(filePath) -> str:
+    """
+    Detects the encoding of a file from its first `ENCODING_SAMPLE_SIZE` bytes.
+    Results are cached by path, size and mtime, and by directory.
+
+    Args:
+        filePath (str): Path to the file to analyze.
+
+    Returns:
+        str: Detected encoding as a string (e.g. 'utf-8'), or empty string if detection fails.
+    """
+    filePath = Path(filePath)
+    stat = filePath.stat()
+    cache = loadEncodingCache()
+    fileEntry = cache["files"].get(str(filePath))
+    if fileEntry and fileEntry[0] == stat.st_size and fileEntry[1] == stat.st_mtime:
+        return fileEntry[2]
+
+    with open(filePath, "rb") as f:
+        sample = f.read(ENCODING_SAMPLE_SIZE)
+    encoding = detectEncoding(sample, cache["dirs"].get(str(filePath.parent), ""))
+    if encoding:
+        cache["files"][str(filePath)] = [stat.st_size, stat.st_mtime, encoding]
+        cache["dirs"][str(filePath.parent)] = encoding
+        saveEncodingCache()
+    return encoding
+
+
+def recordLineChk(line: str) -> bool:
+    """
+    Checks whether a log line is one of the records the analysis relies on,
+    namely laser file opening, segment, schedule total and loop end records.
+    """
+    return bool(logEvent.classifyLine(line))
+
+
+def getCheckpointPath(rtfFile: Path, cacheDir: Path = INGEST_CACHE_DIR_PATH) -> Path:
+    return Path(cacheDir, rtfFile.stem + ".json")
+
+
+def loadCheckpoint(rtfFile: Path, cacheDir: Path = INGEST_CACHE_DIR_PATH) -> Optional[Checkpoint]:
+    """
+    Loads the stored checkpoint of a rtf log.
+
+    Returns:
+        Optional[Checkpoint]: The stored checkpoint, or None if there is none or
+        it's unreadable.
+    """
+    checkpointPath = getCheckpointPath(rtfFile, cacheDir)
+    if not checkpointPath.exists():
+        return None
+    try:
+        with open(checkpointPath, "r", encoding="utf-8") as f:
+            return Checkpoint(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def saveCheckpoint(rtfFile: Path, checkpoint: Checkpoint, cacheDir: Path = INGEST_CACHE_DIR_PATH) -> None:
+    """
+    Writes the checkpoint of a rtf log atomically so that an interrupted write
+    never leaves a truncated checkpoint behind. The temporary file is named
+    after the process and the thread, the log watcher and the GUI or worker
+    processes may write the same checkpoint at once.
+    """
+    checkpointPath = getCheckpointPath(rtfFile, cacheDir)
+    os.makedirs(checkpointPath.parent, exist_ok=True)
+    tempPath = Path(
+        checkpointPath.parent,
+        f"{checkpointPath.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    with open(tempPath, "w", encoding="utf-8") as f:
+        json.dump(asdict(checkpoint), f, ensure_ascii=False)
+    os.replace(tempPath, checkpointPath)
+
+
+def ingest(rtfFile: Path, cacheDir: Path = INGEST_CACHE_DIR_PATH, resumeChk: bool = True) -> Ingestion:
+    """
+    Reads the lines appended to a TubePro rtf log since its checkpoint.
+
+    TubePro only ever appends to its logs, so only the bytes appended since the
+    last checkpoint are decoded and converted to text. The log is parsed from byte 0
+    again when there is no checkpoint, the log shrank or its head has been rewritten.
+    The checkpoint isn't saved, see `saveCheckpoint`, so that it only moves on
+    once the lines are stored.
+
+    Args:
+        rtfFile (Path): Path to the rtf log.
+        cacheDir (Path): Directory where the checkpoints are stored.
+        resumeChk (bool): Whether to resume from the checkpoint, e.g. not when
+            the lines read before have been lost.
+
+    Returns:
+        Ingestion: Up to date checkpoint and the record lines appended.
+    """
+    stat = rtfFile.stat()
+    checkpoint = loadCheckpoint(rtfFile, cacheDir) if resumeChk else None
+    if checkpoint and checkpoint.size == stat.st_size and checkpoint.mtime == stat.st_mtime:
+        return Ingestion(checkpoint, [], False)
+
+    lines = []
+    with open(rtfFile, "rb") as f:
+        head = f.read(HEAD_DIGEST_SIZE)
+        headDigest = hashlib.sha1(head[:checkpoint.offset if checkpoint else 0]).hexdigest()
+        resetChk = (
+            not checkpoint
+            or checkpoint.offset > stat.st_size
+            or checkpoint.headDigest != headDigest
+        )
+        if resetChk:
+            checkpoint = Checkpoint()
+            checkpoint.encoding = getEncoding(str(rtfFile)) or "utf-8"
+            codePageMatch = codePagePat.search(head)
+            checkpoint.codePage = codePageMatch.group(1).decode() if codePageMatch else ""
+
+        f.seek(checkpoint.offset)
+        # Tails come without the rtf header and start inside the document group
+        reader = rtfReader.RtfLineReader(
+            f,
+            encoding=checkpoint.encoding,
+            codePage=checkpoint.codePage,
+            groupDepth=1 if checkpoint.offset else 0,
+        )
+        newLineCount = 0
+        for lineIdx, line in enumerate(reader, checkpoint.lineCount):
+            if recordLineChk(line):
+                lines.append([lineIdx, line])
+            newLineCount += 1
+        # The text after the last line break is read again once it's complete
+        checkpoint.lineCount += newLineCount
+        checkpoint.offset = reader.lineEnd
+
+    checkpoint.size  = stat.st_size
+    checkpoint.mtime = stat.st_mtime
+    checkpoint.headDigest = hashlib.sha1(head[:checkpoint.offset]).hexdigest()
+    return Ingestion(checkpoint, lines, resetChk)
+
+
+def ingestAll(rtfFiles: list, resumeChks: Optional[list] = None, workers: int = 0) -> list:
+    """
+    Ingests several rtf logs, each one in a worker process when more than one
+    worker is available. Only the lines appended travel back from the workers.
+
+    Args:
+        rtfFiles (list[Path]): Paths to the rtf logs.
+        resumeChks (Optional[list[bool]]): Whether to resume each log from its
+            checkpoint, see `ingest`. All of them are resumed when omitted.
+        workers (int): Number of worker processes, defaults to `workerCount`.
+
+    Returns:
+        list[Ingestion]: Ingestions in the same order as rtfFiles, whatever
+        order the workers finish in.
+    """
+    workers = workers or workerCount
+    cacheDirs = [INGEST_CACHE_DIR_PATH] * len(rtfFiles)
+    resumeChks = resumeChks if resumeChks is not None else [True] * len(rtfFiles)
+    if workers <= 1 or len(rtfFiles) < 2:
+        return list(map(ingest, rtfFiles, cacheDirs, resumeChks))
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(rtfFiles))) as executor:
+        return list(executor.map(ingest, rtfFiles, cacheDirs, resumeChks))
@@ -0,0 +1,121 @@
+import config
+import eventStore
+
+import os
+import json
+import hashlib
+from pathlib import Path
+
+SIMPLIFY_MANIFEST_PATH = Path(config.CACHE_DIR_PATH, "精简.json")
+
+
+def loadManifest() -> dict:
+    """
+    Loads the manifest of the simplified logs.
+
+    Returns:
+        dict: `{logName: entry}` where every entry holds:
+            - size, mtime: Size and mtime of the stored log when it was simplified
+            - lastLineIdx: Index of the last record line written out, -1 if none
+            - lastLineDigest: sha1 of that line, telling whether the log has been rewritten since
+            - outputSize: Size of the simplified log once written
+    """
+    try:
+        with open(SIMPLIFY_MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def saveManifest(manifest: dict) -> None:
+    os.makedirs(SIMPLIFY_MANIFEST_PATH.parent, exist_ok=True)
+    tempPath = Path(SIMPLIFY_MANIFEST_PATH.parent, SIMPLIFY_MANIFEST_PATH.name + ".tmp")
+    with open(tempPath, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tempPath, SIMPLIFY_MANIFEST_PATH)
+
+
+def getLineDigest(line: str) -> str:
+    return hashlib.sha1(line.encode("utf-8")).hexdigest()
+
+
+def writeLines(targetPath: Path, lines: list, appendChk: bool) -> None:
+    """
+    Writes record lines to a simplified log. A rewrite goes through a temporary
+    file so the previous output stays intact until the new one is complete.
+    """
+    if appendChk:
+        with open(targetPath, mode="a", encoding="utf-8") as f:
+            for _, line in lines:
+                f.write(line + "\n")
+    else:
+        tempPath = Path(targetPath.parent, targetPath.name + ".tmp")
+        with open(tempPath, mode="w", encoding="utf-8") as f:
+            for _, line in lines:
+                f.write(line + "\n")
+        os.replace(tempPath, targetPath)
+
+
+def simplify(rtfFile: Path, targetPath: Path, manifest: dict) -> bool:
+    """
+    Brings the simplified log of a stored rtf log up to date, redoing only the
+    work the manifest doesn't cover.
+
+    An untouched log is skipped altogether, a log that grew gets only its new
+    record lines appended. The log is simplified from scratch when it has been rewritten or when its
+    output has been modified outside.
+
+    Args:
+        rtfFile (Path): Path to the rtf log, which may be gone from disk.
+        targetPath (Path): Path to the simplified log.
+        manifest (dict): Manifest of the simplified logs, updated in place.
+
+    Returns:
+        bool: Whether the simplified log had to be written.
+
+    Raises:
+        PermissionError: The simplified log can't be written.
+    """
+    name = rtfFile.name
+    logState = eventStore.queryLogState(name)
+    entry = manifest.get(name)
+    outputSize = targetPath.stat().st_size if targetPath.exists() else -1
+
+    # Find out how much of the stored log the manifest entry still covers
+    newLines = []
+    if not entry:
+        coveredChk = False
+    elif logState and list(logState) == [entry["size"], entry["mtime"]]:
+        coveredChk = True
+    else:
+        newLines = eventStore.queryLines(name, entry["lastLineIdx"] - 1)
+        if entry["lastLineIdx"] == -1:
+            coveredChk = True
+        else:
+            coveredChk = bool(newLines) \
+                and newLines[0][0] == entry["lastLineIdx"] \
+                and getLineDigest(newLines[0][1]) == entry["lastLineDigest"]
+            newLines = newLines[1:]
+
+    writtenChk = True
+    if coveredChk and outputSize == entry["outputSize"]:
+        if newLines:
+            writeLines(targetPath, newLines, appendChk=True)
+            lastLineIdx, lastLineDigest = newLines[-1][0], getLineDigest(newLines[-1][1])
+        else:
+            writtenChk = False
+            lastLineIdx, lastLineDigest = entry["lastLineIdx"], entry["lastLineDigest"]
+    else:
+        lines = eventStore.queryLines(name)
+        writeLines(targetPath, lines, appendChk=False)
+        lastLineIdx, lastLineDigest = (lines[-1][0], getLineDigest(lines[-1][1])) if lines else (-1, "")
+
+    size, mtime = logState if logState else (0, 0.0)
+    manifest[name] = {
+        "size":           size,
+        "mtime":          mtime,
+        "lastLineIdx":    lastLineIdx,
+        "lastLineDigest": lastLineDigest,
+        "outputSize":     targetPath.stat().st_size,
+    }
+    return writtenChk
@@ -0,0 +1,298 @@
+import util
+import eventStore
+import rtfParse
+
+import os
+import sys
+import time
+import datetime
+import select
+import threading
+from typing import Optional
+from pathlib import Path
+
+pr = util.pr
+# Quiet time after the last change of a log before the laser profile is regenerated
+DEBOUNCE_SECONDS = 30
+# Longest a change waits for the regeneration while TubePro keeps writing
+MAX_DELAY_SECONDS = 300
+# The log directory is rescanned at least this often, changes of logs still
+# open for writing aren't always notified before their handle gets flushed
+POLL_SECONDS = 5
+# Inotify event masks
+IN_MODIFY      = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO    = 0x080
+IN_CREATE      = 0x100
+
+
+class PollChangeSource:
+    """
+    Fallback of the change sources: never notified, the watcher just rescans
+    the directory every time it has waited.
+    """
+    def __init__(self, stopEvent: threading.Event):
+        self.stopEvent = stopEvent
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Waits for a change of the directory.
+
+        Returns:
+            bool: Whether a change was notified before the timeout.
+        """
+        self.stopEvent.wait(timeout)
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyChangeSource:
+    """
+    Change source of Linux, notified by inotify through libc.
+
+    Raises:
+        OSError: inotify isn't available.
+    """
+    def __init__(self, dirPath: Path):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(
+            self.fd,
+            os.fsencode(dirPath),
+            IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        ) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed on {dirPath}")
+
+    def wait(self, timeout: float) -> bool:
+        readyFds, _, _ = select.select([self.fd], [], [], timeout)
+        if not readyFds:
+            return False
+        # Notifications are drained, the directory gets rescanned anyway
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class WindowsChangeSource:
+    """
+    Change source of Windows, notified by ReadDirectoryChangesW through an
+    overlapped request so that the wait can time out.
+    """
+    def __init__(self, dirPath: Path):
+        import win32con
+        import win32event
+        import win32file
+        import pywintypes
+
+        self.win32event = win32event
+        self.win32file  = win32file
+        self.handle = win32file.CreateFile(
+            str(dirPath),
+            0x0001, # FILE_LIST_DIRECTORY
+            win32con.FILE_SHARE_READ | win32con.FILE_SHARE_WRITE | win32con.FILE_SHARE_DELETE,
+            None,
+            win32con.OPEN_EXISTING,
+            win32con.FILE_FLAG_BACKUP_SEMANTICS | win32con.FILE_FLAG_OVERLAPPED,
+            None
+        )
+        self.overlapped = pywintypes.OVERLAPPED()
+        self.overlapped.hEvent = win32event.CreateEvent(None, True, False, None)
+        self.buffer = win32file.AllocateReadBuffer(8192)
+        self.notifyFilter = (
+            win32con.FILE_NOTIFY_CHANGE_FILE_NAME
+            | win32con.FILE_NOTIFY_CHANGE_SIZE
+            | win32con.FILE_NOTIFY_CHANGE_LAST_WRITE
+        )
+        self._request()
+
+    def _request(self) -> None:
+        self.win32file.ReadDirectoryChangesW(
+            self.handle, self.buffer, False, self.notifyFilter, self.overlapped
+        )
+
+    def wait(self, timeout: float) -> bool:
+        if self.win32event.WaitForSingleObject(
+            self.overlapped.hEvent, int(timeout * 1000)
+        ) != self.win32event.WAIT_OBJECT_0:
+            return False
+        self.win32file.GetOverlappedResult(self.handle, self.overlapped, True)
+        self.win32event.ResetEvent(self.overlapped.hEvent)
+        self._request()
+        return True
+
+    def close(self) -> None:
+        self.win32file.CancelIo(self.handle)
+        self.handle.Close()
+
+
+def openChangeSource(dirPath: Path, stopEvent: threading.Event):
+    """
+    Opens the change source of the platform, falling back to polling where
+    there is none or where it fails, e.g. on a network share.
+    """
+    try:
+        if sys.platform == "win32":
+            return WindowsChangeSource(dirPath)
+        elif sys.platform.startswith("linux"):
+            return InotifyChangeSource(dirPath)
+    except Exception as e:
+        pr(f"Watching {dirPath} by polling, change notifications are unavailable: {e}")
+    return PollChangeSource(stopEvent)
+
+
+def scanLogs(dirPath: Path) -> dict:
+    """
+    Takes the size and the modification time of every log of a directory.
+
+    Returns:
+        dict: `{logName: (size, mtimeNs)}`.
+    """
+    snapshot = {}
+    with os.scandir(dirPath) as dirEntries:
+        for dirEntry in dirEntries:
+            if dirEntry.name.endswith(".rtf") and dirEntry.is_file():
+                stat = dirEntry.stat()
+                snapshot[dirEntry.name] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+class LogWatcher:
+    """
+    Keeps the laser profile up to date in a daemon thread. Logs are ingested
+    into the event store as soon as they grow, only their appended bytes being
+    read, and the laser profile is regenerated once the logs have been quiet
+    for `debounceSeconds`, or after `maxDelaySeconds` at the latest while they
+    keep growing.
+
+    Args:
+        dirPath (Path): Directory of the TubePro logs.
+        days (int): Number of days the laser profile accumulates.
+        dstPath (Path): Path to the laser profile, apart from the period
+            reports the operators write into.
+        debounceSeconds (float): See `DEBOUNCE_SECONDS`.
+        maxDelaySeconds (float): See `MAX_DELAY_SECONDS`.
+        pollSeconds (float): See `POLL_SECONDS`.
+    """
+    def __init__(
+        self,
+        dirPath: Path = rtfParse.TUBEPRO_LOG_PATH,
+        days: int = rtfParse.ACCUMULATION_DAYS,
+        dstPath: Path = rtfParse.ACCUMULATED_PROFILE_PATH,
+        debounceSeconds: float = DEBOUNCE_SECONDS,
+        maxDelaySeconds: float = MAX_DELAY_SECONDS,
+        pollSeconds: float = POLL_SECONDS,
+    ):
+        self.dirPath = Path(dirPath)
+        self.days    = days
+        self.dstPath = dstPath
+        self.debounceSeconds = debounceSeconds
+        self.maxDelaySeconds = maxDelaySeconds
+        self.pollSeconds     = pollSeconds
+        self.isRunning = False
+        self.stopEvent = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.regenerationCount = 0
+        # Date the laser profile was last backed up by a regeneration
+        self.lastBackupDate = None
+
+    def start(self) -> None:
+        if self.isRunning:
+            return
+        self.isRunning = True
+        self.stopEvent.clear()
+        self.thread = threading.Thread(target=self._watchLoop, daemon=True)
+        self.thread.start()
+        pr(f"Watching TubePro logs at {self.dirPath}")
+
+    def stop(self) -> None:
+        self.isRunning = False
+        self.stopEvent.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+        pr("Stopped watching TubePro logs")
+
+    def toggle(self) -> None:
+        if self.isRunning:
+            self.stop()
+        else:
+            self.start()
+
+    def ingest(self, logNames: list) -> None:
+        eventStore.sync([Path(self.dirPath, logName) for logName in logNames])
+
+    def regenerate(self) -> Optional[Path]:
+        self.regenerationCount += 1
+        # Regenerated every few minutes while TubePro logs, the laser profile
+        # is only backed up before the first regeneration of the day
+        today = datetime.date.today()
+        savePath = rtfParse.parseAccu(
+            self.days, self.dstPath, backgroundChk=True, backupChk=self.lastBackupDate != today
+        )
+        if savePath:
+            self.lastBackupDate = today
+        return savePath
+
+    def _watchLoop(self) -> None:
+        changeSource = openChangeSource(self.dirPath, self.stopEvent)
+        try:
+            snapshot = scanLogs(self.dirPath)
+            firstChangeTime = None
+            lastChangeTime  = None
+            while self.isRunning:
+                timeout = self.pollSeconds
+                if firstChangeTime is not None:
+                    dueTime = min(
+                        lastChangeTime + self.debounceSeconds,
+                        firstChangeTime + self.maxDelaySeconds
+                    )
+                    timeout = max(0, min(timeout, dueTime - time.monotonic()))
+                changeSource.wait(timeout)
+                if not self.isRunning:
+                    break
+
+                currentSnapshot = scanLogs(self.dirPath)
+                changedLogNames = [
+                    logName for logName, logStat in currentSnapshot.items()
+                    if snapshot.get(logName) != logStat
+                ]
+                snapshot = currentSnapshot
+                now = time.monotonic()
+                if changedLogNames:
+                    try:
+                        self.ingest(changedLogNames)
+                    except Exception as e:
+                        pr(f"Failed to ingest {', '.join(changedLogNames)}: {e}")
+                    lastChangeTime = now
+                    if firstChangeTime is None:
+                        firstChangeTime = now
+
+                if firstChangeTime is not None and (
+                    now - lastChangeTime >= self.debounceSeconds
+                    or now - firstChangeTime >= self.maxDelaySeconds
+                ):
+                    firstChangeTime = None
+                    lastChangeTime  = None
+                    try:
+                        self.regenerate()
+                    except Exception as e:
+                        pr(f"Failed to regenerate the laser profile: {e}")
+        finally:
+            changeSource.close()
+
+
+watcher: Optional[LogWatcher] = None
@@ -0,0 +1,274 @@
+import math
+import datetime
+from typing import NamedTuple, Optional
+
+# Quantiles come back within this ratio of an actual interval
+RELATIVE_ACCURACY = 0.01
+# Roughly 5 KB once serialized, enough for intervals from 1 second to 7 hours at 1% accuracy
+MAX_BIN_COUNT = 512
+# Share of the shortest and of the longest intervals left out of the trimmed mean
+TRIM_RATIO = 0.1
+# Adjacent bins the mode is looked for in, about 10% of the values at 1% accuracy,
+# whole seconds falling unevenly into bins narrower than a couple of seconds
+MODE_WINDOW_BIN_COUNT = 5
+
+
+class LoopStats(NamedTuple):
+    """
+    Cycle time statistics of a laser file, in seconds.
+
+    Attributes:
+        count (int): Number of loop intervals the statistics are computed from.
+        median (float): Median interval.
+        p90 (float): 90th percentile interval.
+        trimmedMean (float): Mean interval without the `TRIM_RATIO` shortest and longest ones.
+        mode (float): Most frequent interval, within the accuracy of the sketch.
+        lastUpdated (datetime.datetime): Time of the last loop.
+    """
+    count:       int
+    median:      float
+    p90:         float
+    trimmedMean: float
+    mode:        float
+    lastUpdated: datetime.datetime
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch in the style of DDSketch. Values are
+    counted in bins growing geometrically, so any quantile comes back within
+    `relativeAccuracy` of an actual value while the memory only depends on the
+    range of the values, never on how many have been added. Once there are more
+    than `maxBinCount` bins the lowest ones are collapsed, which keeps the
+    upper quantiles accurate.
+
+    Sketches with the same accuracy are merged by adding their bins, the result
+    being the sketch of all the values of both.
+
+    Args:
+        relativeAccuracy (float): Relative accuracy of the quantiles.
+        maxBinCount (int): Maximum number of bins kept.
+    """
+    def __init__(self, relativeAccuracy: float = RELATIVE_ACCURACY, maxBinCount: int = MAX_BIN_COUNT):
+        self.relativeAccuracy = relativeAccuracy
+        self.maxBinCount = maxBinCount
+        self.gamma    = (1 + relativeAccuracy) / (1 - relativeAccuracy)
+        self.logGamma = math.log(self.gamma)
+        self.bins = {}
+        # Values not above 0 have no bin
+        self.zeroCount = 0
+        self.count = 0
+        self.sum   = 0.0
+        self.min   = math.inf
+        self.max   = -math.inf
+
+    def __len__(self) -> int:
+        return self.count
+
+    def getBinValue(self, binIdx: int) -> float:
+        # Bin binIdx holds the values in (gamma^(binIdx-1), gamma^binIdx]
+        return 2 * self.gamma ** binIdx / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value > 0:
+            binIdx = math.ceil(math.log(value) / self.logGamma)
+            self.bins[binIdx] = self.bins.get(binIdx, 0) + count
+            if len(self.bins) > self.maxBinCount:
+                self._collapse()
+        else:
+            self.zeroCount += count
+        self.count += count
+        self.sum   += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _collapse(self) -> None:
+        binIdxes = sorted(self.bins)
+        excessCount = len(binIdxes) - self.maxBinCount
+        self.bins[binIdxes[excessCount]] += sum(
+            self.bins.pop(binIdx) for binIdx in binIdxes[:excessCount]
+        )
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """
+        Adds the values of another sketch to this one.
+
+        Raises:
+            ValueError: The sketches have different accuracies.
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Can't merge quantile sketches of different accuracies")
+        for binIdx, count in other.bins.items():
+            self.bins[binIdx] = self.bins.get(binIdx, 0) + count
+        if len(self.bins) > self.maxBinCount:
+            self._collapse()
+        self.zeroCount += other.zeroCount
+        self.count += other.count
+        self.sum   += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimates a quantile of the values added.
+
+        Args:
+            q (float): Quantile between 0 and 1, e.g. 0.5 for the median.
+
+        Returns:
+            Optional[float]: The quantile, or None if the sketch is empty.
+        """
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        if rank < self.zeroCount:
+            return max(self.min, min(0.0, self.max))
+        cumulativeCount = self.zeroCount
+        for binIdx in sorted(self.bins):
+            cumulativeCount += self.bins[binIdx]
+            if cumulativeCount > rank:
+                break
+        return max(self.min, min(self.getBinValue(binIdx), self.max))
+
+    def mode(self, windowBinCount: int = MODE_WINDOW_BIN_COUNT) -> Optional[float]:
+        """
+        Estimates the most frequent value from the densest run of windowBinCount
+        adjacent bins, as the mean of their values weighted by their counts.
+
+        Returns:
+            Optional[float]: The mode, or None if the sketch is empty.
+        """
+        if not self.count:
+            return None
+        if not self.bins:
+            return max(self.min, min(0.0, self.max))
+
+        binIdxes = sorted(self.bins)
+        windowStartIdx = max(
+            range(binIdxes[0], binIdxes[-1] + 1),
+            key=lambda startIdx: sum(self.bins.get(startIdx + offset, 0) for offset in range(windowBinCount))
+        )
+        windowBins = [
+            (self.getBinValue(binIdx), self.bins[binIdx])
+            for binIdx in range(windowStartIdx, windowStartIdx + windowBinCount) if binIdx in self.bins
+        ]
+        modeValue = sum(value * count for value, count in windowBins) / sum(count for _, count in windowBins)
+        return max(self.min, min(modeValue, self.max))
+
+    def trimmedMean(self, trimRatio: float = TRIM_RATIO) -> Optional[float]:
+        """
+        Estimates the mean of the values without the `trimRatio` lowest and
+        highest ones.
+
+        Returns:
+            Optional[float]: The mean, or None if the sketch is empty.
+        """
+        if not self.count:
+            return None
+
+        trimCount = int(self.count * trimRatio)
+        keptCount = self.count - 2 * trimCount
+        # Bins are walked in ascending order, each one only contributes the
+        # part of its values lying between both trimmed ends
+        binValues = [(0.0, self.zeroCount)] if self.zeroCount else []
+        binValues += [(self.getBinValue(binIdx), self.bins[binIdx]) for binIdx in sorted(self.bins)]
+        total = 0.0
+        cumulativeCount = 0
+        for value, count in binValues:
+            keptStart = max(cumulativeCount, trimCount)
+            keptEnd   = min(cumulativeCount + count, trimCount + keptCount)
+            if keptEnd > keptStart:
+                total += max(self.min, min(value, self.max)) * (keptEnd - keptStart)
+            cumulativeCount += count
+        return total / keptCount
+
+    def toDict(self) -> dict:
+        return {
+            "relativeAccuracy": self.relativeAccuracy,
+            "maxBinCount":      self.maxBinCount,
+            "bins":             {str(binIdx): count for binIdx, count in self.bins.items()},
+            "zeroCount":        self.zeroCount,
+            "count":            self.count,
+            "sum":              self.sum,
+            "min":              self.min if self.count else None,
+            "max":              self.max if self.count else None,
+        }
+
+    @classmethod
+    def fromDict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data["relativeAccuracy"], data["maxBinCount"])
+        sketch.bins      = {int(binIdx): count for binIdx, count in data["bins"].items()}
+        sketch.zeroCount = data["zeroCount"]
+        sketch.count     = data["count"]
+        sketch.sum       = data["sum"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+
+class LoopSketch:
+    """
+    Bounded summary of the loops of a laser file: a quantile sketch of the
+    intervals between loops next to the time of the last loop. An interval of 0
+    stands for the first loop after the file has been opened, which only counts
+    as a loop.
+    """
+    def __init__(self):
+        self.intervals   = QuantileSketch()
+        self.loopCount   = 0
+        self.lastUpdated = -math.inf
+
+    def __len__(self) -> int:
+        return self.loopCount
+
+    def append(self, loopTime: datetime.datetime, interval: float) -> None:
+        self.loopCount += 1
+        self.lastUpdated = max(self.lastUpdated, loopTime.timestamp())
+        if interval:
+            self.intervals.add(interval)
+
+    def merge(self, other: "LoopSketch") -> None:
+        """
+        Adds the loops of another summary of the same laser file, e.g. the one
+        of another log or of another machine.
+        """
+        self.intervals.merge(other.intervals)
+        self.loopCount  += other.loopCount
+        self.lastUpdated = max(self.lastUpdated, other.lastUpdated)
+
+    def stats(self) -> Optional[LoopStats]:
+        """
+        Computes the cycle time statistics of the loops.
+
+        Returns:
+            Optional[LoopStats]: The statistics, or None if there is no interval.
+        """
+        if not self.intervals.count:
+            return None
+
+        return LoopStats(
+            count       = self.intervals.count,
+            median      = self.intervals.quantile(0.5),
+            p90         = self.intervals.quantile(0.9),
+            trimmedMean = self.intervals.trimmedMean(),
+            mode        = self.intervals.mode(),
+            lastUpdated = datetime.datetime.fromtimestamp(self.lastUpdated),
+        )
+
+    def toDict(self) -> dict:
+        return {
+            "intervals":   self.intervals.toDict(),
+            "loopCount":   self.loopCount,
+            "lastUpdated": self.lastUpdated if self.loopCount else None,
+        }
+
+    @classmethod
+    def fromDict(cls, data: dict) -> "LoopSketch":
+        loopSketch = cls()
+        loopSketch.intervals = QuantileSketch.fromDict(data["intervals"])
+        loopSketch.loopCount = data["loopCount"]
+        if loopSketch.loopCount:
+            loopSketch.lastUpdated = data["lastUpdated"]
+        return loopSketch
@@ -0,0 +1,144 @@
+import config
+import ocrEngine
+
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import closing
+from pathlib import Path
+
+OCR_CACHE_PATH = Path(config.CACHE_DIR_PATH, "ocr.sqlite3")
+# Entries take a few hundred bytes, which keeps years of screenshots before the
+# least recently used ones get evicted
+OCR_CACHE_MAX_SIZE = 32 * 1024 * 1024
+# Share of the maximum size kept by an eviction, so that it doesn't run on every write
+EVICTION_RATIO = 0.9
+# Keys per query, below the parameter limit of older SQLite builds
+QUERY_CHUNK_SIZE = 500
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key      TEXT PRIMARY KEY,
+    value    TEXT,
+    size     INTEGER,
+    lastUsed REAL
+);
+CREATE INDEX IF NOT EXISTS entriesLastUsed ON entries(lastUsed);
+"""
+
+
+def connect(cachePath: Path = OCR_CACHE_PATH) -> sqlite3.Connection:
+    """
+    Opens the OCR cache, creating its table on first use. Connections are short
+    lived so that the monitor and the hotkey listener threads never share one.
+    """
+    cachePath.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(cachePath)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def getTextsKey(image, languages: tuple) -> str:
+    """
+    Key of the texts recognized in an image, addressed by its pixels so that
+    the same region read off another screenshot, or off the same screenshot
+    renamed, is found too.
+    """
+    digest = hashlib.sha1(",".join(languages).encode())
+    digest.update(f"{image.shape}{image.dtype}".encode())
+    digest.update(image.tobytes())
+    return "texts:" + digest.hexdigest()
+
+
+def getRecordKey(textsKeys: list, *args) -> str:
+    """
+    Key of a record derived from the texts of several images and from whatever
+    else it depends on, e.g. the version of the rules fixing the texts.
+    """
+    digest = hashlib.sha1("\n".join(textsKeys).encode())
+    digest.update(json.dumps(args, ensure_ascii=False).encode())
+    return "record:" + digest.hexdigest()
+
+
+def getMany(keys, cachePath: Path = OCR_CACHE_PATH) -> dict:
+    """
+    Looks several keys up, marking the entries found as recently used.
+
+    Returns:
+        dict: `{key: value}` of the keys found.
+    """
+    keys = list(dict.fromkeys(keys))
+    found = {}
+    if not keys:
+        return found
+
+    with closing(connect(cachePath)) as conn, conn:
+        for chunkIdx in range(0, len(keys), QUERY_CHUNK_SIZE):
+            chunk = keys[chunkIdx:chunkIdx + QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            for key, value in conn.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({placeholders})", chunk
+            ):
+                found[key] = json.loads(value)
+            conn.execute(
+                f"UPDATE entries SET lastUsed = ? WHERE key IN ({placeholders})",
+                [time.time(), *chunk]
+            )
+    return found
+
+
+def putMany(items: dict, cachePath: Path = OCR_CACHE_PATH, maxSize: int = OCR_CACHE_MAX_SIZE) -> None:
+    """
+    Stores several entries, then evicts the least recently used ones once the
+    cache has grown past maxSize bytes.
+    """
+    if not items:
+        return
+
+    now = time.time()
+    rows = []
+    for key, value in items.items():
+        value = json.dumps(value, ensure_ascii=False)
+        rows.append((key, value, len(key) + len(value.encode()), now))
+    with closing(connect(cachePath)) as conn, conn:
+        conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", rows)
+        evict(conn, maxSize)
+
+
+def evict(conn: sqlite3.Connection, maxSize: int = OCR_CACHE_MAX_SIZE) -> int:
+    """
+    Drops the least recently used entries until the cache is back to
+    `EVICTION_RATIO` of maxSize, if it has grown past it.
+
+    Returns:
+        int: Number of entries dropped.
+    """
+    totalSize = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    if totalSize <= maxSize:
+        return 0
+
+    excessSize = totalSize - int(maxSize * EVICTION_RATIO)
+    evictedKeys = []
+    for key, size in conn.execute("SELECT key, size FROM entries ORDER BY lastUsed"):
+        if excessSize <= 0:
+            break
+        evictedKeys.append((key,))
+        excessSize -= size
+    conn.executemany("DELETE FROM entries WHERE key = ?", evictedKeys)
+    return len(evictedKeys)
+
+
+def readImages(languages: tuple, images: list, cachePath: Path = OCR_CACHE_PATH) -> list:
+    """
+    Recognizes the text of several images like `ocrEngine.readImages`, only
+    the images never recognized before going through the engine.
+    """
+    keys = [getTextsKey(image, languages) for image in images]
+    cachedTexts = getMany(keys, cachePath)
+    missingIdxes = [imageIdx for imageIdx, key in enumerate(keys) if key not in cachedTexts]
+    if missingIdxes:
+        recognizedTexts = ocrEngine.readImages(languages, [images[imageIdx] for imageIdx in missingIdxes])
+        newTexts = {keys[imageIdx]: texts for imageIdx, texts in zip(missingIdxes, recognizedTexts)}
+        putMany(newTexts, cachePath)
+        cachedTexts.update(newTexts)
+    return [cachedTexts[key] for key in keys]
@@ -0,0 +1,163 @@
+import util
+
+import os
+import itertools
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, Optional
+
+pr = util.pr
+# Language sets of the OCR engines, the title of TubePro holds Chinese while
+# its counters only hold digits
+TITLE_LANGUAGES  = ("ch_sim", "en")
+NUMBER_LANGUAGES = ("en",)
+# Number of worker processes of batch recognitions, kept low since every
+# worker loads the models of its own engine
+workerCount = max(1, min(4, (os.cpu_count() or 1) // 2))
+# Jobs submitted per worker process ahead of their recognition
+JOBS_IN_FLIGHT_PER_WORKER = 2
+
+
+class OcrEngine:
+    """
+    easyocr Reader shared by the whole process. Building a Reader loads its
+    model weights into torch, which takes seconds, so each language set is only
+    built once. Recognitions are serialized since the monitor thread and the
+    hotkey listener both take cut records while a Reader isn't thread safe.
+
+    Args:
+        languages (tuple): Languages of the Reader.
+    """
+    def __init__(self, languages: tuple):
+        # Brings torch in, only imported once OCR is actually needed
+        import easyocr
+
+        self.languages = tuple(languages)
+        self.reader = easyocr.Reader(list(self.languages))
+        self.lock = threading.Lock()
+
+    def readtext(self, image, **kwargs) -> list:
+        """
+        Recognizes the text of an image, see `easyocr.Reader.readtext`.
+        """
+        with self.lock:
+            return self.reader.readtext(image, **kwargs)
+
+
+engines = {}
+engineLocks = {}
+registryLock = threading.Lock()
+
+
+def getEngine(languages: tuple = TITLE_LANGUAGES) -> OcrEngine:
+    """
+    Gets the OCR engine of a language set, building it on first use. Threads
+    asking for an engine being built wait for it instead of building another.
+    """
+    key = tuple(languages)
+    engine = engines.get(key)
+    if engine is not None:
+        return engine
+
+    with registryLock:
+        engineLock = engineLocks.setdefault(key, threading.Lock())
+    # Engines of other language sets can be built meanwhile
+    with engineLock:
+        if key not in engines:
+            engines[key] = OcrEngine(key)
+        return engines[key]
+
+
+def warmUp(languageSets: tuple = (TITLE_LANGUAGES, NUMBER_LANGUAGES)) -> threading.Thread:
+    """
+    Builds the OCR engines in a daemon thread, so that the first cut record
+    doesn't wait for the models to load.
+
+    Returns:
+        threading.Thread: The thread building the engines.
+    """
+    def buildEngines():
+        for languages in languageSets:
+            try:
+                getEngine(languages)
+            except Exception as e:
+                pr(f"Failed to load the OCR engine of {', '.join(languages)}: {e}", gui=False)
+
+    thread = threading.Thread(target=buildEngines, daemon=True)
+    thread.start()
+    return thread
+
+
+def readImages(languages: tuple, images: list) -> list:
+    """
+    Recognizes the text of several images with the engine of a language set.
+
+    Returns:
+        list[list[str]]: Texts read off every image, in reading order.
+    """
+    engine = getEngine(languages)
+    return [[text for _, text, _ in engine.readtext(image)] for image in images]
+
+
+def initWorker(languages: tuple, threadCount: int) -> None:
+    """
+    Loads the engine of a batch worker process up front and shares the cores
+    among the workers, torch taking them all for each one otherwise.
+    """
+    import torch
+
+    torch.set_num_threads(threadCount)
+    getEngine(languages)
+
+
+def readBatch(imageSets, languages: tuple = TITLE_LANGUAGES, workers: int = 0) -> Iterator[tuple]:
+    """
+    Recognizes sets of images in worker processes, each one holding a single
+    engine, when more than one worker is available. Jobs are taken from
+    imageSets as workers become free, `JOBS_IN_FLIGHT_PER_WORKER` per worker
+    at most, and the jobs not started yet are cancelled once the generator is
+    closed, e.g. when the batch gets interrupted.
+
+    Args:
+        imageSets (Iterable[list]): Images of every job, e.g. the regions
+            cropped off a screenshot, possibly produced as they are taken.
+        languages (tuple): Languages of the engine.
+        workers (int): Number of worker processes, defaults to `workerCount`.
+
+    Yields:
+        tuple: `(jobIdx, texts)` in the order the jobs complete, texts being
+        what `readImages` returns for the images of the job.
+    """
+    workers = workers or workerCount
+    jobs = enumerate(imageSets)
+    # A pool isn't worth starting for a single job
+    firstJobs = list(itertools.islice(jobs, 2))
+    if workers <= 1 or len(firstJobs) < 2:
+        for jobIdx, images in itertools.chain(firstJobs, jobs):
+            yield jobIdx, readImages(languages, images)
+        return
+
+    jobs = itertools.chain(firstJobs, jobs)
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=initWorker,
+        initargs=(languages, max(1, (os.cpu_count() or 1) // workers)),
+    )
+    try:
+        futures = {
+            executor.submit(readImages, languages, images): jobIdx
+            for jobIdx, images in itertools.islice(jobs, workers * JOBS_IN_FLIGHT_PER_WORKER)
+        }
+        while futures:
+            doneFutures, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in doneFutures:
+                jobIdx = futures.pop(future)
+                # Submitted before yielding so that the workers keep busy meanwhile
+                for nextJobIdx, images in itertools.islice(jobs, 1):
+                    futures[executor.submit(readImages, languages, images)] = nextJobIdx
+                yield jobIdx, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+warmUpThread: Optional[threading.Thread] = None
@@ -0,0 +1,226 @@
+import util
+
+import re
+import json
+import hashlib
+import threading
+from typing import NamedTuple
+from pathlib import Path
+
+pr = util.pr
+# Characters giving a pattern a meaning other than its literal text
+REGEX_META_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+
+class OcrFixRule(NamedTuple):
+    """
+    Rule fixing the laser file names read by OCR, replacing every match of a
+    case insensitive pattern, see `re.sub`.
+    """
+    pattern:     str
+    replacement: str
+    literalChk:  bool
+
+
+def hasSimpleCase(char: str) -> bool:
+    """
+    Checks whether a character matches case insensitively exactly what its
+    lowercase does, e.g. not "ß" nor the long "ſ" matching "s".
+    """
+    lowerChar = char.lower()
+    return len(lowerChar) == 1 and char.upper().lower() == lowerChar
+
+
+def isLiteralRule(pattern: str, replacement: str) -> bool:
+    """
+    Checks whether a rule matches its pattern as plain text and replaces it by
+    its replacement as is, so that it can be merged with other literal rules.
+    """
+    return (
+        bool(pattern)
+        and not REGEX_META_CHARS.intersection(pattern)
+        and "\\" not in replacement
+        and all(hasSimpleCase(char) for char in pattern + replacement)
+    )
+
+
+def canOverlap(text: str, otherText: str) -> bool:
+    """
+    Checks whether two texts can overlap somewhere within a longer text.
+    """
+    if text in otherText or otherText in text:
+        return True
+    for overlapLength in range(1, min(len(text), len(otherText))):
+        if text.endswith(otherText[:overlapLength]) or otherText.endswith(text[:overlapLength]):
+            return True
+    return False
+
+
+def canMerge(literalRules: list, rule: OcrFixRule) -> bool:
+    """
+    Checks whether substituting a literal rule in the same pass as the literal
+    rules preceding it gives what substituting them one after the other does:
+    its pattern never overlaps theirs, so that their substitutions leave its
+    matches be, and can't overlap their replacements, so that no new match is
+    formed by them either.
+    """
+    pattern = rule.pattern.lower()
+    for previousRule in literalRules:
+        if canOverlap(pattern, previousRule.pattern.lower()):
+            return False
+        if previousRule.replacement:
+            if canOverlap(pattern, previousRule.replacement.lower()):
+                return False
+        # Removed text joins what surrounds it
+        elif len(pattern) > 1:
+            return False
+    return True
+
+
+class LiteralPass:
+    """
+    Consecutive literal rules substituted in a single pass of one alternation.
+    """
+    def __init__(self, literalRules: list):
+        self.replacements = [None] + [rule.replacement for rule in literalRules]
+        self.pattern = re.compile(
+            "|".join(f"({re.escape(rule.pattern)})" for rule in literalRules),
+            re.IGNORECASE
+        )
+
+    def sub(self, text: str) -> str:
+        return self.pattern.sub(lambda match: self.replacements[match.lastindex], text)
+
+
+class RulePass(NamedTuple):
+    pattern:     re.Pattern
+    replacement: str
+
+    def sub(self, text: str) -> str:
+        return self.pattern.sub(self.replacement, text)
+
+
+class CompiledOcrFixRules:
+    """
+    Rules fixing the laser file names read by OCR, compiled once. Consecutive
+    literal rules are merged into single passes whenever that gives the same
+    result as substituting them one after the other.
+
+    Args:
+        ruleData (dict): `{pattern: replacement}` in the order the rules apply.
+        version (str): Version of the rules, see `OcrFixRules`.
+    """
+    def __init__(self, ruleData: dict, version: str = ""):
+        self.version = version
+        self.rules   = []
+        self.passes  = []
+        literalRules = []
+
+        def flushLiteralRules():
+            if len(literalRules) > 1:
+                self.passes.append(LiteralPass(literalRules))
+            elif literalRules:
+                self.passes.append(RulePass(re.compile(literalRules[0].pattern, re.IGNORECASE), literalRules[0].replacement))
+            literalRules[:] = []
+
+        for pattern, replacement in ruleData.items():
+            try:
+                compiledPattern = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                pr(f"Skipped the OCR fix rule {pattern!r}: {e}", gui=False)
+                continue
+
+            rule = OcrFixRule(pattern, replacement, isLiteralRule(pattern, replacement))
+            self.rules.append(rule)
+            if not rule.literalChk:
+                flushLiteralRules()
+                self.passes.append(RulePass(compiledPattern, replacement))
+                continue
+            if not canMerge(literalRules, rule):
+                flushLiteralRules()
+            literalRules.append(rule)
+        flushLiteralRules()
+
+    def apply(self, text: str) -> str:
+        """
+        Fixes a laser file name, as substituting every rule one after the
+        other would.
+        """
+        for rulePass in self.passes:
+            text = rulePass.sub(text)
+        return text
+
+
+class OcrFixRules:
+    """
+    Rules fixing the laser file names read by OCR, loaded from a JSON object
+    of `{pattern: replacement}` and only loaded again once their file changes,
+    e.g. while the rules get edited as new misreadings turn up. Their version
+    is the SHA-1 of the file, so that records fixed by other rules are told
+    apart.
+
+    Args:
+        rulesPath (Path): Path to the JSON rules.
+    """
+    def __init__(self, rulesPath: Path):
+        self.rulesPath = Path(rulesPath)
+        self.compiled  = CompiledOcrFixRules({})
+        self.fileStat  = None
+        self.lock      = threading.Lock()
+
+    def refresh(self) -> CompiledOcrFixRules:
+        """
+        Loads the rules again if their file has changed since last loaded.
+
+        Returns:
+            CompiledOcrFixRules: The current rules.
+        """
+        try:
+            stat = self.rulesPath.stat()
+            fileStat = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            fileStat = None
+        if fileStat == self.fileStat:
+            return self.compiled
+
+        with self.lock:
+            if fileStat != self.fileStat:
+                compiled = CompiledOcrFixRules({})
+                if fileStat is not None:
+                    try:
+                        with open(self.rulesPath, "rb") as f:
+                            data = f.read()
+                        compiled = CompiledOcrFixRules(
+                            json.loads(data.decode("utf-8")),
+                            hashlib.sha1(data).hexdigest()
+                        )
+                    except (OSError, ValueError) as e:
+                        pr(f"Failed to load the OCR fix rules {self.rulesPath}: {e}", gui=False)
+                # Swapped at once, other threads see either rule set but never a mix
+                self.compiled = compiled
+                self.fileStat = fileStat
+            return self.compiled
+
+
+def applySequentially(ruleData: dict, text: str) -> str:
+    """
+    Fixes a laser file name by compiling and substituting every rule one after
+    the other, the reference `CompiledOcrFixRules.apply` is checked against.
+    """
+    for pattern, replacement in ruleData.items():
+        text = re.compile(pattern, re.IGNORECASE).sub(replacement, text)
+    return text
+
+
+ocrFixRuleSets = {}
+
+
+def getOcrFixRules(rulesPath: Path) -> CompiledOcrFixRules:
+    """
+    Gets the current OCR fix rules at a path, the file being watched for the
+    lifetime of the process.
+    """
+    key = str(rulesPath)
+    if key not in ocrFixRuleSets:
+        ocrFixRuleSets[key] = OcrFixRules(rulesPath)
+    return ocrFixRuleSets[key].refresh()
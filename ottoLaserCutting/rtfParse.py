@@ -1,173 +1,102 @@
 import util
 from config import cfg
 import keySet
-import style
+import logEvent
+import eventStore
+import loopStats
+import logIndex
+import logSimplify
+import cuttingSession
+import cycleProfile
+import excelWriter
 
-import chardet
 import os
 import re
 import datetime
+from contextlib import closing
 from typing import Optional
-from collections import Counter
 from pathlib import Path
-from striprtf.striprtf import rtf_to_text
 from openpyxl import Workbook
-from openpyxl.worksheet.table import Table, TableStyleInfo
 from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.styles import Protection, Alignment
 from pprint import pprint
 
 pr = util.pr
 LASER_PROFILE_PATH = Path(cfg.paths.otto, r"存档/耗时计算.xlsx")
+# Kept apart from the period reports, the log watcher regenerates it in the background
+ACCUMULATED_PROFILE_PATH = Path(cfg.paths.otto, r"存档/累计耗时计算.xlsx")
 TUBEPRO_LOG_PATH   = Path(cfg.paths.otto, r"存档/切割机日志")
-fileOpenPat      = re.compile(r"^\(([0-9:\/ ]+?)\)打开文件：(.+)")
-segmentFirstPat  = re.compile(r"^\(([0-9:\/ ]+?)\)总零件数:(\d+), 当前零件序号:1$")
-segmentPat       = re.compile(r"^\(([0-9:\/ ]+?)\)总零件数:(\d+), 当前零件序号:(\d+)")
-scheduelTotalPat = re.compile(r"^\(([0-9:\/ ]+?)\).+零件切割计划数目(\d+)")
-loopEndPat       = re.compile(r"^\(([0-9:\/ ]+?)\).+已切割零件数目(\d+)")
-# loopStartPat     = re.compile(r"^\(([0-9:\/ ]+?)\)开始加工.{1,3}循环计数：(\d+)")
-
-
-def getEncoding(filePath) -> str:
-    # Create a magic object
-    """
-    Detects the encoding of a file using chardet.
-
-    Args:
-        filePath (str): Path to the file to analyze.
-
-    Returns:
-        str: Detected encoding as a string (e.g. 'utf-8'), or empty string if detection fails.
-    """
-    with open(filePath, "rb") as f:
-        # Detect the encoding
-        rawData = f.read()
-        result = chardet.detect(rawData)
-        if not result:
-            return ""
-        if not result["encoding"]:
-            return ""
-        else:
-            return result["encoding"]
+ACCUMULATION_DAYS  = 60
 
 
 def fillWorkbook(ws: Worksheet, parsedResult: dict, sortChk: bool):
     """
     Fills an Excel worksheet with laser cutting file statistics from parsed data.
+    Rows are appended one after the other so that the worksheet can be write-only.
 
     Args:
-        ws (Worksheet): OpenPyXL Worksheet object to populate with data.
+        ws (Worksheet): Empty OpenPyXL Worksheet object to populate with data.
         parsedResult (dict): Dictionary containing parsed laser file information with keys:
-            - loop: List of loop intervals
-            - loopIntervalCounter: Counter object of interval frequencies
-            - loopIntervalUpdated: Dictionary of last update timestamps per interval
+            - loop: LoopSketch of the laser file
             - workpieceCount: Number of workpieces per file
         sortChk (bool): Whether to sort the results alphabetically by filename.
 
     Populates worksheet with:
         - Headers in row 1 with formatted columns
-        - File statistics grouped by laser filename
-        - Calculated fields for material/time consumption
+        - One row per laser filename with its median, 90th percentile,
+          trimmed mean and most frequent cycle times
+        - Calculated fields for material/time consumption, estimated from the
+          median cycle time and from the 90th percentile one as a pessimistic
+          bound
         - Cell protection with password '456'
     """
-    ws[f"A{1}"].value = "排样文件"
-    ws.column_dimensions["A"].width = 35
-    ws[f"B{1}"].value = "循环耗时"
-    ws.column_dimensions["B"].width = 12
-    ws[f"C{1}"].value = "循环统计"
-    ws.column_dimensions["C"].width = 12
-    ws[f"D{1}"].value = "最后统计日期"
-    ws.column_dimensions["D"].width = 22
-    ws[f"E{1}"].value = "工件目标数"
-    ws.column_dimensions["E"].width = 14
-    ws[f"F{1}"].value = "工件已加工数"
-    ws.column_dimensions["F"].width = 17
-    ws[f"G{1}"].value = "预计消耗长料"
-    ws.column_dimensions["G"].width = 17
-    ws[f"H{1}"].value = "预计消耗时长"
-    ws.column_dimensions["H"].width = 17
-    ws[f"I{1}"].value = "预计完成时间"
-    ws.column_dimensions["I"].width = 22
-    for col in range(1, 10):
-        ws.cell(row=1, column=col).style     = "Headline 1"
-        ws.cell(row=1, column=col).alignment = style.alCenter
+    writer = excelWriter.SheetWriter(ws, {
+        "A": 35, "B": 12, "C": 12, "D": 22, "E": 14, "F": 17, "G": 17,
+        "H": 17, "I": 22, "J": 12, "K": 17, "L": 22, "M": 17, "N": 12,
+    })
+    headers = [
+        "排样文件", "循环耗时", "循环统计", "最后统计日期", "工件目标数", "工件已加工数", "预计消耗长料",
+        "预计消耗时长", "预计完成时间", "P90耗时", "P90消耗时长", "P90完成时间", "截尾平均耗时",
+        "众数耗时",
+    ]
+    writer.append(headers, ["headline"] * len(headers))
+    rowFormats = [
+        "laserFile", "seconds", "times", "date", "targetInput", "doneInput", "pieces",
+        "duration", "finishTime", "seconds", "duration", "finishTime", "seconds",
+        "seconds",
+    ]
 
     if sortChk:
         items = sorted(parsedResult.items())
     else:
         items = parsedResult.items()
     for laserFileName, laserFileInfo in items:
-        if len(laserFileInfo["loop"]) < 1:
+        laserFileStats = laserFileInfo["loop"].stats()
+        if not laserFileStats:
             continue
 
-        mostCommon = laserFileInfo["loopIntervalCounter"].most_common(5)
-        laserFileStartRow = ws.max_row
-        skipRowCount = 0
-        headlineBorderSet = False
-        for intervalIdx, common in enumerate(mostCommon):
-            currentRow = intervalIdx + laserFileStartRow + 1 - skipRowCount
-            interval      = common[0]
-            intervalCount = common[1]
-
-            if intervalIdx == len(mostCommon) - 1:
-
-                # Merge laser filename cells under column A
-                if interval == "0":
-                    endRow = currentRow - 1
-                else:
-                    endRow = currentRow
-                # Check merge necessity of merging cells
-                if endRow > laserFileStartRow + 1:
-                    ws.merge_cells(
-                        start_row    = laserFileStartRow + 1,
-                        end_row      = endRow,
-                        start_column = 1,
-                        end_column   = 1
-                    )
-                    ws.cell(row=laserFileStartRow+1,column=1).alignment = style.alCenterWrap
-
-            # Don't fill in sheet when interval between two loop is 0
-            if interval == "0":
-                skipRowCount += 1
-                continue
-
-            ws.cell(row=currentRow, column=2).value = int(float(interval))
-            ws.cell(row=currentRow, column=2).number_format = '0"秒"'
-            ws.cell(row=currentRow, column=3).value = intervalCount
-            ws.cell(row=currentRow, column=3).number_format = '0"次"'
-            ws.cell(row=currentRow, column=4).value = laserFileInfo["loopIntervalUpdated"][interval]
-            ws.cell(row=currentRow, column=5).value = 100
-            ws.cell(row=currentRow, column=5).font = style.font["orangeBold"]
-            ws.cell(row=currentRow, column=5).number_format = '0"支"'
-            ws.cell(row=currentRow, column=5).protection = Protection(locked=False)
-            ws.cell(row=currentRow, column=6).value = 0
-            ws.cell(row=currentRow, column=6).font = style.font["greenBold"]
-            ws.cell(row=currentRow, column=6).number_format = '0"支"'
-            ws.cell(row=currentRow, column=6).protection = Protection(locked=False)
-            ws.cell(row=currentRow, column=7).value = f'=(E{currentRow}-F{currentRow})/{laserFileInfo["workpieceCount"]}'
-            ws.cell(row=currentRow, column=7).number_format = '0"支"'
-            ws.cell(row=currentRow, column=8).value = f'=(B{currentRow}+1)/{laserFileInfo["workpieceCount"]}*(E{currentRow}-F{currentRow})/86400'
-            ws.cell(row=currentRow, column=8).number_format = "[h]时mm分ss秒"
-            ws.cell(row=currentRow, column=9).value = f'=NOW() + H{currentRow}'
-            ws.cell(row=currentRow, column=9).number_format = "yyyy-m-d h:mm:ss"
-
-            if not headlineBorderSet:
-                # Add top border
-                headlineBorderSet = True
-                ws.cell(row=currentRow, column=1).value = laserFileName
-                ws[f"A{currentRow}"].border = style.borderMedium
-                ws[f"B{currentRow}"].border = style.borderMedium
-                ws[f"C{currentRow}"].border = style.borderMedium
-                ws[f"D{currentRow}"].border = style.borderMedium
-                ws[f"E{currentRow}"].border = style.borderMedium
-                ws[f"F{currentRow}"].border = style.borderMedium
-                ws[f"G{currentRow}"].border = style.borderMedium
-                ws[f"H{currentRow}"].border = style.borderMedium
-                ws[f"I{currentRow}"].border = style.borderMedium
-
-            ws.protection.sheet = True
-            ws.protection.password = '456'
-            ws.protection.enable()
+        currentRow = writer.rowCount + 1
+        workpieceCount = laserFileInfo["workpieceCount"]
+        writer.append([
+            laserFileName,
+            round(laserFileStats.median),
+            laserFileStats.count,
+            laserFileStats.lastUpdated,
+            100,
+            0,
+            f'=(E{currentRow}-F{currentRow})/{workpieceCount}',
+            f'=(B{currentRow}+1)/{workpieceCount}*(E{currentRow}-F{currentRow})/86400',
+            f'=NOW() + H{currentRow}',
+            round(laserFileStats.p90),
+            f'=(J{currentRow}+1)/{workpieceCount}*(E{currentRow}-F{currentRow})/86400',
+            f'=NOW() + K{currentRow}',
+            laserFileStats.trimmedMean,
+            round(laserFileStats.mode),
+        ], rowFormats)
+
+    if writer.rowCount > 1:
+        ws.protection.sheet = True
+        ws.protection.password = '456'
+        ws.protection.enable()
 
 
 def parse(
@@ -175,6 +104,8 @@ def parse(
     wb: Workbook,
     accumulationMode: bool,
     parsedResult: Optional[dict] = None,
+    events: Optional[list] = None,
+    newLoopsSince: Optional[datetime.datetime] = None,
 ) -> dict:
     """
     Parses an RTF file containing laser cutting records and organizes the data into a structured format.
@@ -184,6 +115,8 @@ def parse(
         wb: Workbook object for Excel output (optional, used in non-accumulation mode)
         accumulationMode: If True, accumulates results without writing to Excel
         parsedResult: Optional dictionary to accumulate results across multiple files
+        events: Optional stored events of rtfFile, read from the event store when omitted
+        newLoopsSince: Optional time after which loops are also counted apart, see "newLoop"
 
     Returns:
         Dictionary containing:
@@ -192,9 +125,8 @@ def parse(
             {
                 "laserFileName": {
                     "open": [(lineIdx, timestamp)],
-                    "loop": [(lineIdx, timestamp, interval)],
-                    "loopIntervalUpdated": {interval: timestamp},
-                    "loopIntervalCounter": Counter(intervals),
+                    "loop": LoopSketch of loop times and intervals,
+                    "newLoop": LoopSketch of the loops after newLoopsSince,
                     "workpieceCount": int
                 }
             }
@@ -210,38 +142,29 @@ def parse(
     if parsedResult is None:
         parsedResult = {}
 
-    now = datetime.datetime.now()
-    with open(rtfFile, "r", encoding=getEncoding(str(rtfFile))) as f:
-        content = rtf_to_text(f.read())
-        lines = content.split("\n")
+    # Only the records appended since the last run get parsed from the rtf
+    if events is None:
+        eventStore.sync([rtfFile])
+        events = eventStore.queryEvents(rtfFile.name)
 
     laserFileFullPath = ""
-    for lineIdx, line in enumerate(lines):
-        fileOpenMatch  = fileOpenPat.match(line)
-        loopStartMatch = segmentFirstPat.match(line)
-        if fileOpenMatch:
-            laserFileFullPath = fileOpenMatch.group(2)
-            laserFileName = laserFileFullPath.replace("D:\\欧拓图纸\\切割文件\\", "")
-            laserFileName = util.diametartSymbolUnify(laserFileName)
-            laserFileName = laserFileName.replace(".zx", ".zzx")
-            laserFileName = laserFileName.replace("  ", " ")
-            laserFileName = laserFileName.strip()
+    for lineIdx, event, timeObj in events:
+        if event.kind == logEvent.FILE_OPEN:
+            laserFileFullPath = event.text
+            laserFileName = cycleProfile.normalizeLaserFileName(laserFileFullPath)
             laserFileLastOpen = laserFileName
             if laserFileName not in parsedResult:
                 parsedResult[laserFileName] = {
                     "open": [],
-                    "loop": [],
-                    "loopIntervalUpdated": {},
-                    "loopIntervalCounter": Counter(),
+                    "loop": loopStats.LoopSketch(),
+                    "newLoop": loopStats.LoopSketch(),
                     "workpieceCount": 0
                 }
                 loopLastTime = None
-            parsedResult[laserFileName]["open"].append(( lineIdx, fileOpenMatch.group(1) ))
-
+            parsedResult[laserFileName]["open"].append(( lineIdx, event.timeStamp ))
 
-        if loopStartMatch:
-            timeStamp = loopStartMatch.group(1)
-            timeLoop  = datetime.datetime.strptime(f"{now.year}/{timeStamp}", "%Y/%m/%d %H:%M:%S")
+        elif logEvent.segmentFirstChk(event):
+            timeLoop = timeObj
             if not loopLastTime:
                 loopInterval = 0
             else:
@@ -254,12 +177,12 @@ def parse(
 
             loopLastTime = timeLoop
 
-            parsedResult[laserFileLastOpen]["loop"].append(( lineIdx, timeStamp, loopInterval))
-            parsedResult[laserFileLastOpen]["loopIntervalUpdated"][f"{loopInterval}"] = loopLastTime
-            parsedResult[laserFileLastOpen]["loopIntervalCounter"][f"{loopInterval}"] += 1
+            parsedResult[laserFileLastOpen]["loop"].append(timeLoop, loopInterval)
+            if newLoopsSince and timeLoop > newLoopsSince:
+                parsedResult[laserFileLastOpen]["newLoop"].append(timeLoop, loopInterval)
             # Get maximun workpiece count
-            if int(loopStartMatch.group(2)) > parsedResult[laserFileLastOpen]["workpieceCount"]:
-                parsedResult[laserFileLastOpen]["workpieceCount"] = int(loopStartMatch.group(2))
+            if event.numbers[0] > parsedResult[laserFileLastOpen]["workpieceCount"]:
+                parsedResult[laserFileLastOpen]["workpieceCount"] = event.numbers[0]
 
     if not parsedResult:
         pr(f"No laser file records parsed from rtf file {str(rtfFile)}")
@@ -274,7 +197,8 @@ def parse(
                 "parsedResult": parsedResult
                 }
     else:
-        if wb.active.title == "Sheet": # type: ignore
+        # Write-only workbooks have no default worksheet
+        if not wb.write_only and wb.active.title == "Sheet": # type: ignore
             ws = wb.active # type: ignore
             ws.title = rtfFile.stem # type: ignore
         else:
@@ -286,39 +210,110 @@ def parse(
                 }
 
 
+def getStoredLogs(
+    createdSince: datetime.datetime,
+    createdBefore: Optional[datetime.datetime] = None
+) -> list:
+    """
+    Brings the event store up to date with the rtf logs created within a time
+    window, then lists every stored log of that window, including those TubePro
+    has rotated away since.
+
+    Args:
+        createdSince (datetime.datetime): Start of the window, inclusive.
+        createdBefore (Optional[datetime.datetime]): End of the window, exclusive.
+            The window is left open when omitted.
+
+    Returns:
+        list[Path]: Paths of the logs ordered by modification time, then by name.
+    """
+    rtfFiles = logIndex.getLogIndex(TUBEPRO_LOG_PATH).query(createdSince, createdBefore)
+    eventStore.sync(rtfFiles)
+    return [
+        Path(TUBEPRO_LOG_PATH, name)
+        for name in eventStore.queryLogs(createdSince, createdBefore)
+    ]
+
+
 def parseAccuLog():
     """
-    Parses accumulated laser cutting logs from RTF files within the last 60 days.
-    Processes files in TUBEPRO_LOG_PATH (excluding '精简' files), extracts data into a workbook,
-    and saves results to LASER_PROFILE_PATH. Skips hidden column F in output.
+    Parses accumulated laser cutting logs from RTF files within the last 60 days
+    and opens the accumulated laser profile. Bound to the GUI, see `parseAccu`.
+    """
+    parseAccu(ACCUMULATION_DAYS, ACCUMULATED_PROFILE_PATH, openAfterSaveChk=True)
+
+
+def accumulate(days: int) -> Optional[dict]:
+    """
+    Parses the laser cutting logs created within the last days into a single
+    result, and merges the loops cut since the last update of the cycle time
+    profile into it.
+
+    Args:
+        days (int): Number of days the logs are accumulated over.
 
     Returns:
-        None: Prints message if no logs found, otherwise saves processed data to file.
+        Optional[dict]: Accumulated result of `parse`, None if no logs found.
     """
-    wb = Workbook()
     parsedResult = None
-    now = datetime.datetime.now()
-    timeDeltaLiteral = 60
-    timeDelta = datetime.timedelta(days=timeDeltaLiteral)
+    timeDelta = datetime.timedelta(days=days)
 
-    for f in Path(TUBEPRO_LOG_PATH).iterdir():
-        if f.suffix != ".rtf":
-            continue
-
-        logTime = datetime.datetime.fromtimestamp(f.stat().st_ctime)
-        if now - logTime <= timeDelta:
+    with eventStore.syncLock:
+        profile = cycleProfile.getCycleProfile()
+        # Other processes may have merged loops meanwhile
+        profile.refresh(forceChk=True)
+        for f in getStoredLogs(datetime.datetime.now() - timeDelta):
             parsedResult = parse(
                 rtfFile=f,
-                wb=wb,
+                wb=None, # type: ignore
                 accumulationMode=True,
-                parsedResult=parsedResult
+                parsedResult=parsedResult,
+                events=eventStore.queryEvents(f.name),
+                newLoopsSince=profile.mergedUntil or datetime.datetime.min,
                     )["parsedResult"] # type: ignore
-    if not parsedResult:
-        return pr("No parsed accumulated result")
+        if parsedResult:
+            profile.update(parsedResult)
+    return parsedResult
+
+
+def parseAccu(
+    days: int,
+    dstPath: Path = ACCUMULATED_PROFILE_PATH,
+    openAfterSaveChk: bool = False,
+    backgroundChk: bool = False,
+    backupChk: Optional[bool] = None
+) -> Optional[Path]:
+    """
+    Parses accumulated laser cutting logs from RTF files within the last days.
+    Processes files in TUBEPRO_LOG_PATH (excluding '精简' files), extracts data into a workbook,
+    and saves results to dstPath. Skips hidden column F in output.
+
+    Args:
+        days (int): Number of days the logs are accumulated over.
+        dstPath (Path): Path to the laser profile.
+        openAfterSaveChk (bool): Whether to open the laser profile once saved.
+        backgroundChk (bool): Whether the laser profile is regenerated in the
+            background, see `util.saveWorkbook`.
+        backupChk (Optional[bool]): Whether the laser profile is backed up
+            first, see `util.saveWorkbook`.
 
-    fillWorkbook(wb.active, parsedResult, True) # type: ignore
-    wb.active.column_dimensions['F'].hidden = True #type: ignore
-    util.saveWorkbook(wb, LASER_PROFILE_PATH, True) # type: ignore
+    Returns:
+        Optional[Path]: Path the laser profile was saved at, None if no logs
+        found or if a background save was skipped.
+    """
+    # The watcher and the GUI regenerate the same laser profile
+    with eventStore.syncLock:
+        parsedResult = accumulate(days)
+        if not parsedResult:
+            pr("No parsed accumulated result")
+            return None
+
+        wb = excelWriter.newWorkbook()
+        ws = wb.create_sheet()
+        # Columns have to be hidden before the first row of a write-only worksheet
+        ws.column_dimensions['F'].hidden = True
+        fillWorkbook(ws, parsedResult, True)
+        return util.saveWorkbook(wb, dstPath, openAfterSaveChk, backgroundChk, backupChk) # type: ignore
 
 
 def parsePeriodLog():
@@ -330,8 +325,7 @@ def parsePeriodLog():
     - Shift: Parse logs from last 35 days
     - Alt: Parse all logs (calls parseAllLog)
     - No modifier: Parse logs from last 1 day
-    Automatically expands time window (up to 3 attempts) if no logs found.
-    Saves parsed data to laser profile if logs were processed.
+    Bound to the GUI, see `parsePeriod`.
     """
     if "ctrl" in keySet.keys and "shift" in keySet.keys and "alt" in keySet.keys:
         return parseAccuLog()
@@ -344,9 +338,32 @@ def parsePeriodLog():
     else:
         timeDeltaLiteral = 1
 
-    wb = Workbook()
-    now = datetime.datetime.now()
+    parsePeriod(timeDeltaLiteral, LASER_PROFILE_PATH, openAfterSaveChk=True)
+
+
+def parsePeriod(
+    days: int,
+    dstPath: Path = LASER_PROFILE_PATH,
+    openAfterSaveChk: bool = False
+) -> Optional[Path]:
+    """
+    Parses the laser cutting logs created within the last days, one worksheet per log.
+    Automatically expands time window (up to 3 attempts) if no logs found.
+    Saves parsed data to dstPath if logs were processed.
+
+    Args:
+        days (int): Number of days of the first time window.
+        dstPath (Path): Path to the laser profile.
+        openAfterSaveChk (bool): Whether to open the laser profile once saved.
+
+    Returns:
+        Optional[Path]: Path the laser profile was saved at, None if no logs found.
+    """
+    wb = excelWriter.newWorkbook()
     parsedPeriodCount = 0
+    timeDeltaLiteral = days
+    now = datetime.datetime.now()
+    createdBefore = None
     for loopCount in range(3):
         if parsedPeriodCount > 0:
             break
@@ -355,21 +372,21 @@ def parsePeriodLog():
             timeDeltaLiteral = timeDeltaLiteral * (7 ** loopCount)
         timeDelta = datetime.timedelta(days=timeDeltaLiteral)
 
-        for f in Path(TUBEPRO_LOG_PATH).iterdir():
-            if f.suffix != ".rtf":
-                continue
-
-            logTime = datetime.datetime.fromtimestamp(f.stat().st_ctime)
-            if now - logTime <= timeDelta:
-                wb = parse(
-                    rtfFile=f,
-                    wb=wb,
-                    accumulationMode=False
-                    )["workbook"] # type: ignore
+        createdSince = now - timeDelta
+        for f in getStoredLogs(createdSince, createdBefore):
+            if parse(
+                rtfFile=f,
+                wb=wb,
+                accumulationMode=False,
+                events=eventStore.queryEvents(f.name),
+                )["workbook"]:
                 parsedPeriodCount += 1
+        # A wider window only takes the logs older than the ones handled already
+        createdBefore = createdSince
 
-    if parsedPeriodCount:
-        util.saveWorkbook(wb, LASER_PROFILE_PATH, True) # type: ignore
+    if not parsedPeriodCount:
+        return None
+    return util.saveWorkbook(wb, dstPath, openAfterSaveChk) # type: ignore
 
 
 def rtfSimplify():
@@ -379,13 +396,7 @@ def rtfSimplify():
     - Shift: Processes files from last 35 days
     - Alt: Processes files from last year
     - No modifier: Processes files from last day
-
-    For each matching RTF file:
-    1. Filters content using regex patterns (laserFileOpenPat, segmentPat, etc.)
-    2. Creates a simplified version with '精简' prefix in filename
-    3. Outputs processed files with relevant log lines
-
-    Handles cases where no files are found by expanding time window exponentially.
+    Bound to the GUI, see `simplifyPeriod`.
     """
     if "ctrl" in keySet.keys:
         return os.startfile(TUBEPRO_LOG_PATH)
@@ -396,9 +407,40 @@ def rtfSimplify():
     else:
         timeDeltaLiteral = 1
 
+    simplifyPeriod(timeDeltaLiteral, openAfterSaveChk=True)
+
 
+def simplifyPeriod(
+    days: int,
+    dstPath: Optional[Path] = None,
+    openAfterSaveChk: bool = False
+) -> Optional[Path]:
+    """
+    Simplifies the RTF log files in TUBEPRO_LOG_PATH created within the last
+    days and exports their cutting sessions into an Excel file.
+
+    For each matching RTF file:
+    1. Filters content using regex patterns (laserFileOpenPat, segmentPat, etc.)
+    2. Creates a simplified version with '精简' prefix in filename
+    3. Outputs processed files with relevant log lines, skipping untouched logs
+       and appending only the new lines of logs that grew
+
+    Handles cases where no files are found by expanding time window exponentially.
+
+    Args:
+        days (int): Number of days of the first time window.
+        dstPath (Optional[Path]): Path to the cutting session workbook, saved
+            in the export directory when omitted.
+        openAfterSaveChk (bool): Whether to open the workbook once saved.
+
+    Returns:
+        Optional[Path]: Path the workbook was saved at, None if no logs found.
+    """
+    timeDeltaLiteral = days
     parsedPeriodCount = 0
-    cuttingSessions = []
+    logNames = []
+    manifest = logSimplify.loadManifest()
+    createdBefore = None
     for loopCount in range(3):
         if parsedPeriodCount > 0:
             break
@@ -408,110 +450,11 @@ def rtfSimplify():
         timeDelta = datetime.timedelta(days=timeDeltaLiteral)
 
         # Iterating through all rtf files
-        for rtfFile in TUBEPRO_LOG_PATH.glob("*.rtf"):
+        createdSince = datetime.datetime.now() - timeDelta
+        for rtfFile in getStoredLogs(createdSince, createdBefore):
             now = datetime.datetime.now()
-            rtfCreationTime = datetime.datetime.fromtimestamp(rtfFile.stat().st_ctime)
-            if now - rtfCreationTime > timeDelta:
-                continue
-            with open(rtfFile, "r", encoding=getEncoding(str(rtfFile))) as f:
-                rtfContent = f.read()
-                content = rtf_to_text(rtfContent)
-                lines = content.split("\n")
-
-            # Itering through all lines in rtf file to filter out the lines
-            refinedLines = []
-            for line in lines:
-                fileOpenMatch      = fileOpenPat.match(line)
-                segmentMatch       = segmentPat.match(line)
-                scheduelTotalMatch = scheduelTotalPat.match(line)
-                loopEndMatch       = loopEndPat.match(line)
-                if not any((
-                    fileOpenMatch,
-                    segmentMatch,
-                    scheduelTotalMatch,
-                    loopEndMatch,
-                )):
-                    continue
-
-                if fileOpenMatch:
-                    timeStamp = fileOpenMatch.group(1)
-                    currentFileOpen = Path(fileOpenMatch.group(2)).stem
-                    currentFileOpen = currentFileOpen.replace("_X1", "")
-                    timeObj = datetime.datetime.strptime(
-                        f"{now.year}/{timeStamp}",
-                        "%Y/%m/%d %H:%M:%S"
-                    )
-                    if timeObj > now:
-                        timeObj = timeObj.replace(year=timeObj.year - 1)
-
-                    if not cuttingSessions or cuttingSessions[len(cuttingSessions) - 1]["fileName"]["value"] != currentFileOpen:
-                        cuttingSession = {
-                            "fileName":       {"value": currentFileOpen, "updatedTime": timeObj },
-                            "startCount":     {"value": -1, "updatedTime": timeObj },
-                            "segmentTotal":   {"value": 0, "updatedTime": None},
-                            "segmentCount":   {"value": 0, "updatedTime": None},
-                            "scheduleTotal":  {"value": 0, "updatedTime": None},
-                            "loopEndCount":   {"value": 0, "updatedTime": None},
-                            "totalCount":     {"value": 0, "updatedTime": None},
-                        }
-                        cuttingSessions.append(cuttingSession)
-
-
-                if segmentMatch:
-                    timeStamp = segmentMatch.group(1)
-                    timeObj = datetime.datetime.strptime(
-                        f"{now.year}/{timeStamp}",
-                        "%Y/%m/%d %H:%M:%S"
-                    )
-                    if timeObj > now:
-                        timeObj = timeObj.replace(year=timeObj.year - 1)
-                    cuttingSessions[len(cuttingSessions) - 1]["segmentTotal"] = {
-                        "value": int(segmentMatch.group(2)),
-                        "updatedTime": timeObj
-                    }
-                    cuttingSessions[len(cuttingSessions) - 1]["segmentCount"] = {
-                        "value": int(segmentMatch.group(3)),
-                        "updatedTime": timeObj
-                    }
-                if scheduelTotalMatch:
-                    timeStamp = scheduelTotalMatch.group(1)
-                    timeObj = datetime.datetime.strptime(
-                        f"{now.year}/{timeStamp}",
-                        "%Y/%m/%d %H:%M:%S"
-                    )
-                    if timeObj > now:
-                        timeObj = timeObj.replace(year=timeObj.year - 1)
-                    cuttingSessions[len(cuttingSessions) - 1]["scheduleTotal"] = {
-                        "value": int(scheduelTotalMatch.group(2)),
-                        "updatedTime": timeObj
-                    }
-                if loopEndMatch:
-                    timeStamp = loopEndMatch.group(1)
-                    timeObj = datetime.datetime.strptime(
-                        f"{now.year}/{timeStamp}",
-                        "%Y/%m/%d %H:%M:%S"
-                    )
-                    if timeObj > now:
-                        timeObj = timeObj.replace(year=timeObj.year - 1)
-                    cuttingSessions[len(cuttingSessions) - 1]["loopEndCount"] = {
-                        "value": int(loopEndMatch.group(2)),
-                        "updatedTime": timeObj
-                    }
-                    # determin whether the cutting session was starting from 0
-                    if cuttingSessions[len(cuttingSessions) - 1]["startCount"]["value"] == -1:
-                        if cuttingSessions[len(cuttingSessions) - 1]["loopEndCount"]["value"] == cuttingSessions[len(cuttingSessions) - 1]["segmentTotal"]["value"]:
-                            cuttingSessions[len(cuttingSessions) - 1]["startCount"]["value"] = 0
-                        else:
-                            cuttingSessions[len(cuttingSessions) - 1]["startCount"]["value"] = (
-                                cuttingSessions[len(cuttingSessions) - 1]["loopEndCount"]["value"]
-                                - cuttingSessions[len(cuttingSessions) - 1]["segmentTotal"]["value"]
-                            )
-                            if cuttingSessions[len(cuttingSessions) - 1]["startCount"]["value"] < 0:
-                                cuttingSessions[len(cuttingSessions) - 1]["startCount"]["value"] = 0
-
-
-
-                refinedLines.append(line + "\n")
+            logNames.append(rtfFile.name)
+
             targetPath = Path(
                 rtfFile.parent,
                 "精简",
@@ -519,91 +462,52 @@ def rtfSimplify():
             )
             os.makedirs(targetPath.parent, exist_ok=True)
             try:
-                with open(targetPath, mode="w", encoding="utf-8") as f2:
-                    for line in refinedLines:
-                        f2.write(line)
-                finishTime = datetime.datetime.now()
-                delta = finishTime - now
-                pr(f"导出文件: {str(rtfFile)}，耗时: {delta.total_seconds()}秒")
+                # Only what has changed since the last run is simplified
+                if logSimplify.simplify(rtfFile, targetPath, manifest):
+                    finishTime = datetime.datetime.now()
+                    delta = finishTime - now
+                    pr(f"导出文件: {str(rtfFile)}，耗时: {delta.total_seconds()}秒")
                 parsedPeriodCount += 1
             except PermissionError:
                 pr(f"无法写入文件: {str(targetPath)}，请检查文件是否被占用或权限设置。")
+        # A wider window only takes the logs older than the ones handled already
+        createdBefore = createdSince
 
-    if cuttingSessions:
+    logSimplify.saveManifest(manifest)
+    if logNames:
         pr("rtf日志精简完成")
     else:
-        return pr("没有rtf日志被分析")
-
-    # Compute the total count of for every file opened in every session
-    for session in cuttingSessions:
-        if session["loopEndCount"]["updatedTime"] and session["loopEndCount"]["updatedTime"] > session["segmentCount"]["updatedTime"]:
-            session["totalCount"]["value"] = session["loopEndCount"]["value"]
-            session["totalCount"]["updatedTime"] = session["loopEndCount"]["updatedTime"]
-        else:
-            session["totalCount"]["value"] = session["segmentCount"]["value"] + session["loopEndCount"]["value"]
-            session["totalCount"]["updatedTime"] = session["segmentCount"]["updatedTime"]
-
-        # Rectify the start count if the cutting session wasn't starting from 0
-        if session["startCount"]["value"] == -1 and session["loopEndCount"]["value"] == 0:
-            session["startCount"]["value"] = 0
-
+        pr("没有rtf日志被分析")
+        return None
 
     # Exporting cuttingSessions data into Excel file
-    wb = Workbook()
-    ws = wb.active # type: Worksheet
-    ws["A1"].value = "排样名称"
-    ws.column_dimensions["A"].width = 50
-    ws["B1"].value = "开始时间"
-    ws.column_dimensions["B"].width = 22
-    ws["C1"].value = "结束时间"
-    ws.column_dimensions["C"].width = 22
-    ws["D1"].value = "耗时"
-    ws.column_dimensions["D"].width = 12.5
-    ws["E1"].value = "开始数量"
-    ws.column_dimensions["E"].width = 10
-    ws["F1"].value = "结束数量"
-    ws.column_dimensions["F"].width = 10
-    ws["G1"].value = "目标数量"
-    ws.column_dimensions["G"].width = 10
-    skipCount = 0
-    for sessionIdx, session in enumerate(cuttingSessions):
-        if session["totalCount"]["value"] == 0:
-            skipCount += 1
-            continue
-        row = 2 + sessionIdx - skipCount
-        ws[f"A{row}"].value = session["fileName"]["value"]
-        ws[f"A{row}"].alignment = Alignment(wrapText = True)
-        ws[f"B{row}"].value = session["fileName"]["updatedTime"].strftime("%Y/%m/%d %H:%M:%S")
-        ws[f"B{row}"].number_format = "yyyy/m/d h:mm:ss"
-        ws[f"C{row}"].value = session["totalCount"]["updatedTime"].strftime("%Y/%m/%d %H:%M:%S")
-        ws[f"C{row}"].number_format = "yyyy/m/d h:mm:ss"
-        ws[f"D{row}"].value = f'=C{row}-B{row}'
-        ws[f"D{row}"].number_format = "[h]时mm分ss秒"
-        ws[f"E{row}"].value = session["startCount"]["value"]
-        ws[f"F{row}"].value = session["totalCount"]["value"]
-        ws[f"G{row}"].value = session["scheduleTotal"]["value"]
-
-
-    # Add table
-    tab = Table(displayName="Table1", ref=f"A1:G{ws.max_row}")
-
-    # Add printable area
-    ws.oddFooter.center.text = "第 &[Page] 页，共 &N 页" # type: ignore
-    ws.page_setup.paperSize = ws.PAPERSIZE_A4
-    ws.page_setup.orientation = ws.ORIENTATION_PORTRAIT
-    ws.print_title_rows = "2:2"
-    ws.print_area = f"A1:G{ws.max_row}"
-
-    # Add a default style with striped rows and banded columns
-    style = TableStyleInfo(
-            name="TableStyleMedium24",
-            showFirstColumn=False,
-            showLastColumn=False,
-            showRowStripes=True,
-            showColumnStripes=False
-            )
-    tab.tableStyleInfo = style
-    ws.add_table(tab)
-    util.saveWorkbook(wb, openAfterSaveChk=True)
+    wb = excelWriter.newWorkbook()
+    writer = excelWriter.SheetWriter(wb.create_sheet(), {
+        "A": 50, "B": 22, "C": 22, "D": 12.5, "E": 10, "F": 10, "G": 10,
+    })
+    headers = ["排样名称", "开始时间", "结束时间", "耗时", "开始数量", "结束数量", "目标数量"]
+    writer.append(headers)
+    rowFormats = ["wrap", "sessionTime", "sessionTime", "sessionDuration"]
+    # Events of all logs are merged by time so that sessions spanning several
+    # logs get stitched together
+    with closing(eventStore.connect()) as conn:
+        storedEvents = cuttingSession.mergeLogEvents(conn, logNames)
+        for session in cuttingSession.iterSessions(storedEvents):
+            if session["totalCount"]["value"] == 0:
+                continue
+            row = writer.rowCount + 1
+            writer.append([
+                session["fileName"]["value"],
+                session["fileName"]["updatedTime"].strftime("%Y/%m/%d %H:%M:%S"),
+                session["totalCount"]["updatedTime"].strftime("%Y/%m/%d %H:%M:%S"),
+                f'=C{row}-B{row}',
+                session["startCount"]["value"],
+                session["totalCount"]["value"],
+                session["scheduleTotal"]["value"],
+            ], rowFormats)
+
+    writer.addTable("Table1", headers, 1, "TableStyleMedium24")
+    writer.setPrintLayout("G", 1, "2:2")
+    return util.saveWorkbook(wb, dstPath, openAfterSaveChk)
 
 
@@ -0,0 +1,235 @@
+import re
+import codecs
+from typing import BinaryIO, Iterator
+
+CHUNK_SIZE = 1024 * 1024
+# A control word is at most a backslash, 32 letters, 11 digits and a delimiting space
+TOKEN_MAX_SIZE = 48
+# Groups whose content is never part of the text TubePro writes out
+DESTINATIONS = frozenset((
+    "fonttbl", "colortbl", "stylesheet", "info", "generator", "pict", "object",
+    "header", "footer", "listtable", "listoverridetable", "rsidtbl", "themedata",
+    "colorschememapping", "latentstyles", "datastore", "xmlnstbl", "filetbl",
+    "revtbl", "userprops",
+))
+SECTION_CHARS = {"par": "\n", "sect": "\n\n", "page": "\n\n"}
+SPECIAL_CHARS = {
+    "line": "\n",
+    "tab": "\t",
+    "emdash": "\u2014",
+    "endash": "\u2013",
+    "emspace": "\u2003",
+    "enspace": "\u2002",
+    "qmspace": "\u2005",
+    "bullet": "\u2022",
+    "lquote": "\u2018",
+    "rquote": "\u2019",
+    "ldblquote": "\u201C",
+    "rdblquote": "\u201D",
+    "row": "\n",
+    "cell": "|",
+    "nestcell": "|",
+    "~": "\xa0",
+    "\n": "\n",
+    "\r": "\r",
+    "{": "{",
+    "}": "}",
+    "\\": "\\",
+    "-": "\xad",
+    "_": "\u2011",
+    **SECTION_CHARS,
+}
+tokenPat = re.compile(
+    rb"\\([a-zA-Z]{1,32})(-?\d{1,10})?[ ]?"  # control word
+    rb"|((?:\\'[0-9a-fA-F]{2})+)"            # run of hex escapes
+    rb"|\\([^a-zA-Z])"                       # control symbol
+    rb"|([{}])"                              # group
+    rb"|[\r\n]+"
+    rb"|([^\\{}\r\n]+)"                      # run of plain text
+)
+
+
+def lookupCodePage(codePage: str) -> str:
+    """
+    Converts a `\\ansicpg` value into a codec name, falling back to utf8 when
+    Python doesn't know the code page.
+    """
+    encoding = f"cp{codePage}"
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        encoding = "utf8"
+    return encoding
+
+
+class RtfLineReader:
+    """
+    Streams the text lines of a TubePro rtf log out of a binary file handle.
+
+    Only the subset of rtf TubePro emits is understood: control words and symbols,
+    `\\'xx` hex escapes decoded in the code page of the log, `\\uN` characters and
+    destination groups such as the font and color tables. The file is read in
+    chunks so memory stays constant no matter how large the log is.
+
+    Iterating the reader yields every line terminated by `\\par` (or any other
+    control producing a line break). The text following the last line break is
+    kept in `remainder`, and `lineEnd` holds the absolute byte offset right
+    after the last line break consumed so a later read can resume from there.
+
+    Args:
+        f (BinaryIO): File handle opened in binary mode, positioned where reading starts.
+        encoding (str): Encoding of raw bytes outside of hex escapes.
+        codePage (str): `\\ansicpg` value to use until the log declares one.
+            Useful when reading a tail that doesn't carry the rtf header.
+        groupDepth (int): Group nesting level at the starting position.
+        endOffset (int): Absolute byte offset to stop reading at, -1 reads to EOF.
+        chunkSize (int): Number of bytes read at a time.
+    """
+    def __init__(
+        self,
+        f: BinaryIO,
+        encoding: str = "cp1252",
+        codePage: str = "",
+        groupDepth: int = 0,
+        endOffset: int = -1,
+        chunkSize: int = CHUNK_SIZE,
+    ):
+        self.f = f
+        self.textDecoder = codecs.getincrementaldecoder(encoding or "cp1252")(errors="replace")
+        self.hexEncoding = lookupCodePage(codePage) if codePage else "cp1252"
+        self.groupDepth = groupDepth
+        self.endOffset = endOffset
+        self.chunkSize = chunkSize
+        self.lineEnd = f.tell()
+        self.remainder = ""
+
+    def _readChunk(self, position: int) -> bytes:
+        if self.endOffset < 0:
+            return self.f.read(self.chunkSize)
+        return self.f.read(max(0, min(self.chunkSize, self.endOffset - position)))
+
+    def __iter__(self) -> Iterator[str]:
+        stack = []
+        ucSkip = 1        # Number of characters to skip after a unicode character
+        curSkip = 0       # Number of characters left to skip
+        ignorable = False
+        inDocument = self.groupDepth > 0
+        documentClosed = False
+        hexes = bytearray()
+        line = []
+
+        bufferOffset = self.f.tell()
+        buffer = b""
+        eof = False
+        while not eof and not documentClosed:
+            chunk = self._readChunk(bufferOffset + len(buffer))
+            eof = not chunk
+            buffer += chunk
+            safeEnd = len(buffer) if eof else len(buffer) - TOKEN_MAX_SIZE
+            pos = 0
+            while pos < safeEnd:
+                match = tokenPat.match(buffer, pos)
+                if not match:
+                    # Lone backslash at EOF
+                    pos += 1
+                    continue
+                pos = match.end()
+                word, arg, hexRun, symbol, brace, text = match.groups()
+                if hexRun:
+                    hexBytes = bytes.fromhex(hexRun.replace(b"\\'", b"").decode())
+                    if curSkip:
+                        skipped = min(curSkip, len(hexBytes))
+                        curSkip -= skipped
+                        hexBytes = hexBytes[skipped:]
+                    if not ignorable:
+                        hexes += hexBytes
+                    continue
+
+                if hexes:
+                    line.append(hexes.decode(self.hexEncoding, errors="replace"))
+                    hexes = bytearray()
+
+                output = ""
+                if brace:
+                    curSkip = 0
+                    if brace == b"{":
+                        self.groupDepth += 1
+                        inDocument = True
+                        stack.append((ucSkip, ignorable))
+                    else:
+                        self.groupDepth -= 1
+                        if stack:
+                            ucSkip, ignorable = stack.pop()
+                        if inDocument and self.groupDepth <= 0:
+                            # Anything after the document group is discarded
+                            documentClosed = True
+                            break
+                elif symbol:
+                    curSkip = 0
+                    symbolStr = symbol.decode("latin-1")
+                    if symbolStr in SPECIAL_CHARS:
+                        if not ignorable:
+                            output = SPECIAL_CHARS[symbolStr]
+                    elif symbolStr == "*":
+                        ignorable = True
+                elif word:
+                    curSkip = 0
+                    wordStr = word.decode()
+                    if wordStr in DESTINATIONS:
+                        ignorable = True
+                    elif wordStr == "ansicpg":
+                        self.hexEncoding = lookupCodePage(arg.decode() if arg else "")
+
+                    if ignorable:
+                        pass
+                    elif wordStr in SPECIAL_CHARS:
+                        output = SPECIAL_CHARS[wordStr]
+                    elif wordStr == "uc":
+                        ucSkip = int(arg) if arg else 1
+                    elif wordStr == "u":
+                        if arg:
+                            codePoint = int(arg)
+                            if codePoint < 0:
+                                codePoint += 0x10000
+                            output = chr(codePoint)
+                        curSkip = ucSkip
+                elif text:
+                    textStr = self.textDecoder.decode(text)
+                    if curSkip:
+                        skipped = min(curSkip, len(textStr))
+                        curSkip -= skipped
+                        textStr = textStr[skipped:]
+                    if not ignorable:
+                        output = textStr
+
+                if not output:
+                    continue
+                if "\n" not in output:
+                    line.append(output)
+                    continue
+
+                pieces = output.split("\n")
+                line.append(pieces[0])
+                self.lineEnd = bufferOffset + pos
+                yield "".join(line)
+                for piece in pieces[1:-1]:
+                    yield piece
+                line = [pieces[-1]]
+
+            bufferOffset += pos
+            buffer = buffer[pos:]
+
+        if hexes:
+            line.append(hexes.decode(self.hexEncoding, errors="replace"))
+        line.append(self.textDecoder.decode(b"", final=True))
+        self.remainder = "".join(line)
+
+
+def iterRtfLines(f: BinaryIO, encoding: str = "cp1252", codePage: str = "") -> Iterator[str]:
+    """
+    Yields the text lines of a rtf file, including the text following the last
+    line break, the same lines `rtf_to_text(content).split("\\n")` produces.
+    """
+    reader = RtfLineReader(f, encoding, codePage)
+    yield from reader
+    yield reader.remainder
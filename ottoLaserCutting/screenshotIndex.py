@@ -0,0 +1,178 @@
+import config
+
+import os
+import json
+import struct
+import bisect
+import datetime
+from typing import NamedTuple, Optional
+from pathlib import Path
+
+SCREENSHOT_INDEX_PATH = Path(config.CACHE_DIR_PATH, "截图索引.json")
+# Size of a TubePro screenshot, other images of the directory are left out
+SCREENSHOT_SIZE = (1080, 1920)
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Signature, then the length and the type of the IHDR chunk, then its width and height
+PNG_HEADER_SIZE = 24
+# Screenshots are named "屏幕截图 %Y-%m-%d %H%M%S.png" by `util.screenshotSave`
+NAME_PREFIX_LENGTH = 5
+NAME_TIME_FORMAT = "%Y-%m-%d %H%M%S"
+
+
+class ScreenshotEntry(NamedTuple):
+    path: Path
+    time: datetime.datetime
+
+
+def readPngSize(filePath: Path) -> Optional[tuple]:
+    """
+    Reads the size of a PNG image off its IHDR chunk, without decoding it.
+
+    Returns:
+        Optional[tuple]: `(width, height)`, None if the file isn't a PNG image.
+    """
+    try:
+        with open(filePath, "rb") as f:
+            header = f.read(PNG_HEADER_SIZE)
+    except OSError:
+        return None
+    if len(header) < PNG_HEADER_SIZE or header[:8] != PNG_SIGNATURE or header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def parseScreenshotTime(stem: str) -> Optional[datetime.datetime]:
+    try:
+        return datetime.datetime.strptime(stem[NAME_PREFIX_LENGTH:], NAME_TIME_FORMAT)
+    except ValueError:
+        return None
+
+
+class ScreenshotIndex:
+    """
+    Index of the TubePro screenshots of a directory by month and time, so that
+    updating the cut records never opens an image. The directory is only listed
+    again once its modification time changes, and only the headers of the
+    images not seen before are read, their sizes being kept on disk by name,
+    size and modification time.
+
+    Args:
+        dirPath (Path): Directory holding the screenshots.
+        cachePath (Path): Path to the sizes kept on disk.
+    """
+    def __init__(self, dirPath: Path, cachePath: Path = SCREENSHOT_INDEX_PATH):
+        self.dirPath   = Path(dirPath)
+        self.cachePath = Path(cachePath)
+        self.dirMtime  = -1
+        self.entries   = []
+        self.times     = []
+        # {month: ([time], [ScreenshotEntry])} sorted by time
+        self.monthEntries = {}
+        self.headerReadCount = 0
+
+    def loadSizes(self) -> dict:
+        """
+        Returns:
+            dict: `{name: [size, mtimeNs, width, height]}` of the images
+            whose header has been read before.
+        """
+        try:
+            with open(self.cachePath, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def saveSizes(self, sizes: dict) -> None:
+        os.makedirs(self.cachePath.parent, exist_ok=True)
+        tempPath = Path(self.cachePath.parent, self.cachePath.name + ".tmp")
+        with open(tempPath, "w", encoding="utf-8") as f:
+            json.dump(sizes, f, ensure_ascii=False)
+        os.replace(tempPath, self.cachePath)
+
+    def refresh(self) -> None:
+        dirMtime = self.dirPath.stat().st_mtime_ns
+        if dirMtime == self.dirMtime:
+            return
+
+        cachedSizes = self.loadSizes()
+        sizes = {}
+        entries = []
+        with os.scandir(self.dirPath) as dirEntries:
+            for dirEntry in dirEntries:
+                if not dirEntry.name.endswith(".png") or not dirEntry.is_file():
+                    continue
+                # The directory listing already carries the stat data on Windows
+                stat = dirEntry.stat()
+                cachedSize = cachedSizes.get(dirEntry.name)
+                if cachedSize and cachedSize[:2] == [stat.st_size, stat.st_mtime_ns]:
+                    imageSize = tuple(cachedSize[2:])
+                else:
+                    imageSize = readPngSize(Path(dirEntry.path)) or (0, 0)
+                    self.headerReadCount += 1
+                sizes[dirEntry.name] = [stat.st_size, stat.st_mtime_ns, *imageSize]
+                if imageSize != SCREENSHOT_SIZE:
+                    continue
+
+                path = Path(dirEntry.path)
+                timeObj = parseScreenshotTime(path.stem)
+                if timeObj is not None:
+                    entries.append(ScreenshotEntry(path, timeObj))
+        if sizes != cachedSizes:
+            self.saveSizes(sizes)
+
+        entries.sort(key=lambda entry: (entry.time, entry.path.name))
+        monthEntries = {}
+        for entry in entries:
+            month = entry.path.stem[NAME_PREFIX_LENGTH:NAME_PREFIX_LENGTH + 7]
+            times, monthEntryList = monthEntries.setdefault(month, ([], []))
+            times.append(entry.time)
+            monthEntryList.append(entry)
+        self.entries      = entries
+        self.times        = [entry.time for entry in entries]
+        self.monthEntries = monthEntries
+        self.dirMtime     = dirMtime
+
+    def getMonths(self) -> list:
+        """
+        Lists the months holding screenshots, e.g. "2025-06", in time order.
+        """
+        self.refresh()
+        return sorted(self.monthEntries)
+
+    def query(
+        self,
+        newerThan: Optional[datetime.datetime] = None,
+        month: Optional[str] = None
+    ) -> list:
+        """
+        Lists the screenshots taken after a time.
+
+        Args:
+            newerThan (Optional[datetime.datetime]): Time the screenshots are
+                taken after, exclusive. Every screenshot is listed when omitted.
+            month (Optional[str]): Month of the screenshots, e.g. "2025-06",
+                every month when omitted.
+
+        Returns:
+            list[Path]: Paths of the screenshots ordered by time.
+        """
+        self.refresh()
+        if month is None:
+            times, entries = self.times, self.entries
+        else:
+            times, entries = self.monthEntries.get(month, ([], []))
+        start = 0 if newerThan is None else bisect.bisect_right(times, newerThan)
+        return [entry.path for entry in entries[start:]]
+
+
+screenshotIndexes = {}
+
+
+def getScreenshotIndex(dirPath: Path) -> ScreenshotIndex:
+    """
+    Gets the index of a screenshot directory, kept for the lifetime of the process.
+    """
+    key = str(dirPath)
+    if key not in screenshotIndexes:
+        screenshotIndexes[key] = ScreenshotIndex(dirPath)
+    return screenshotIndexes[key]
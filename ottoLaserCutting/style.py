@@ -1,5 +1,7 @@
 from openpyxl.styles import DEFAULT_FONT, Font, NamedStyle, GradientFill, PatternFill, Font, Alignment
+from openpyxl.styles import Protection
 from openpyxl.styles.borders import Border, Side
+from openpyxl.styles.builtins import styles as builtinStyles
 
 alCenter     = Alignment(horizontal = "center", vertical = "center")
 alCenterWrap = Alignment(horizontal = "center", vertical = "center", wrapText = True)
@@ -31,3 +33,43 @@ style["centerHyperlink"].alignment = alCenter
 style["centerStrikethrough"].font = font["strikethrough"]
 style["centerStrikethrough"].alignment = alCenter
 style["input"].font = font["greenBold"]
+
+# Formats shared by the cells of the reports, see `excelWriter.registerFormats`.
+# Each one becomes a named style of the workbook so that a cell refers to it
+# instead of holding its own font, border and number format.
+reportFormat = {
+    "headline":        {
+        "font":      builtinStyles["Headline 1"].font,
+        "border":    builtinStyles["Headline 1"].border,
+        "alignment": alCenter,
+    },
+    "laserFile":       {"alignment": alCenterWrap, "border": borderMedium},
+    "seconds":         {"number_format": '0"秒"', "border": borderMedium},
+    "times":           {"number_format": '0"次"', "border": borderMedium},
+    "date":            {"number_format": "yyyy-mm-dd h:mm:ss", "border": borderMedium},
+    "targetInput":     {
+        "font":          font["orangeBold"],
+        "number_format": '0"支"',
+        "protection":    Protection(locked=False),
+        "border":        borderMedium,
+    },
+    "doneInput":       {
+        "font":          font["greenBold"],
+        "number_format": '0"支"',
+        "protection":    Protection(locked=False),
+        "border":        borderMedium,
+    },
+    "pieces":          {"number_format": '0"支"', "border": borderMedium},
+    "duration":        {"number_format": "[h]时mm分ss秒", "border": borderMedium},
+    "finishTime":      {"number_format": "yyyy-m-d h:mm:ss", "border": borderMedium},
+    "wrap":            {"alignment": Alignment(wrapText=True)},
+    "sessionTime":     {"number_format": "yyyy/m/d h:mm:ss"},
+    "sessionDuration": {"number_format": "[h]时mm分ss秒"},
+    "text":            {"number_format": "@"},
+    "textBold":        {"number_format": "@", "font": Font(bold=True)},
+    "bold":            {"font": Font(bold=True)},
+    "length":          {"number_format": "0.0"},
+    "lengthBold":      {"number_format": "0.0", "font": Font(bold=True)},
+    "area":            {"number_format": "0.0000"},
+    "areaBold":        {"number_format": "0.0000", "font": Font(bold=True)},
+}
@@ -0,0 +1,373 @@
+import util
+import config
+from config import cfg
+import eventStore
+import cuttingSession
+import rtfParse
+
+import os
+import csv
+import json
+import datetime
+from contextlib import closing
+from typing import Iterable, Iterator, NamedTuple
+from pathlib import Path
+from openpyxl import load_workbook
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    # Parquet is only written when pyarrow is installed
+    pyarrow = None
+
+pr = util.pr
+EXPORT_DIR_PATH = Path(cfg.paths.otto, r"存档/导出数据")
+# The format name is the file suffix too
+FORMATS = ("csv", "jsonl", "parquet")
+# Number of rows held in memory before they're written as a Parquet row group
+PARQUET_BATCH_SIZE = 65536
+
+
+class Column(NamedTuple):
+    """
+    A column of an exported table.
+
+    Attributes:
+        name (str): Name of the column.
+        kind (str): One of "str", "int", "float" and "datetime". Values are
+            None where they are missing, except text which is left empty since
+            csv can't tell both apart.
+    """
+    name: str
+    kind: str
+
+
+LOOP_EVENT_COLUMNS = [
+    Column("log",       "str"),
+    Column("lineIdx",   "int"),
+    Column("time",      "datetime"),
+    Column("kind",      "str"),
+    Column("timeStamp", "str"),
+    Column("number1",   "int"),
+    Column("number2",   "int"),
+    Column("text",      "str"),
+]
+INTERVAL_STATS_COLUMNS = [
+    Column("laserFile",      "str"),
+    Column("workpieceCount", "int"),
+    Column("loopCount",      "int"),
+    Column("intervalCount",  "int"),
+    Column("median",         "float"),
+    Column("p90",            "float"),
+    Column("trimmedMean",    "float"),
+    Column("mode",           "float"),
+    Column("lastUpdated",    "datetime"),
+]
+SESSION_COLUMNS = [
+    Column("laserFile",     "str"),
+    Column("startTime",     "datetime"),
+    Column("endTime",       "datetime"),
+    Column("startCount",    "int"),
+    Column("totalCount",    "int"),
+    Column("scheduleTotal", "int"),
+]
+# Cut records are typed in by hand or read by OCR, they're kept as text
+CUT_RECORD_COLUMNS = [
+    Column("sheet",       "str"),
+    Column("laserFile",   "str"),
+    Column("finishTime",  "str"),
+    Column("orderNumber", "str"),
+    Column("model",       "str"),
+    Column("cutCount",    "str"),
+    Column("screenshot",  "str"),
+]
+PARQUET_TYPES = {
+    "str":      lambda: pyarrow.string(),
+    "int":      lambda: pyarrow.int64(),
+    "float":    lambda: pyarrow.float64(),
+    "datetime": lambda: pyarrow.timestamp("us"),
+}
+
+
+def iterLoopEvents(logNames: list) -> Iterator[dict]:
+    """
+    Reads the stored events of logs, log after log.
+    """
+    with closing(eventStore.connect()) as conn:
+        for logName in logNames:
+            for lineIdx, event, timeObj in eventStore.iterEvents(conn, logName):
+                yield {
+                    "log":       logName,
+                    "lineIdx":   lineIdx,
+                    "time":      timeObj,
+                    "kind":      event.kind,
+                    "timeStamp": event.timeStamp,
+                    "number1":   event.numbers[0] if len(event.numbers) > 0 else None,
+                    "number2":   event.numbers[1] if len(event.numbers) > 1 else None,
+                    "text":      event.text,
+                }
+
+
+def iterIntervalStats(parsedResult: dict) -> Iterator[dict]:
+    """
+    Computes the cycle time statistics of every laser file of a parsed result,
+    see `rtfParse.parse`. Laser files looped only once have no statistics.
+    """
+    for laserFileName, laserFileInfo in sorted(parsedResult.items()):
+        laserFileStats = laserFileInfo["loop"].stats()
+        yield {
+            "laserFile":      laserFileName,
+            "workpieceCount": laserFileInfo["workpieceCount"],
+            "loopCount":      len(laserFileInfo["loop"]),
+            "intervalCount":  laserFileStats.count if laserFileStats else 0,
+            "median":         laserFileStats.median if laserFileStats else None,
+            "p90":            laserFileStats.p90 if laserFileStats else None,
+            "trimmedMean":    laserFileStats.trimmedMean if laserFileStats else None,
+            "mode":           laserFileStats.mode if laserFileStats else None,
+            "lastUpdated":    laserFileStats.lastUpdated if laserFileStats else None,
+        }
+
+
+def iterSessions(logNames: list) -> Iterator[dict]:
+    """
+    Stitches the events of logs into cutting sessions, skipping those where
+    nothing got cut like the session workbook of `rtfParse.simplifyPeriod`.
+    """
+    with closing(eventStore.connect()) as conn:
+        storedEvents = cuttingSession.mergeLogEvents(conn, logNames)
+        for session in cuttingSession.iterSessions(storedEvents):
+            if session["totalCount"]["value"] == 0:
+                continue
+            yield {
+                "laserFile":     session["fileName"]["value"],
+                "startTime":     session["fileName"]["updatedTime"],
+                "endTime":       session["totalCount"]["updatedTime"],
+                "startCount":    session["startCount"]["value"],
+                "totalCount":    session["totalCount"]["value"],
+                "scheduleTotal": session["scheduleTotal"]["value"],
+            }
+
+
+def iterCutRecords(cutRecordPath: Path = config.CUT_RECORD_PATH) -> Iterator[dict]:
+    """
+    Reads the rows of every monthly worksheet of the cut record workbook.
+    """
+    def toText(value) -> str:
+        if value is None:
+            return ""
+        elif isinstance(value, datetime.datetime):
+            return value.strftime("%Y/%m/%d %H:%M:%S")
+        else:
+            return str(value)
+
+    wb = load_workbook(str(cutRecordPath))
+    for ws in wb.worksheets:
+        for row in ws.iter_rows(min_row=2, max_col=6):
+            if all(cell.value is None and not cell.hyperlink for cell in row):
+                continue
+            screenshotCell = row[5]
+            yield {
+                "sheet":       ws.title,
+                "laserFile":   toText(row[0].value),
+                "finishTime":  toText(row[1].value),
+                "orderNumber": toText(row[2].value),
+                "model":       toText(row[3].value),
+                "cutCount":    toText(row[4].value),
+                "screenshot":  toText(
+                    screenshotCell.hyperlink.target if screenshotCell.hyperlink else screenshotCell.value
+                ),
+            }
+
+
+def encodeValue(value, column: Column):
+    if value is None:
+        return None
+    elif column.kind == "datetime":
+        return value.isoformat()
+    else:
+        return value
+
+
+def decodeValue(value, column: Column):
+    if value is None or (value == "" and column.kind != "str"):
+        return None
+    elif column.kind == "datetime":
+        return datetime.datetime.fromisoformat(value)
+    elif column.kind == "int":
+        return int(value)
+    elif column.kind == "float":
+        return float(value)
+    else:
+        return value
+
+
+def writeTable(rows: Iterable[dict], columns: list, dstPath: Path) -> int:
+    """
+    Streams rows into a table file, in the format given by the suffix of dstPath.
+    The file is written under a temporary name and only replaces dstPath once
+    complete.
+
+    Args:
+        rows (Iterable[dict]): Rows, keyed by the column names.
+        columns (list[Column]): Columns of the table.
+        dstPath (Path): Path to the .csv, .jsonl or .parquet file.
+
+    Returns:
+        int: Number of rows written.
+
+    Raises:
+        ValueError: The suffix isn't one of `FORMATS`.
+        ModuleNotFoundError: Parquet is asked for but pyarrow isn't installed.
+    """
+    fmt = dstPath.suffix[1:]
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown table format: {dstPath.suffix}")
+    if fmt == "parquet" and not pyarrow:
+        raise ModuleNotFoundError("pyarrow is needed to write Parquet files")
+
+    tempPath = dstPath.with_name(dstPath.name + ".tmp")
+    rowCount = 0
+    if fmt == "csv":
+        # The BOM lets Excel tell the encoding of the Chinese text
+        with open(tempPath, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([column.name for column in columns])
+            for row in rows:
+                writer.writerow([
+                    encodeValue(row[column.name], column) for column in columns
+                ])
+                rowCount += 1
+    elif fmt == "jsonl":
+        with open(tempPath, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(
+                    {column.name: encodeValue(row[column.name], column) for column in columns},
+                    ensure_ascii=False
+                ))
+                f.write("\n")
+                rowCount += 1
+    else:
+        schema = pyarrow.schema([
+            (column.name, PARQUET_TYPES[column.kind]()) for column in columns
+        ])
+        with pyarrow.parquet.ParquetWriter(str(tempPath), schema) as writer:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == PARQUET_BATCH_SIZE:
+                    writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                    rowCount += len(batch)
+                    batch = []
+            # A file without any row group still carries the schema
+            if batch or not rowCount:
+                writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                rowCount += len(batch)
+
+    os.replace(tempPath, dstPath)
+    return rowCount
+
+
+def readTable(srcPath: Path, columns: list) -> list:
+    """
+    Reads back a table written by `writeTable`, with the values typed as they
+    were written.
+
+    Returns:
+        list[dict]: Rows, keyed by the column names.
+    """
+    fmt = srcPath.suffix[1:]
+    if fmt == "csv":
+        with open(srcPath, "r", encoding="utf-8-sig", newline="") as f:
+            return [
+                {column.name: decodeValue(row[column.name], column) for column in columns}
+                for row in csv.DictReader(f)
+            ]
+    elif fmt == "jsonl":
+        with open(srcPath, "r", encoding="utf-8") as f:
+            return [
+                {column.name: decodeValue(row[column.name], column) for column in columns}
+                for row in map(json.loads, f)
+            ]
+    elif fmt == "parquet":
+        if not pyarrow:
+            raise ModuleNotFoundError("pyarrow is needed to read Parquet files")
+        return pyarrow.parquet.read_table(str(srcPath)).to_pylist()
+    else:
+        raise ValueError(f"Unknown table format: {srcPath.suffix}")
+
+
+def getTables(days: int, cutRecordPath: Path = config.CUT_RECORD_PATH) -> dict:
+    """
+    Gathers the tables of the TubePro logs created within the last days and of
+    the cut records:
+        - loopEvents: Every stored event of the logs
+        - intervalStats: Cycle time statistics of every laser file, the same
+          as in the accumulated laser profile
+        - cuttingSessions: Cutting sessions stitched across the logs
+        - cutRecords: Rows of the cut record workbook, if there is one
+
+    Args:
+        days (int): Number of days of the time window.
+        cutRecordPath (Path): Path to the cut record workbook.
+
+    Returns:
+        dict: `{tableName: (getRows, columns)}`, getRows returning a fresh
+        iterator over the rows each time it's called.
+    """
+    rtfFiles = rtfParse.getStoredLogs(datetime.datetime.now() - datetime.timedelta(days=days))
+    logNames = [rtfFile.name for rtfFile in rtfFiles]
+    parsedResult = {}
+    with closing(eventStore.connect()) as conn:
+        for rtfFile in rtfFiles:
+            parsedResult = rtfParse.parse(
+                rtfFile=rtfFile,
+                wb=None, # type: ignore
+                accumulationMode=True,
+                parsedResult=parsedResult,
+                events=eventStore.iterEvents(conn, rtfFile.name), # type: ignore
+            )["parsedResult"] or parsedResult
+
+    tables = {
+        "loopEvents":      (lambda: iterLoopEvents(logNames), LOOP_EVENT_COLUMNS),
+        "intervalStats":   (lambda: iterIntervalStats(parsedResult), INTERVAL_STATS_COLUMNS),
+        "cuttingSessions": (lambda: iterSessions(logNames), SESSION_COLUMNS),
+    }
+    if cutRecordPath.exists():
+        tables["cutRecords"] = (lambda: iterCutRecords(cutRecordPath), CUT_RECORD_COLUMNS)
+    return tables
+
+
+def exportPeriod(
+    days: int,
+    dstDir: Path = EXPORT_DIR_PATH,
+    formats: Iterable[str] = FORMATS,
+    cutRecordPath: Path = config.CUT_RECORD_PATH
+) -> list:
+    """
+    Exports the tables of `getTables` into files named after them, one per
+    table and format. Parquet is skipped when pyarrow isn't installed.
+
+    Args:
+        days (int): Number of days of the time window.
+        dstDir (Path): Directory the tables are written to.
+        formats (Iterable[str]): Formats among `FORMATS`.
+        cutRecordPath (Path): Path to the cut record workbook.
+
+    Returns:
+        list[Path]: Paths of the table files written.
+    """
+    formats = list(formats)
+    if "parquet" in formats and not pyarrow:
+        pr("pyarrow isn't installed, skipping Parquet export")
+        formats.remove("parquet")
+
+    tables = getTables(days, cutRecordPath)
+    os.makedirs(dstDir, exist_ok=True)
+    dstPaths = []
+    for fmt in formats:
+        for tableName, (getRows, columns) in tables.items():
+            dstPath = Path(dstDir, f"{tableName}.{fmt}")
+            rowCount = writeTable(getRows(), columns, dstPath)
+            pr(f"导出{rowCount}行: {str(dstPath)}")
+            dstPaths.append(dstPath)
+    return dstPaths
@@ -2,6 +2,7 @@ import config
 from config import cfg
 import util
 import cutRecord
+import cycleProfile
 import hotkey
 import emailNotify
 
@@ -64,6 +65,7 @@ class Monitor:
             enabled (bool): Flag indicating if monitoring is enabled (templates loaded).
             template* (Optional[MatLike]): OpenCV image templates for state detection.
             logger (logging.Logger): Configured logger instance for monitoring events.
+            laserFileName (str): Laser file open in TubePro, as last seen in its title.
         """
         self.isRunning = False
         self.lastAlertTimeStamp = 0.0
@@ -85,6 +87,7 @@ class Monitor:
         self.templateAlertForceReturn = None
         self.templateNoAlert = None
         self.logger = cast(logging.Logger, None)
+        self.laserFileName = ""
         # self.templateRunning:          Optional[MatLike] = None
         # self.templatePaused:           Optional[MatLike] = None
         # self.templatePausedCuttingHeadTouch:           Optional[MatLike] = None
@@ -247,37 +250,25 @@ class Monitor:
         else:
             return False
 
+    def shutdownMachine(self) -> None:
+        """
+        Shuts the machine down once the record worker has saved and journaled
+        the screenshots queued so far.
+        """
+        if cutRecord.recordWorker:
+            self.logger.info("Waiting for the queued screenshot records...")
+            cutRecord.recordWorker.stop()
+        subprocess.call(["shutdown", "-s"])
+        self.logger.warning("Currently it's off-work hours, shutdown the machine.")
+
     def onCompletion(self, currentTime: datetime, screenshot: Image.Image, tubeProTitleCurrent: str, stateName: str):
         pr(f'Cutting session "{tubeProTitleCurrent}" is completed, taking screenshot record.')
         self.logger.info(f'Cutting session "{tubeProTitleCurrent}" is completed, taking screenshot record.')
 
-        # `win32api.MessageBox` inside `takeScreenshot()`
-        # is a blocking call—it halts the thread so we need
-        # to make sure it call in a new thread then
-        # complete thread after 5 seconds
-        screenshotOnCompletionDone = threading.Event()
-        def screenshotOnCompletion(screenshot):
-            try:
-                cutRecord.takeScreenshot(screenshot)
-            finally:
-                screenshotOnCompletionDone.set()  # Signal completion
-        curRecordThread = threading.Thread(target=screenshotOnCompletion)
-        curRecordThread.start()
-
-
-        self.logger.info("Finding messagebox window.")
-        messageBoxHwnd = cutRecord.findMessageBoxWindow()
-        if messageBoxHwnd:
-            self.logger.info("Close message window in 5s.")
-        else:
-            self.logger.warning("Can't find message window.")
-
-        if screenshotOnCompletionDone.is_set():
-            self.logger.info("Screenshot task completed.")
-        else:
-            self.logger.info("Screenshot task running in background.")
-
-        curRecordThread.join() # Ensure the thread completes
+        # Only queued here, the record worker saves and journals the
+        # screenshot without holding up the monitor loop
+        cutRecord.takeScreenshot(screenshot)
+        self.logger.info("Screenshot record queued.")
 
         # Make records for monitoring
         os.makedirs(MONITOR_PIC, exist_ok=True)
@@ -291,12 +282,25 @@ class Monitor:
         # Check off-work hours and shutdown if necessary
         if self.offWorkShutdownChk(currentTime):
             self.isRunning = False
-            subprocess.call(["shutdown", "-s"])
-            self.logger.warning("Currently it's off-work hours, shutdown the machine.")
+            self.shutdownMachine()
         else:
             self.logger.info("Currently it's work time right now, no plan for shuting down the machine.")
 
 
+    def reportCycleProfile(self, remainingCount: int = 100) -> None:
+        """
+        Reports the cycle time of the laser file open in TubePro from the cycle
+        time profile, along with the time it takes to cut remainingCount workpieces.
+        """
+        eta = cycleProfile.estimate(self.laserFileName, remainingCount)
+        if eta is None:
+            self.logger.info(f'No cycle time profile for "{self.laserFileName}".')
+            return
+        message = cycleProfile.describeEta(eta)
+        pr(message)
+        self.logger.info(message)
+
+
     def _monitor_loop(self) -> None:
         """
         Monitors the TubePro application window and performs actions based on its state.
@@ -381,6 +385,11 @@ class Monitor:
                 self.logger.info("Skip due to tubePro isn't focus at the main window.")
                 continue
 
+            laserFileName = cutRecord.getPartFileName(tubeProTitleCurrent)
+            if laserFileName != self.laserFileName:
+                self.laserFileName = laserFileName
+                self.reportCycleProfile()
+
             # Capture window content from TubePro
             screenshot = self.captureWindow(-1)
             if screenshot is None:
@@ -441,8 +450,7 @@ class Monitor:
                                     # Check off-work hours and shutdown if necessary
                                     if self.offWorkShutdownChk(currentTime):
                                         self.isRunning = False
-                                        subprocess.call(["shutdown", "-s"])
-                                        self.logger.warning("Currently it's off-work hours, shutdown the machine.")
+                                        self.shutdownMachine()
                                 else:
                                     if self.offWorkShutdownChk(currentTime):
                                         self.logger.warning("Cutting is paused, auto-click continue.")
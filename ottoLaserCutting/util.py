@@ -4,18 +4,22 @@ from config import cfg
 import os
 import shutil
 import datetime
-import win32api, win32con
 import re
-import dearpygui.dearpygui as dpg
 from pprint import pprint
 from pathlib import Path
 from openpyxl import Workbook
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from typing import List
-from PIL.Image import Image
+# The GUI, win32 and PIL stacks are only imported where they are needed, so
+# that the headless command line runs where they aren't available
+if TYPE_CHECKING:
+    from PIL.Image import Image
 
 
 logFlow = []
+# Set by the headless command line: messages go to stdout and no dialog ever
+# waits for an answer
+headlessChk = False
 
 
 def pr(*args, gui: bool=True):
@@ -32,9 +36,12 @@ def pr(*args, gui: bool=True):
     newMessage = "\n".join(args)
     logFlow.append(newMessage)
     message = "\n".join(logFlow)
-    if gui:
+    if gui and not headlessChk:
+        import dearpygui.dearpygui as dpg
         dpg.set_value("log", value=message)
-    if not config.BUNDLE_MODE:
+    if headlessChk:
+        print(newMessage)
+    elif not config.BUNDLE_MODE:
         pprint(newMessage)
 
 
@@ -52,8 +59,8 @@ def getTimeStamp(dt: Optional[datetime.datetime]=None) -> str:
 
 
 def saveWorkbook(
-    wb: Workbook, dstPath: Path | None = None, openAfterSaveChk=False
-) -> Path:  # {{{
+    wb: Workbook, dstPath: Path | None = None, openAfterSaveChk=False, backgroundChk=False, backupChk=None
+) -> Optional[Path]:  # {{{
     """
     Saves a Workbook object to specified path with fallback options.
 
@@ -62,12 +69,18 @@ def saveWorkbook(
         dstPath: Optional destination path for the workbook. If None or permission issues occur,
                  falls back to default export directory.
         openAfterSaveChk: If True, opens the saved file after saving
+        backgroundChk: If True, the workbook is saved by a background task:
+                 nothing is saved when the file is in use, the next save
+                 writes it
+        backupChk: Whether the existing file is backed up first, by default
+                 unless saved in the background
 
     Returns:
-        Path: The actual path where the workbook was saved
+        Optional[Path]: The actual path where the workbook was saved, None if
+                 a background save was skipped
 
     Behavior:
-        - Creates backup if file exists
+        - Creates backup if file exists and backupChk allows it
         - Handles permission errors with retry prompt
         - Falls back to export directory if:
             * No dstPath provided
@@ -82,7 +95,9 @@ def saveWorkbook(
 
     if dstPath:
         # Create backup first
-        if dstPath.exists():
+        if backupChk is None:
+            backupChk = not backgroundChk
+        if dstPath.exists() and backupChk:
             backupPath = Path(
                 fallbackExportDir,
                 dstPath.stem + "_backup_" + timeStr + ".xlsx"
@@ -96,12 +111,20 @@ def saveWorkbook(
                 os.startfile(dstPath)
             return dstPath
         except PermissionError:
-            if win32con.IDRETRY == win32api.MessageBox(
-                None,
-                f"是否要重新写入该路径？\n\"{str(dstPath)}\"",
-                "写入权限不足",
-                4096 + 5 + 32
-                ):
+            if backgroundChk:
+                pr(f"\n[{getTimeStamp()}]:Skipping Excel file in use: {dstPath}")
+                return None
+            elif headlessChk:
+                retryChk = False
+            else:
+                import win32api, win32con
+                retryChk = win32con.IDRETRY == win32api.MessageBox(
+                    None,
+                    f"是否要重新写入该路径？\n\"{str(dstPath)}\"",
+                    "写入权限不足",
+                    4096 + 5 + 32
+                    )
+            if retryChk:
                 #   MB_SYSTEMMODAL==4096
                 ##  Button Styles:
                 ### 0:OK  --  1:OK|Cancel -- 2:Abort|Retry|Ignore -- 3:Yes|No|Cancel -- 4:Yes|No -- 5:Retry|No -- 6:Cancel|Try Again|Continue
@@ -215,7 +238,9 @@ def diametartSymbolUnify(input: str) -> str:
     return input
 
 
-def screenshotSave(screenshot: Image, namePrefix: str, dstDirPath: Path) -> Path:
+def screenshotSave(
+    screenshot: "Image", namePrefix: str, dstDirPath: Path, datetimeNow: Optional[datetime.datetime] = None
+) -> Path:
     """
     Saves a screenshot image to the specified directory with a timestamped filename.
 
@@ -223,6 +248,7 @@ def screenshotSave(screenshot: Image, namePrefix: str, dstDirPath: Path) -> Path
         screenshot: PIL Image object to be saved
         namePrefix: Prefix string for the filename
         dstDirPath: Destination directory path where the image will be saved
+        datetimeNow: Time the screenshot was taken at, the current time when omitted
 
     Returns:
         Path: The full path where the screenshot was saved
@@ -233,7 +259,8 @@ def screenshotSave(screenshot: Image, namePrefix: str, dstDirPath: Path) -> Path
         >>> pr(path)  # e.g. /screenshots/test 2023-01-01 120000.png
     """
     os.makedirs(dstDirPath, exist_ok=True)
-    datetimeNow = datetime.datetime.now()
+    if datetimeNow is None:
+        datetimeNow = datetime.datetime.now()
     screenshotPath = Path(
         dstDirPath, f'{namePrefix} {datetimeNow.strftime("%Y-%m-%d %H%M%S")}.png'
     )
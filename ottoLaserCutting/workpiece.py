@@ -1,6 +1,7 @@
 import config
 import util
 import keySet
+import excelWriter
 import subprocess
 from config import cfg
 
@@ -10,10 +11,8 @@ import json
 import datetime
 import win32api
 from openpyxl import Workbook
-from openpyxl.worksheet.table import Table, TableStyleInfo
 from openpyxl.comments import Comment
 from pathlib import Path
-from openpyxl.styles import Font
 from openpyxl.styles.numbers import BUILTIN_FORMATS
 # https://openpyxl.readthedocs.io/en/3.1.3/_modules/openpyxl/styles/numbers.html
 from decimal import Decimal
@@ -217,40 +216,26 @@ def exportDimensions():
     zxFileOnlyChk = True if "shift" in keySet.keys else False
     dstPath1 = WORKPIECE_INFO_PATH
     dstPath2 = Path(cfg.paths.warehousing, "零件规格总览.xlsx")
-    boldFont = Font(bold=True)
     if "ctrl" in keySet.keys:
         return os.startfile(dstPath1)
     laserFilePaths = util.getAllLaserFiles(zxFileOnlyChk)
     with open(WORKPIECE_DICT, "r", encoding="utf-8") as f:
         workpieceDict = json.load(f)
 
-    wb = Workbook()
-    ws = wb["Sheet"]
-    ws["A1"] = "更新时间:" + str(datetime.datetime.now().strftime("%Y-%m-%d %H%M%S%f"))
-    ws.merge_cells("B1:F1")
-    ws["A2"].value = "零件名称"
-    ws.column_dimensions["A"].width = 25
-    ws["B2"].value = "外发别名"
-    ws.column_dimensions["B"].width = 14
-    ws["C2"].value = "规格"
-    ws.column_dimensions["C"].width = 20
-    ws["D2"].value = "材料"
-    ws.column_dimensions["D"].width = 9
-    ws["E2"].value = "参数一"
-    ws.column_dimensions["E"].width = 8
-    ws["F2"].value = "参数二"
-    ws.column_dimensions["F"].width = 8
-    ws["G2"].value = "长度"
-    ws.column_dimensions["G"].width = 8
-    ws["H2"].value = "方数(m²)"
-    ws.column_dimensions["H"].width = 9.5
-    ws["I2"].value = "焊接散件"
-    ws.column_dimensions["I"].width = 12
+    timeStamp = "更新时间:" + str(datetime.datetime.now().strftime("%Y-%m-%d %H%M%S%f"))
+    # Rows are gathered first since the workbook is streamed to each destination
+    # in turn: (values, formats, comment of column B)
+    rows = []
     workpieceFullNamesWithDimension = []
     workpieceNickNames = workpieceDict["nickname"]
     # <fullPartName>: ["<nickName>", "<comment>"]
     for lIdx, p in enumerate(laserFilePaths):
-        rowMax = ws.max_row + 1
+        # Rows 1 and 2 hold the time stamp and the headers
+        rowMax = len(rows) + 3
+        values  = [None] * 9
+        formats = [None] * 9
+        commentText = ""
+        boldRowChk = False
         if p.suffix == ".zx" or p.suffix == ".zzx":
             fileNameMatch = cfg.patterns.laserFile.match(str(p.stem))
             boldFontChk = True
@@ -291,25 +276,20 @@ def exportDimensions():
                 or "扶手管" in p.stem
                 or "铝拐臂" in p.stem
             ):
-                for colIdx in range(1, 10):
-                    ws.cell(row=rowMax, column=colIdx).font = boldFont
+                boldRowChk = True
 
-            ws[f"A{rowMax}"].value = workpieceFullName
-            ws[f"A{rowMax}"].number_format = "@"
+            values[0]  = workpieceFullName
+            formats[0] = "text"
             # namingly ws[f"A{rowMax}"].number_format = BUILTIN_FORMATS[49]
 
             if workpieceFullName.endswith(" 焊接组合"):
                 workpieceNickName = workpieceFullName.replace(" 焊接组合", "")
             if workpieceFullName in workpieceNickNames:
                 workpieceNickName = workpieceNickNames[workpieceFullName][0]
-                if workpieceNickNames[workpieceFullName][1]:
-                    comment = Comment(workpieceNickNames[workpieceFullName][1], "阮焕")
-                    comment.width = 300
-                    comment.height = 150
-                    ws[f"B{rowMax}"].comment = comment
+                commentText = workpieceNickNames[workpieceFullName][1]
 
-            ws[f"B{rowMax}"].value = workpieceNickName
-            ws[f"B{rowMax}"].number_format = "@"
+            values[1]  = workpieceNickName
+            formats[1] = "text"
 
         else:
             fileNameMatchTick = True
@@ -365,36 +345,31 @@ def exportDimensions():
                 or "扶手管" in p.stem
                 or "铝拐臂" in p.stem
             ):
-                for colIdx in range(1, 10):
-                    ws.cell(row=rowMax, column=colIdx).font = boldFont
+                boldRowChk = True
 
-            ws[f"A{rowMax}"].value = workpieceFullName
-            ws[f"A{rowMax}"].number_format = "@"
+            values[0]  = workpieceFullName
+            formats[0] = "text"
             # namingly ws[f"A{rowMax}"].number_format = BUILTIN_FORMATS[49]
             if workpieceFullName in workpieceNickNames:
                 workpieceNickName = workpieceNickNames[workpieceFullName][0]
-                comment = workpieceNickNames[workpieceFullName][1]
-                if comment:
-                    ws[f"B{rowMax}"].comment = Comment(comment, "阮焕")
-                    ws[f"B{rowMax}"].comment.width = 300
-                    ws[f"B{rowMax}"].comment.height = 150
-            ws[f"B{rowMax}"].value = workpieceNickName
-            ws[f"B{rowMax}"].number_format = "@"
-
-            ws[f"C{rowMax}"].value = workpieceDimension
-            ws[f"C{rowMax}"].number_format = "@"
-            ws[f"D{rowMax}"].value = workpieceMaterial
-            ws[f"D{rowMax}"].number_format = "@"
-            ws[f"E{rowMax}"].value = workpiece1stParameter
-            ws[f"E{rowMax}"].number_format = "@"
+                commentText = workpieceNickNames[workpieceFullName][1]
+            values[1]  = workpieceNickName
+            formats[1] = "text"
+
+            values[2]  = workpieceDimension
+            formats[2] = "text"
+            values[3]  = workpieceMaterial
+            formats[3] = "text"
+            values[4]  = workpiece1stParameter
+            formats[4] = "text"
             if not workpiece2ndParameter or not re.search(r"^\d", workpiece2ndParameter):
-                ws[f"F{rowMax}"].value = workpiece2ndParameter
-                ws[f"F{rowMax}"].number_format = "@"
+                values[5]  = workpiece2ndParameter
+                formats[5] = "text"
                 # DEPRECATED:
                 # ws[f"H{rowMax}"].value = workpiece2ndParameterNum
                 # ws[f"H{rowMax}"].number_format = BUILTIN_FORMATS[2]
-            ws[f"G{rowMax}"].value = workpieceLength
-            ws[f"G{rowMax}"].number_format = "0.0"
+            values[6]  = workpieceLength
+            formats[6] = "length"
 
         # Calculate the surface area
         if workpieceDimension and fileNameMatchTick and "∅" in workpieceDimension and "L" in workpieceDimension:
@@ -404,8 +379,8 @@ def exportDimensions():
                 length = float(m.group(3)[1:])
                 surfaceAreaFormula = f"=3.14 * { dia } * G{rowMax} / 1000 / 1000"
                 surfaceAreaEval = 3.14 * dia * length / 1000 / 1000
-                ws[f"H{rowMax}"].value = surfaceAreaFormula
-                ws[f"H{rowMax}"].number_format = "0.0000"
+                values[7]  = surfaceAreaFormula
+                formats[7] = "area"
 
         # Use override area
         areaOverride = workpieceDict["areaOverride"]
@@ -417,43 +392,67 @@ def exportDimensions():
             overrideVal = areaOverride[querryKey]
 
             if isinstance(overrideVal, float):
-                if ws[f"H{rowMax}"].value and surfaceAreaEval:
+                if values[7] and surfaceAreaEval:
                     pr(f"Override area for {querryKey} with {areaOverride[querryKey]} instead of {surfaceAreaEval}")
                 else:
                     pr(f"Override area for {querryKey} with {areaOverride[querryKey]}")
 
-                ws[f"H{rowMax}"].value = areaOverride[querryKey]
+                values[7] = areaOverride[querryKey]
             elif isinstance(overrideVal, list):
-                ws[f"I{rowMax}"].value = "\n".join(overrideVal)
-                ws[f"I{rowMax}"].number_format = "@"
-                ws[f"H{rowMax}"].value = f"=SUMPRODUCT(SUMIF($B:$B,TEXTSPLIT($I{rowMax},CHAR(10)),$H:$H))+SUMPRODUCT(SUMIF($A:$A,TEXTSPLIT($I{rowMax},CHAR(10)),$H:$H))"
+                values[8]  = "\n".join(overrideVal)
+                formats[8] = "text"
+                values[7]  = f"=SUMPRODUCT(SUMIF($B:$B,TEXTSPLIT($I{rowMax},CHAR(10)),$H:$H))+SUMPRODUCT(SUMIF($A:$A,TEXTSPLIT($I{rowMax},CHAR(10)),$H:$H))"
             elif isinstance(overrideVal, str):
-                ws[f"H{rowMax}"].value = f'=IF(ISNUMBER(MATCH("{overrideVal}", B:B, 0)), INDEX(H:H, MATCH("{overrideVal}", B:B, 0)), IF(ISNUMBER(MATCH("{overrideVal}", A:A, 0)), INDEX(H:H, MATCH("{overrideVal}", A:A, 0)), ""))'
+                values[7] = f'=IF(ISNUMBER(MATCH("{overrideVal}", B:B, 0)), INDEX(H:H, MATCH("{overrideVal}", B:B, 0)), IF(ISNUMBER(MATCH("{overrideVal}", A:A, 0)), INDEX(H:H, MATCH("{overrideVal}", A:A, 0)), ""))'
                 pr(f"area of {querryKey} is linked to {areaOverride[querryKey]}")
 
-            ws[f"H{rowMax}"].number_format = "0.0000"
-
-    # Add table
-    tab = Table(displayName="Table1", ref=f"A2:I{ws.max_row}")
-
-    # Add printable area
-    ws.oddFooter.center.text = "第 &[Page] 页，共 &N 页" # type: ignore
-    ws.page_setup.paperSize = ws.PAPERSIZE_A4
-    ws.page_setup.orientation = ws.ORIENTATION_PORTRAIT
-    ws.print_title_rows = "2:2"
-    ws.print_area = f"A2:I{ws.max_row}"
-
-    # Add a default style with striped rows and banded columns
-    style = TableStyleInfo(
-            name="TableStyleMedium16",
-            showFirstColumn=False,
-            showLastColumn=False,
-            showRowStripes=True,
-            showColumnStripes=False
-            )
-    tab.tableStyleInfo = style
+            formats[7] = "area"
+
+        # Set font to be bold when the workpiece is produce in lasercutting machine
+        if boldRowChk:
+            formats = [f"{formatName}Bold" if formatName else "bold" for formatName in formats]
+        rows.append((values, formats, commentText))
+
+    # A write-only workbook can only be saved once
+    if dstPath1.exists():
+        savePath = util.saveWorkbook(fillDimensionWorkbook(timeStamp, rows), dstPath1, True)
+    if dstPath2.exists():
+        savePath = util.saveWorkbook(fillDimensionWorkbook(timeStamp, rows), dstPath2, False)
+
+
+def fillDimensionWorkbook(timeStamp: str, rows: list) -> Workbook:
+    """
+    Streams the workpiece dimensions into a new write-only workbook: the time
+    stamp on top, then a table of the workpieces ready to be printed.
 
-    ws.add_table(tab)
+    Args:
+        timeStamp (str): Text of cell A1.
+        rows (list[tuple]): Values, format names and comment of column B of
+            every workpiece, see `excelWriter.SheetWriter.append`.
+
+    Returns:
+        Workbook: The workbook, to be saved.
+    """
+    wb = excelWriter.newWorkbook()
+    writer = excelWriter.SheetWriter(wb.create_sheet(), {
+        "A": 25, "B": 14, "C": 20, "D": 9, "E": 8, "F": 8, "G": 8, "H": 9.5, "I": 12,
+    })
+    writer.append([timeStamp])
+    writer.mergeCells("B1:F1")
+    headers = ["零件名称", "外发别名", "规格", "材料", "参数一", "参数二", "长度", "方数(m²)", "焊接散件"]
+    writer.append(headers)
+    for values, formats, commentText in rows:
+        if commentText:
+            nickNameCell = writer.createCell(values[1], formats[1])
+            nickNameCell.comment = Comment(commentText, "阮焕")
+            nickNameCell.comment.width = 300
+            nickNameCell.comment.height = 150
+            values = [values[0], nickNameCell, *values[2:]]
+        writer.append(values, formats)
+
+    # Add table with striped rows and printable area
+    writer.addTable("Table1", headers, 2, "TableStyleMedium16")
+    writer.setPrintLayout("I", 2, "2:2")
 
     # Add protection
     # ws.protection.sheet = True
@@ -462,7 +461,4 @@ def exportDimensions():
     # ws.protection.password = '456'
     # ws.protection.enable()
 
-    if dstPath1.exists():
-        savePath = util.saveWorkbook(wb, dstPath1, True)
-    if dstPath2.exists():
-        savePath = util.saveWorkbook(wb, dstPath2, False)
+    return wb